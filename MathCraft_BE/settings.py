@@ -78,10 +78,21 @@ TEMPLATES = [
 ]
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'MathCraft_Game.authentication.CachedTokenAuthentication',
     ]
 }
 
+# Token -> user cache used by CachedTokenAuthentication (see MathCraft_Game/authentication.py).
+# GET requests may see profile fields (e.g. coins) up to TTL seconds old when a write
+# happened in another worker. Revoked tokens are refused by every worker within
+# VERSION_CHECK_INTERVAL seconds.
+AUTH_CACHE = {
+    "MAX_SIZE": 10000,
+    "TTL": 30,  # seconds
+    "CROSS_WORKER": True,  # logout / token deletes / password resets reach every worker via AuthCacheVersion
+    "VERSION_CHECK_INTERVAL": 2,  # seconds
+}
+
 WSGI_APPLICATION = "MathCraft_BE.wsgi.application"
 
 
@@ -163,6 +174,101 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 FRONTEND_URL = "http://localhost:5173"
 
 
+# Outbound banana API client (see MathCraft_Game/utils/http_client.py)
+BANANA_API = {
+    "CONNECT_TIMEOUT": 3,
+    "READ_TIMEOUT": 5,
+    "POOL_MAXSIZE": 10,
+    "POOL_TIMEOUT": 2,  # seconds to wait for a free pooled connection
+    "FAILURE_THRESHOLD": 5,  # consecutive failures before failing fast
+    "COOLDOWN": 30,  # seconds
+}
+
+# Pre-fetched banana puzzles (see MathCraft_Game/utils/puzzle_pool.py)
+PUZZLE_POOL = {
+    "ENABLED": True,
+    "LOW_WATERMARK": 5,
+    "HIGH_WATERMARK": 20,
+    "MAX_AGE": 600,  # seconds
+    "UPSTREAM": "remote",  # "local" renders puzzles in-process, "stub" serves placeholders (tests / offline dev)
+}
+
+# Encrypted per-question tokens returned by marcconrad_game (see MathCraft_Game/utils/question_tokens.py)
+QUESTION_TOKENS = {
+    "TTL": 900,  # seconds
+    "STATELESS": False,  # True once every client sends question_token: skips the DB write on fetch
+}
+
+# In-memory leaderboard snapshot (see MathCraft_Game/utils/leaderboard.py)
+LEADERBOARD = {
+    "REFRESH_INTERVAL": 30,  # seconds; IQ updates trigger an earlier rebuild in the same worker
+    "MIN_INTERVAL": 2,
+    "PAGE_SIZE": 20,
+    "MAX_PAGE_SIZE": 100,
+}
+
+# Active-game session store with write-behind flush (see MathCraft_Game/utils/game_sessions.py)
+GAME_SESSIONS = {
+    "ENABLED": False,
+    "BACKEND": "memory",  # "cache": keep sessions in CACHES[CACHE_ALIAS] (needed for several workers without question tokens;
+                          # any worker then flushes the sessions of one that crashed)
+    "CACHE_ALIAS": "default",
+    "IDLE_TIMEOUT": 1800,  # seconds
+    "FLUSH_INTERVAL": 5,  # seconds; at most this much of a crashed worker's play is lost (memory backend)
+}
+
+# api/batch/: several GET routes in one round trip (see MathCraft_Game/utils/batch.py)
+BATCH = {
+    "MAX_PARTS": 20,
+}
+
+# Rendered responses of public endpoints (see MathCraft_Game/utils/response_cache.py).
+# Without CACHES the default cache is per worker; point CACHE_ALIAS at a shared cache
+# so the workers share one copy, one recompute and the invalidations.
+RESPONSE_CACHE = {
+    "CACHE_ALIAS": "default",
+    "TTL": 10,  # seconds fresh (Cache-Control max-age)
+    "STALE_TTL": 120,  # seconds served stale while one worker recomputes
+    "LOCK_TIMEOUT": 30,
+}
+
+# Per-user data versions behind the dashboard ETags (see MathCraft_Game/utils/data_versions.py).
+# CACHE_ALIAS None reads the version from UserProfile (one indexed read per GET); only name
+# a cache shared by every worker, or a worker could keep answering 304 after another one's write.
+DATA_VERSIONS = {
+    "CACHE_ALIAS": None,
+    "CACHE_TIMEOUT": 3600,  # seconds
+}
+
+# Coalescing of identical concurrent GETs (see MathCraft_Game/utils/singleflight.py)
+SINGLEFLIGHT = {
+    "ENABLED": True,
+    "CROSS_PROCESS": False,  # True: also across the workers of one host, through file locks (needs fcntl)
+    "LOCK_DIR": None,  # default: <tempdir>/mathcraft-singleflight-<uid>; must be owned by the app user, mode 0700
+    "WAIT_TIMEOUT": 10,  # seconds
+}
+
+# Async dashboard views (see MathCraft_Game/views_async.py); serve through asgi.py when enabled
+ASYNC_VIEWS = {
+    "ENABLED": False,
+    "DB_WORKERS": 8,  # database connections per worker process used by the async views
+}
+
+# Precomputed number properties for hint generation (see MathCraft_Game/utils/number_index.py)
+HINT_INDEX = {
+    "LIMIT": 100000,
+    "PATH": None,  # e.g. BASE_DIR / "number_index.bin" to memory-map it across workers
+}
+
+# In-process banana puzzle generator used when PUZZLE_POOL["UPSTREAM"] == "local"
+PUZZLE_ENGINE = {
+    "SEED": 2025,
+    "POOL_SIZE": 1000,
+    "MEDIA_DIR": "puzzles",  # relative to MEDIA_ROOT
+    "IMAGE_TTL": 1800,  # seconds an issued puzzle image URL stays valid
+}
+
+
 EMAIL_BACKEND = "django.core.mail.backends.smtp.EmailBackend"
 EMAIL_HOST = "smtp.gmail.com"
 EMAIL_PORT = 587
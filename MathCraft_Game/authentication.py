@@ -0,0 +1,238 @@
+# authentication.py
+
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+from rest_framework.permissions import SAFE_METHODS
+
+from .models import AuthCacheVersion, UserProfile
+
+DEFAULT_AUTH_CACHE_SETTINGS = {
+    "MAX_SIZE": 10000,            # cached tokens per worker
+    "TTL": 30,                    # seconds an entry is trusted
+    "CROSS_WORKER": True,         # share invalidations between workers through AuthCacheVersion
+    "VERSION_CHECK_INTERVAL": 2,  # seconds between version reads when CROSS_WORKER is on
+}
+
+
+def get_auth_cache_settings():
+    return {**DEFAULT_AUTH_CACHE_SETTINGS, **getattr(settings, "AUTH_CACHE", {})}
+
+
+class TokenUserCache:
+    """
+    Bounded LRU + TTL map from token key to (token, user, profile).
+    Entries are never handed out directly; callers get copies (see user_for()).
+    """
+
+    def __init__(self, max_size=10000, ttl=30):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (expires_at, token, user, profile)
+        self._keys_by_user = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1:]
+
+    def set(self, key, token, user, profile):
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + self.ttl, token, user, profile)
+            self._keys_by_user.setdefault(user.pk, set()).add(key)
+            while len(self._entries) > self.max_size:
+                self._remove(next(iter(self._entries)))
+
+    def _remove(self, key):
+        _, _, user, _ = self._entries.pop(key)
+        keys = self._keys_by_user.get(user.pk)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_user[user.pk]
+
+    def invalidate_key(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def invalidate_user(self, user_id):
+        with self._lock:
+            for key in list(self._keys_by_user.get(user_id, ())):
+                self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_user.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+        }
+
+
+class VersionChannel:
+    """
+    Cross-worker invalidation: every worker polls the single AuthCacheVersion row
+    at most once per interval and clears its cache when the version moved, so
+    a revocation made in one worker is honoured by all of them within
+    `interval` seconds (and immediately in the worker that made it).
+    """
+
+    def __init__(self, interval):
+        self.interval = interval
+        self._seen = None
+        self._checked_at = 0.0
+
+    def changed(self):
+        now = time.monotonic()
+        if now - self._checked_at < self.interval:
+            return False
+        self._checked_at = now
+        version = AuthCacheVersion.objects.filter(pk=1).values_list('version', flat=True).first() or 0
+        changed = self._seen is not None and version != self._seen
+        self._seen = version
+        return changed
+
+    @staticmethod
+    def bump():
+        if not AuthCacheVersion.objects.filter(pk=1).update(version=F('version') + 1):
+            AuthCacheVersion.objects.get_or_create(pk=1, defaults={'version': 1})
+
+
+_cache = None
+_channel = None
+_cache_lock = threading.Lock()
+
+
+def get_token_cache():
+    global _cache, _channel
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                config = get_auth_cache_settings()
+                _channel = VersionChannel(config["VERSION_CHECK_INTERVAL"]) if config["CROSS_WORKER"] else None
+                _cache = TokenUserCache(max_size=config["MAX_SIZE"], ttl=config["TTL"])
+    return _cache
+
+
+def invalidate_token(key, broadcast=True):
+    get_token_cache().invalidate_key(key)
+    if broadcast and _channel is not None:
+        _channel.bump()
+
+
+def invalidate_user(user_id, broadcast=True):
+    get_token_cache().invalidate_user(user_id)
+    if broadcast and _channel is not None:
+        _channel.bump()
+
+
+def user_for(user, profile):
+    """Per-request copies, so one request's changes never leak into the cache."""
+    user = copy.copy(user)
+    if profile is not None:
+        profile = copy.copy(profile)
+        user.profile = profile  # sets the related-object cache both ways
+    return user
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    Drop-in replacement for TokenAuthentication that serves safe (read-only)
+    requests from an in-process token cache, with request.user.profile preloaded.
+
+    Unsafe requests always authenticate against the database and drop the
+    cached entry, so views that write to the user or profile never start from
+    a cached copy and the next read reloads the new state.
+
+    Revoked tokens (logout, deleted tokens, deactivated users, password
+    resets) are refused at once by the worker that revoked them and, with
+    AUTH_CACHE["CROSS_WORKER"] on (the default), by every other worker within
+    VERSION_CHECK_INTERVAL seconds. With it off, other workers keep accepting
+    the token for safe requests for up to TTL seconds.
+    """
+
+    def authenticate(self, request):
+        self._safe = request.method in SAFE_METHODS
+        return super().authenticate(request)
+
+    def authenticate_credentials(self, key):
+        cache = get_token_cache()
+        if _channel is not None and _channel.changed():
+            cache.clear()
+
+        if getattr(self, '_safe', False):
+            cached = cache.get(key)
+            if cached is not None:
+                token, user, profile = cached
+                return user_for(user, profile), token
+        else:
+            cache.invalidate_key(key)
+
+        model = self.get_model()
+        try:
+            token = model.objects.select_related('user', 'user__profile').get(key=key)
+        except model.DoesNotExist:
+            raise exceptions.AuthenticationFailed(_('Invalid token.'))
+
+        user = token.user
+        if not user.is_active:
+            raise exceptions.AuthenticationFailed(_('User inactive or deleted.'))
+
+        if getattr(self, '_safe', False):
+            try:
+                profile = user.profile
+            except UserProfile.DoesNotExist:
+                profile = None
+            cache.set(key, token, user, profile)
+            return user_for(user, profile), token
+        return user, token
+
+
+# ----------------------------------------------------------------------
+# Invalidation on writes made through the ORM
+# ----------------------------------------------------------------------
+@receiver(post_delete, sender=Token)
+def _token_deleted(sender, instance, **kwargs):
+    # A deleted token is a revocation: tell the other workers too
+    invalidate_token(instance.key)
+
+
+@receiver(post_save, sender=User)
+def _user_saved(sender, instance, **kwargs):
+    # Deactivation revokes access everywhere; other saves (e.g. last_login) only refresh this worker
+    invalidate_user(instance.pk, broadcast=not instance.is_active)
+
+
+@receiver(post_save, sender=UserProfile)
+def _profile_saved(sender, instance, **kwargs):
+    invalidate_user(instance.user_id, broadcast=False)
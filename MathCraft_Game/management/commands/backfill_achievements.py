@@ -0,0 +1,33 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+
+from MathCraft_Game.utils.achievements import backfill_achievements
+
+
+class Command(BaseCommand):
+    help = (
+        "Evaluates the badges users have no AchievementProgress row for yet (users from before the "
+        "badge engine), in chunks of users. Rewards of badges found unlocked are paid as on any event."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=500, help="Users evaluated per chunk.")
+        parser.add_argument("--user", type=int, action="append", dest="user_ids", help="Only evaluate these user ids.")
+
+    def handle(self, *args, **options):
+        users = User.objects.order_by("pk")
+        if options["user_ids"]:
+            users = users.filter(pk__in=options["user_ids"])
+
+        chunk_size = options["chunk_size"]
+        last_id, users_done, rows = 0, 0, 0
+        while True:
+            chunk = list(users.filter(pk__gt=last_id).values_list("pk", flat=True)[:chunk_size])
+            if not chunk:
+                break
+            rows += backfill_achievements(chunk)
+            users_done += len(chunk)
+            last_id = chunk[-1]
+            self.stdout.write(f"  {users_done} users evaluated (up to id {last_id})")
+
+        self.stdout.write(self.style.SUCCESS(f"Created {rows} badge rows for {users_done} users."))
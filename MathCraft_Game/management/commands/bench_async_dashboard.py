@@ -0,0 +1,155 @@
+import asyncio
+import json
+import statistics
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.test import RequestFactory
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+
+from MathCraft_Game import views, views_async
+from MathCraft_Game.models import GameMode, GameQuestionRecord
+from MathCraft_Game.utils.stats import sync_game_summaries
+
+
+def _percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+class SimulatedLatency:
+    """Sleeps `rtt` seconds before every statement, on every connection opened while installed."""
+
+    def __init__(self, rtt):
+        self.rtt = rtt
+
+    def __call__(self, execute, sql, params, many, context):
+        time.sleep(self.rtt)
+        return execute(sql, params, many, context)
+
+    def _attach(self, sender, connection, **kwargs):
+        if self not in connection.execute_wrappers:
+            connection.execute_wrappers.append(self)
+
+    def __enter__(self):
+        connection_created.connect(self._attach, weak=False)
+        for connection in connections.all(initialized_only=True):
+            self._attach(None, connection)
+        return self
+
+    def __exit__(self, *exc):
+        connection_created.disconnect(self._attach)
+        for connection in connections.all(initialized_only=True):
+            if self in connection.execute_wrappers:
+                connection.execute_wrappers.remove(self)
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares p50 / p99 latency of the sync dashboard views with their views_async "
+        "versions against a database with simulated round-trip time."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=100, help="Requests per view and mode.")
+        parser.add_argument("--rtt-ms", type=float, default=20.0, help="Simulated database round trip.")
+        parser.add_argument(
+            "--concurrency", type=int, default=1,
+            help="Clients in flight at once (keep it below ASYNC_VIEWS[\"DB_WORKERS\"] / 3 for the async views).",
+        )
+        parser.add_argument("--games", type=int, default=30)
+
+    def handle(self, *args, **options):
+        user = self._seed(options["games"])
+        try:
+            today = timezone.localdate()
+            factory = RequestFactory(HTTP_AUTHORIZATION=f"Token {Token.objects.create(user=user).key}")
+            cases = [
+                ("player_overview", "/api/player-overview/", {}),
+                ("user_achievements", "/api/user-achievements/", {}),
+                ("monthly_performance", "/api/monthly-performance/", {"year": today.year, "month": today.month}),
+            ]
+            with SimulatedLatency(options["rtt_ms"] / 1000):
+                for name, path, kwargs in cases:
+                    sync_view, async_view = getattr(views, name), getattr(views_async, name)
+                    call_sync = lambda: self._sync(sync_view, factory.get(path), kwargs)  # noqa: E731
+                    call_async = lambda: async_view(factory.get(path), **kwargs)  # noqa: E731
+
+                    call_sync()  # warm-up: token cache
+                    expected = json.loads(call_sync().content)
+                    got = json.loads(asyncio.run(call_async()).content)
+                    if got != expected:
+                        raise CommandError(f"{name}: async response differs:\n{expected}\n{got}")
+
+                    sync_ms = self._run_sync(call_sync, options)
+                    async_ms = asyncio.run(self._run_async(call_async, options))
+                    for label, samples in (("sync", sync_ms), ("async", async_ms)):
+                        self.stdout.write(
+                            f"{name:<20} {label:<5} p50 {statistics.median(samples):7.1f} ms  "
+                            f"p99 {_percentile(samples, 0.99):7.1f} ms"
+                        )
+                    self.stdout.write(self.style.SUCCESS(
+                        f"{name:<20} same response; sync / async p50 = "
+                        f"{statistics.median(sync_ms) / statistics.median(async_ms):.2f}"
+                    ))
+        finally:
+            user.delete()
+
+    @staticmethod
+    def _sync(view, request, kwargs):
+        response = view(request, **kwargs)
+        response.render()
+        return response
+
+    @staticmethod
+    def _timed(samples, started):
+        samples.append((time.perf_counter() - started) * 1000)
+
+    def _run_sync(self, call, options):
+        """`concurrency` threads, like a threaded WSGI worker."""
+        samples = []
+
+        def one(_):
+            started = time.perf_counter()
+            call()
+            self._timed(samples, started)
+
+        with ThreadPoolExecutor(max_workers=options["concurrency"]) as pool:
+            list(pool.map(one, range(options["requests"])))
+        return samples
+
+    async def _run_async(self, call, options):
+        """`concurrency` clients on one event loop, like an ASGI worker."""
+        samples = []
+        slots = asyncio.Semaphore(options["concurrency"])
+
+        async def one():
+            async with slots:
+                started = time.perf_counter()
+                await call()
+                self._timed(samples, started)
+
+        await asyncio.gather(*(one() for _ in range(options["requests"])))
+        return samples
+
+    def _seed(self, games):
+        user = User.objects.create_user(f"async-bench-{uuid.uuid4().hex[:12]}")
+        modes = list(GameMode.Mode)
+        GameMode.objects.bulk_create([
+            GameMode(user=user, mode=modes[i % 3], attempt=i + 1, iq=90.0 + i) for i in range(games)
+        ])
+        game_ids = list(GameMode.objects.filter(user=user).values_list('pk', flat=True))
+        GameQuestionRecord.objects.bulk_create([
+            GameQuestionRecord(game_mode_id=game_id, question_number=q, time=4, streak=q,
+                               status=GameQuestionRecord.Status.CORRECT)
+            for game_id in game_ids
+            for q in range(1, 6)
+        ])
+        sync_game_summaries(game_ids)
+        return user
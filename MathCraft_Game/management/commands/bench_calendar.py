@@ -0,0 +1,112 @@
+import random
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+
+from MathCraft_Game.utils.activity_calendar import (
+    active_days_in_month, bits_to_words, day_index, longest_run, run_ending_at, words_to_bits,
+)
+
+
+def row_streak(dates_desc):
+    """The LoginHistory walk daily_streak used to do (dates newest first)."""
+    streak = 1
+    for prev, curr in zip(dates_desc, dates_desc[1:]):
+        if (prev - curr).days != 1:
+            break
+        streak += 1
+    return streak
+
+
+def row_longest(dates_desc):
+    longest = run = 0
+    prev = None
+    for d in dates_desc:
+        run = run + 1 if prev is not None and (prev - d).days == 1 else 1
+        longest = max(longest, run)
+        prev = d
+    return longest
+
+
+def bitmap_streak(bits):
+    """Run ending at the latest active day."""
+    return run_ending_at(bits, bits.bit_length() - 1) if bits else 0
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares row-per-day login history with the per-year activity bitmap for "
+        "synthetic users: memory, streaks and monthly active-day counts."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=2000)
+        parser.add_argument("--density", type=float, default=0.7, help="Chance a user is active on a given day.")
+        parser.add_argument("--year", type=int, default=2025)
+        parser.add_argument("--seed", type=int, default=11)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        year = options["year"]
+        start = date(year, 1, 1)
+        days = (date(year + 1, 1, 1) - start).days
+
+        def synth():
+            # Active with probability `density`, with a long streak at the end of the year
+            tail = rng.randint(0, 60)
+            return [start + timedelta(d) for d in range(days) if d >= days - tail or rng.random() < options["density"]]
+
+        per_user = [synth() for _ in range(options["users"])]
+
+        tracemalloc.start()
+        rows = [sorted(dates, reverse=True) for dates in per_user]
+        rows_bytes = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+
+        tracemalloc.start()
+        bitmaps = []
+        for dates in per_user:
+            bits = 0
+            for d in dates:
+                bits |= 1 << day_index(d)
+            bitmaps.append(bits)
+        bitmap_bytes = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+
+        total_rows = sum(len(r) for r in rows)
+        self.stdout.write(
+            f"{options['users']} users, {total_rows} active days: "
+            f"rows {rows_bytes / 1024:.0f} KiB in memory ({total_rows} DB rows), "
+            f"bitmaps {bitmap_bytes / 1024:.0f} KiB ({options['users']} DB rows of 6 x 8 bytes)"
+        )
+
+        for dates, bits in zip(rows, bitmaps):
+            if words_to_bits(bits_to_words(bits)) != bits:
+                raise CommandError("Word packing is not lossless.")
+            if dates and row_streak(dates) != bitmap_streak(bits):
+                raise CommandError("Streak mismatch between rows and bitmap.")
+            if row_longest(dates) != longest_run(bits):
+                raise CommandError("Longest streak mismatch between rows and bitmap.")
+            for month in range(1, 13):
+                if sum(1 for d in dates if d.month == month) != active_days_in_month(bits, year, month):
+                    raise CommandError("Monthly active-day mismatch.")
+        self.stdout.write(self.style.SUCCESS("Streaks and monthly counts match."))
+
+        def timed(fn, data):
+            started = time.perf_counter()
+            for item in data:
+                fn(item)
+            return (time.perf_counter() - started) / len(data) * 1e6
+
+        rows_streak = timed(row_streak, rows)
+        bits_streak = timed(bitmap_streak, bitmaps)
+        rows_month = timed(lambda r: [sum(1 for d in r if d.month == m) for m in range(1, 13)], rows)
+        bits_month = timed(lambda b: [active_days_in_month(b, year, m) for m in range(1, 13)], bitmaps)
+        rows_longest = timed(row_longest, rows)
+        bits_longest = timed(longest_run, bitmaps)
+
+        self.stdout.write(f"{'current streak':<22} rows {rows_streak:8.2f} us   bitmap {bits_streak:8.2f} us")
+        self.stdout.write(f"{'active days x 12':<22} rows {rows_month:8.2f} us   bitmap {bits_month:8.2f} us")
+        self.stdout.write(f"{'longest streak':<22} rows {rows_longest:8.2f} us   bitmap {bits_longest:8.2f} us")
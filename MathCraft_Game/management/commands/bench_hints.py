@@ -0,0 +1,48 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from MathCraft_Game.utils.hints import collect_clues_indexed, collect_clues_reference
+from MathCraft_Game.utils.number_index import NumberPropertyIndex, get_number_index
+
+
+class Command(BaseCommand):
+    help = (
+        "Checks that the indexed hint clues match the reference implementation over the "
+        "whole index range, then micro-benchmarks both."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--samples", type=int, default=50000, help="Random lookups per benchmark run.")
+        parser.add_argument("--skip-check", action="store_true", help="Skip the full-range equivalence check.")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        NumberPropertyIndex.build(get_number_index().limit)
+        build_seconds = time.perf_counter() - started
+        index = get_number_index()
+        self.stdout.write(f"Index 0..{index.limit}: built in {build_seconds * 1000:.1f} ms")
+
+        if not options["skip_check"]:
+            for sign in ("POSITIVE", "NEGATIVE"):
+                for n in range(index.limit + 1):
+                    expected = collect_clues_reference(n, sign)
+                    actual = collect_clues_indexed(n, sign, index)
+                    if expected != actual:
+                        raise CommandError(f"Mismatch for {sign} {n}: {actual!r} != {expected!r}")
+            self.stdout.write(self.style.SUCCESS(f"Equivalent over 0..{index.limit} for both signs."))
+
+        values = [random.randint(10, index.limit) for _ in range(options["samples"])]
+        timings = {}
+        for label, fn in (
+            ("reference", lambda n: collect_clues_reference(n, "POSITIVE")),
+            ("indexed", lambda n: collect_clues_indexed(n, "POSITIVE", index)),
+        ):
+            started = time.perf_counter()
+            for n in values:
+                fn(n)
+            timings[label] = (time.perf_counter() - started) / len(values)
+            self.stdout.write(f"{label:<10} {timings[label] * 1e6:8.2f} us/hint")
+
+        self.stdout.write(f"Speed-up: {timings['reference'] / timings['indexed']:.1f}x")
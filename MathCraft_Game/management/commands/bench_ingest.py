@@ -0,0 +1,85 @@
+import io
+import json
+import time
+import uuid
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from MathCraft_Game.models import GameMode, GameQuestionRecord
+from MathCraft_Game.serializers import GameQuestionRecordSerializer
+from MathCraft_Game.utils.ingest import ingest_question_records, iter_json_array, iter_ndjson
+from MathCraft_Game.utils.stats import sync_game_summaries
+
+
+def legacy_ingest(records):
+    """What CreateGameRecordsView did before: many=True serializer, row-by-row save."""
+    serializer = GameQuestionRecordSerializer(data=records, many=True)
+    serializer.is_valid(raise_exception=True)
+    with transaction.atomic():
+        saved = serializer.save()
+        sync_game_summaries(record.game_mode_id for record in saved)
+    return len(saved)
+
+
+class Command(BaseCommand):
+    help = "Compares the streaming bulk ingestion path with the previous per-row path for one upload."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--records", type=int, default=1000)
+        parser.add_argument("--keep", action="store_true", help="Keep the throwaway user and its games.")
+
+    def handle(self, *args, **options):
+        count = options["records"]
+        user = User.objects.create_user(f"ingest-bench-{uuid.uuid4().hex[:12]}")
+        try:
+            games = [GameMode.objects.create(user=user, mode=GameMode.Mode.EASY, attempt=i) for i in (1, 2, 3)]
+
+            def payload(game):
+                return [
+                    {"game_mode": game.id, "question_number": i, "time": 3, "streak": i % 5,
+                     "user_answer": "4", "correct_answer": "4", "status": "correct"}
+                    for i in range(1, count + 1)
+                ]
+
+            body = json.dumps(payload(games[1])).encode()
+            ndjson = "\n".join(json.dumps(r) for r in payload(games[2])).encode()
+
+            results = {}
+            for label, run in (
+                ("per-row (before)", lambda: legacy_ingest(payload(games[0]))),
+                ("bulk, JSON array", lambda: self._bulk(user, iter_json_array(io.BytesIO(body)))),
+                ("bulk, NDJSON", lambda: self._bulk(user, iter_ndjson(io.BytesIO(ndjson)))),
+            ):
+                with CaptureQueriesContext(connection) as queries:
+                    started = time.perf_counter()
+                    saved = run()
+                    elapsed = time.perf_counter() - started
+                if saved != count:
+                    raise CommandError(f"{label}: saved {saved} of {count} records.")
+                results[label] = (elapsed, len(queries))
+                self.stdout.write(f"{label:<18} {elapsed * 1000:9.1f} ms  {len(queries):6d} queries")
+
+            rows = [
+                sorted(GameQuestionRecord.objects.filter(game_mode=game)
+                       .values_list('question_number', 'time', 'streak', 'user_answer', 'correct_answer', 'status'))
+                for game in games
+            ]
+            if not rows[0] == rows[1] == rows[2]:
+                raise CommandError("The paths stored different records.")
+            baseline = results["per-row (before)"][0]
+            self.stdout.write(self.style.SUCCESS(
+                f"Same rows stored; JSON-array bulk path is {baseline / results['bulk, JSON array'][0]:.1f}x faster."
+            ))
+        finally:
+            if not options["keep"]:
+                user.delete()
+
+    @staticmethod
+    def _bulk(user, records):
+        with transaction.atomic():
+            saved, game_mode_ids = ingest_question_records(user, records)
+            sync_game_summaries(game_mode_ids)
+        return saved
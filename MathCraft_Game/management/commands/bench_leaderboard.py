@@ -0,0 +1,72 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from MathCraft_Game.utils.leaderboard import LeaderboardSnapshot
+from MathCraft_Game.utils.stats import MODES
+
+
+class Command(BaseCommand):
+    help = (
+        "Builds a leaderboard snapshot for synthetic players and compares its reads "
+        "against sorting every player per request (what leaderboard_view used to do)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=100000, help="Synthetic players per mode.")
+        parser.add_argument("--lookups", type=int, default=10000, help="Reads per benchmark run.")
+        parser.add_argument("--seed", type=int, default=7)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        users, lookups = options["users"], options["lookups"]
+        rows = [
+            (mode, user_id, f"player{user_id}", float(rng.randint(0, 40) * 100 + rng.randint(0, 150)))
+            for mode in MODES
+            for user_id in range(1, users + 1)
+        ]
+
+        started = time.perf_counter()
+        snapshot = LeaderboardSnapshot(rows)
+        build_ms = (time.perf_counter() - started) * 1000
+        self.stdout.write(f"Snapshot for {users} players x {len(MODES)} modes built in {build_ms:.1f} ms")
+
+        # Correctness: top-K and ranks must agree with a straight sort
+        by_mode = {mode: sorted((r for r in rows if r[0] == mode), key=lambda r: (-r[3], r[2])) for mode in MODES}
+        for mode in MODES:
+            expected = [(r[2], int(r[3])) for r in by_mode[mode][:50]]
+            actual = [(r["username"], r["overall_score"]) for r in snapshot.top(mode, 50)]
+            if expected != actual:
+                raise CommandError(f"Top-50 mismatch for {mode}.")
+            for user_id in rng.sample(range(1, users + 1), 200):
+                me, _ = snapshot.around(mode, user_id, 0)
+                score = next(r[3] for r in by_mode[mode] if r[1] == user_id)
+                if me["rank"] != 1 + sum(1 for r in by_mode[mode] if r[3] > score):
+                    raise CommandError(f"Rank mismatch for user {user_id} in {mode}.")
+        self.stdout.write(self.style.SUCCESS("Top-K and ranks match a full sort."))
+
+        # Old approach: sort every player of a mode for each request
+        mode_rows = [r for r in rows if r[0] == "hard"]
+        runs = max(lookups // 1000, 3)
+        started = time.perf_counter()
+        for _ in range(runs):
+            sorted(mode_rows, key=lambda r: -r[3])[:5]
+        full_sort_us = (time.perf_counter() - started) / runs * 1e6
+
+        timings = {}
+        user_ids = [rng.randint(1, users) for _ in range(lookups)]
+        pages = [rng.randint(1, users // 20) for _ in range(lookups)]
+        for label, fn in (
+            ("top-5", lambda i: snapshot.top("hard", 5)),
+            ("page (20)", lambda i: snapshot.page("hard", pages[i], 20)),
+            ("rank-of-me", lambda i: snapshot.around("hard", user_ids[i], 2)),
+        ):
+            started = time.perf_counter()
+            for i in range(lookups):
+                fn(i)
+            timings[label] = (time.perf_counter() - started) / lookups * 1e6
+
+        self.stdout.write(f"{'full sort':<12} {full_sort_us:10.2f} us/request")
+        for label, us in timings.items():
+            self.stdout.write(f"{label:<12} {us:10.2f} us/request  ({full_sort_us / us:,.0f}x)")
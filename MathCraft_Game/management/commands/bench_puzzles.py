@@ -0,0 +1,40 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from MathCraft_Game.utils.puzzle_engine import get_local_provider
+from MathCraft_Game.utils.puzzle_pool import fetch_banana_puzzle
+
+
+class Command(BaseCommand):
+    help = "Benchmarks questions/sec of the local puzzle provider against the remote banana API."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--count", type=int, default=200, help="Questions drawn from the local provider.")
+        parser.add_argument("--remote-count", type=int, default=10, help="Questions fetched from the remote API.")
+        parser.add_argument("--skip-remote", action="store_true", help="Only benchmark the local provider.")
+
+    def _run(self, label, fetch, count):
+        started = time.perf_counter()
+        failures = 0
+        for _ in range(count):
+            try:
+                fetch()
+            except Exception:
+                failures += 1
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f"{label:<22} {count:>6} questions  {elapsed:8.3f}s  "
+            f"{count / elapsed:10.1f} q/s  {failures} failed"
+        )
+
+    def handle(self, *args, **options):
+        provider = get_local_provider()
+
+        started = time.perf_counter()
+        written = provider.render_all()
+        self.stdout.write(f"Pre-render: {written} images in {time.perf_counter() - started:.2f}s")
+
+        self._run("local (pre-rendered)", provider, options["count"])
+        if not options["skip_remote"]:
+            self._run("remote banana API", fetch_banana_puzzle, options["remote_count"])
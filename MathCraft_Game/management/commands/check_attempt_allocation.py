@@ -0,0 +1,63 @@
+import threading
+import uuid
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from MathCraft_Game.models import GameMode
+from MathCraft_Game.utils.attempts import allocate_attempt
+
+
+class Command(BaseCommand):
+    help = (
+        "Starts many games for one throwaway user at the same moment from parallel "
+        "threads and checks the attempt numbers are unique and gap-free."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=32)
+        parser.add_argument("--games-per-thread", type=int, default=5)
+        parser.add_argument("--keep", action="store_true", help="Keep the throwaway user and its games.")
+
+    def handle(self, *args, **options):
+        threads, per_thread = options["threads"], options["games_per_thread"]
+        user = User.objects.create_user(f"attempt-check-{uuid.uuid4().hex[:12]}")
+        today = timezone.localdate()
+        barrier = threading.Barrier(threads)
+        errors = []
+
+        def worker():
+            try:
+                barrier.wait()
+                for _ in range(per_thread):
+                    with transaction.atomic():
+                        GameMode.objects.create(
+                            user=user, mode=GameMode.Mode.EASY, attempt=allocate_attempt(user.id, today), date=today
+                        )
+            except Exception as exc:  # reported below
+                errors.append(exc)
+            finally:
+                connection.close()
+
+        try:
+            pool = [threading.Thread(target=worker) for _ in range(threads)]
+            for t in pool:
+                t.start()
+            for t in pool:
+                t.join()
+
+            if errors:
+                raise CommandError(f"{len(errors)} thread(s) failed, first error: {errors[0]!r}")
+
+            attempts = sorted(GameMode.objects.filter(user=user, date=today).values_list('attempt', flat=True))
+            expected = list(range(1, threads * per_thread + 1))
+            if attempts != expected:
+                raise CommandError(f"Attempt numbers are not unique and gap-free: {attempts}")
+            self.stdout.write(self.style.SUCCESS(
+                f"{threads} threads x {per_thread} games: attempts 1..{len(attempts)}, unique and gap-free."
+            ))
+        finally:
+            if not options["keep"]:
+                user.delete()
@@ -0,0 +1,102 @@
+import uuid
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Count, Sum
+from django.utils import timezone
+
+from MathCraft_Game.models import GameMode, GameQuestionRecord
+
+Mode, Status = GameMode.Mode, GameQuestionRecord.Status
+
+
+class Rollback(Exception):
+    pass
+
+
+def dashboard_queries(user, game_ids, today):
+    """(label, queryset, model, columns of the index it must use) for the per-user dashboard reads."""
+    month_start = timezone.now() - timedelta(days=30)
+    return [
+        ("recent_activity / last_ten_games_chart",
+         GameMode.objects.filter(user=user).order_by('-created_at')[:10],
+         GameMode, ['user_id', 'created_at']),
+        ("monthly_performance: attempts in month",
+         GameMode.objects.filter(user=user, created_at__gte=month_start),
+         GameMode, ['user_id', 'created_at']),
+        ("monthly_performance: IQ per mode",
+         GameMode.objects.filter(user=user, mode=Mode.HARD, created_at__gte=month_start).values('user').annotate(total=Sum('iq')),
+         GameMode, ['user_id', 'mode', 'created_at']),
+        ("mode_distribution_chart",
+         GameMode.objects.filter(user=user).values_list('mode').annotate(count=Count('id')).order_by(),
+         GameMode, ['user_id', 'mode', 'created_at']),
+        ("lightning_solver badge",
+         GameMode.objects.filter(user=user, mode=Mode.HARD, total_streak=50),
+         GameMode, ['user_id', 'mode', 'created_at']),
+        ("today's attempts",
+         GameMode.objects.filter(user=user, date=today),
+         GameMode, ['user_id', 'date', 'attempt']),
+        ("correct answers of attempts",
+         GameQuestionRecord.objects.filter(game_mode_id__in=game_ids, status=Status.CORRECT),
+         GameQuestionRecord, ['game_mode_id', 'status']),
+    ]
+
+
+def index_names(model, columns):
+    with connection.cursor() as cursor:
+        constraints = connection.introspection.get_constraints(cursor, model._meta.db_table)
+    return {name for name, info in constraints.items() if (info['index'] or info['unique']) and info['columns'] == columns}
+
+
+class Command(BaseCommand):
+    help = (
+        "Seeds a throwaway history (rolled back afterwards), runs EXPLAIN on the "
+        "dashboard queries and fails unless each one uses its supporting index."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--games", type=int, default=300, help="Attempts for the user under test.")
+        parser.add_argument("--other-users", type=int, default=20)
+        parser.add_argument("--questions", type=int, default=10, help="Question records per attempt.")
+
+    def handle(self, *args, **options):
+        failures = []
+        try:
+            with transaction.atomic():
+                user, game_ids = self._seed(options)
+                for label, queryset, model, columns in dashboard_queries(user, game_ids, timezone.localdate()):
+                    names = index_names(model, columns)
+                    plan = queryset.explain()
+                    used = sorted(name for name in names if name in plan)
+                    ok = bool(used)
+                    if not ok:
+                        failures.append(label)
+                    self.stdout.write(f"{'ok  ' if ok else 'FAIL'} {label:<42} ({', '.join(columns)}) {', '.join(used)}")
+                    if options["verbosity"] > 1 or not ok:
+                        for line in plan.splitlines():
+                            self.stdout.write(f"       {line}")
+                raise Rollback
+        except Rollback:
+            pass
+
+        if failures:
+            raise CommandError(f"{len(failures)} dashboard queries do not use their index: {', '.join(failures)}")
+        self.stdout.write(self.style.SUCCESS("Every dashboard query uses its index."))
+
+    def _seed(self, options):
+        modes = list(Mode)
+        users = [User.objects.create_user(f"explain-{uuid.uuid4().hex[:12]}") for _ in range(options["other_users"] + 1)]
+        GameMode.objects.bulk_create([
+            GameMode(user=user, mode=modes[i % 3], attempt=i + 1)
+            for user in users
+            for i in range(options["games"] if user is users[0] else max(options["games"] // 10, 1))
+        ])
+        games = list(GameMode.objects.filter(user__in=users))  # MySQL does not return bulk-inserted keys
+        GameQuestionRecord.objects.bulk_create([
+            GameQuestionRecord(game_mode=game, question_number=q, status=[Status.CORRECT, Status.INCORRECT][q % 2])
+            for game in games
+            for q in range(1, options["questions"] + 1)
+        ], batch_size=1000)
+        return users[0], [game.pk for game in games if game.user_id == users[0].pk][:20]
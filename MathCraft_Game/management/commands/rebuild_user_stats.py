@@ -0,0 +1,30 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+
+from MathCraft_Game.utils.stats import rebuild_user_stats
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the UserStats table from GameMode / GameQuestionRecord history, in chunks of users."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=500, help="Users rebuilt per transaction.")
+        parser.add_argument("--user", type=int, action="append", dest="user_ids", help="Only rebuild these user ids.")
+
+    def handle(self, *args, **options):
+        users = User.objects.order_by("pk")
+        if options["user_ids"]:
+            users = users.filter(pk__in=options["user_ids"])
+
+        chunk_size = options["chunk_size"]
+        last_id, users_done, rows = 0, 0, 0
+        while True:
+            chunk = list(users.filter(pk__gt=last_id).values_list("pk", flat=True)[:chunk_size])
+            if not chunk:
+                break
+            rows += rebuild_user_stats(chunk)
+            users_done += len(chunk)
+            last_id = chunk[-1]
+            self.stdout.write(f"  {users_done} users rebuilt (up to id {last_id})")
+
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {rows} stats rows for {users_done} users."))
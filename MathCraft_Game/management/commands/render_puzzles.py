@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from MathCraft_Game.utils.puzzle_engine import get_local_provider
+
+
+class Command(BaseCommand):
+    help = "Pre-renders the seeded local banana puzzle pool into MEDIA_ROOT."
+
+    def handle(self, *args, **options):
+        provider = get_local_provider()
+        written = provider.render_all()
+        self.stdout.write(self.style.SUCCESS(
+            f"Puzzle pool seed={provider.seed}: {written} rendered, "
+            f"{provider.pool_size - written} already present."
+        ))
@@ -0,0 +1,58 @@
+# Generated by Django 5.2.8 on 2026-10-16 23:55
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("MathCraft_Game", "0013_userprofile_photo"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="UserStats",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("mode", models.CharField(max_length=50)),
+                ("games_played", models.PositiveIntegerField(default=0)),
+                ("questions_answered", models.PositiveIntegerField(default=0)),
+                ("correct_answers", models.PositiveIntegerField(default=0)),
+                ("iq_sum", models.FloatField(default=0)),
+                ("iq_count", models.PositiveIntegerField(default=0)),
+                ("best_iq", models.FloatField(blank=True, null=True)),
+                ("best_streak", models.PositiveIntegerField(default=0)),
+                (
+                    "fastest_time",
+                    models.PositiveIntegerField(
+                        blank=True,
+                        help_text="Fastest finished attempt in seconds",
+                        null=True,
+                    ),
+                ),
+                ("qualifying_games", models.PositiveIntegerField(default=0)),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="stats",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("user", "mode")},
+            },
+        ),
+    ]
@@ -0,0 +1,67 @@
+# Generated by Django 5.2.8 on 2026-10-16 23:57
+
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import Coalesce
+
+SUMMARY_FIELDS = ["total_streak", "total_time", "correct_count", "question_count"]
+
+
+def backfill_game_summaries(apps, schema_editor):
+    GameMode = apps.get_model("MathCraft_Game", "GameMode")
+    GameQuestionRecord = apps.get_model("MathCraft_Game", "GameQuestionRecord")
+
+    totals = (
+        GameQuestionRecord.objects.values("game_mode_id")
+        .annotate(
+            total_streak=Coalesce(Sum("streak"), 0),
+            total_time=Coalesce(Sum("time"), 0),
+            correct_count=Count("id", filter=Q(status="correct")),
+            question_count=Count("id", filter=~Q(status="")),
+        )
+        .order_by()
+    )
+
+    batch = []
+    for row in totals.iterator(chunk_size=2000):
+        batch.append(GameMode(pk=row.pop("game_mode_id"), **row))
+        if len(batch) >= 1000:
+            GameMode.objects.bulk_update(batch, SUMMARY_FIELDS)
+            batch = []
+    if batch:
+        GameMode.objects.bulk_update(batch, SUMMARY_FIELDS)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("MathCraft_Game", "0014_userstats"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="gamemode",
+            name="correct_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="gamemode",
+            name="question_count",
+            field=models.PositiveIntegerField(
+                default=0, help_text="Answered questions"
+            ),
+        ),
+        migrations.AddField(
+            model_name="gamemode",
+            name="total_streak",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="gamemode",
+            name="total_time",
+            field=models.PositiveIntegerField(
+                default=0, help_text="Sum of question times in seconds"
+            ),
+        ),
+        migrations.RunPython(backfill_game_summaries, migrations.RunPython.noop),
+    ]
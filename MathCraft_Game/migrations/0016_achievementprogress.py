@@ -0,0 +1,47 @@
+# Generated by Django 5.2.8 on 2026-10-17 00:02
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("MathCraft_Game", "0015_gamemode_summary_columns"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AchievementProgress",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("badge_name", models.CharField(max_length=100)),
+                ("progress", models.JSONField(default=dict)),
+                ("unlocked", models.BooleanField(default=False)),
+                ("unlocked_at", models.DateTimeField(blank=True, null=True)),
+                ("reward_seen", models.BooleanField(default=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="achievement_progress",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("user", "badge_name")},
+            },
+        ),
+    ]
@@ -0,0 +1,74 @@
+# Generated by Django 5.2.8 on 2026-10-17 00:03
+
+from django.db import migrations, models
+
+STREAK_FIELDS = ["current_streak", "longest_streak", "last_active_date"]
+
+
+def backfill_streaks(apps, schema_editor):
+    """Derives the streak counters from LoginHistory, one user at a time in date order."""
+    LoginHistory = apps.get_model("MathCraft_Game", "LoginHistory")
+    UserProfile = apps.get_model("MathCraft_Game", "UserProfile")
+
+    profiles = dict(UserProfile.objects.values_list("user_id", "pk"))
+    rows = (
+        LoginHistory.objects.order_by("user_id", "login_date")
+        .values_list("user_id", "login_date")
+        .iterator(chunk_size=5000)
+    )
+
+    batch = []
+
+    def flush_user(user_id, current, longest, last):
+        if user_id in profiles:
+            batch.append(
+                UserProfile(
+                    pk=profiles[user_id],
+                    current_streak=current,
+                    longest_streak=longest,
+                    last_active_date=last,
+                )
+            )
+
+    user_id = current = longest = last = None
+    for row_user, day in rows:
+        if row_user != user_id:
+            if user_id is not None:
+                flush_user(user_id, current, longest, last)
+            user_id, current, longest, last = row_user, 0, 0, None
+        current = current + 1 if last is not None and (day - last).days == 1 else 1
+        longest = max(longest, current)
+        last = day
+        if len(batch) >= 1000:
+            UserProfile.objects.bulk_update(batch, STREAK_FIELDS)
+            batch = []
+    if user_id is not None:
+        flush_user(user_id, current, longest, last)
+    if batch:
+        UserProfile.objects.bulk_update(batch, STREAK_FIELDS)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("MathCraft_Game", "0016_achievementprogress"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="userprofile",
+            name="current_streak",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="userprofile",
+            name="last_active_date",
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="userprofile",
+            name="longest_streak",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_streaks, migrations.RunPython.noop),
+    ]
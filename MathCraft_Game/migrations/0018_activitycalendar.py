@@ -0,0 +1,76 @@
+# Generated by Django 5.2.8 on 2026-10-17 00:04
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+WORD_BITS = 61
+WORDS = 6
+
+
+def fold_login_history(apps, schema_editor):
+    """Sets one calendar bit per existing LoginHistory row."""
+    LoginHistory = apps.get_model("MathCraft_Game", "LoginHistory")
+    ActivityCalendar = apps.get_model("MathCraft_Game", "ActivityCalendar")
+
+    calendars = {}
+    for user_id, day in LoginHistory.objects.values_list(
+        "user_id", "login_date"
+    ).iterator(chunk_size=5000):
+        key = (user_id, day.year)
+        calendars[key] = calendars.get(key, 0) | 1 << (day.timetuple().tm_yday - 1)
+
+    mask = (1 << WORD_BITS) - 1
+    rows = [
+        ActivityCalendar(
+            user_id=user_id,
+            year=year,
+            **{f"w{i}": (bits >> (i * WORD_BITS)) & mask for i in range(WORDS)},
+        )
+        for (user_id, year), bits in calendars.items()
+    ]
+    ActivityCalendar.objects.bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("MathCraft_Game", "0017_userprofile_streaks"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ActivityCalendar",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("year", models.PositiveSmallIntegerField()),
+                ("w0", models.BigIntegerField(default=0)),
+                ("w1", models.BigIntegerField(default=0)),
+                ("w2", models.BigIntegerField(default=0)),
+                ("w3", models.BigIntegerField(default=0)),
+                ("w4", models.BigIntegerField(default=0)),
+                ("w5", models.BigIntegerField(default=0)),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="activity_calendars",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("user", "year")},
+            },
+        ),
+        migrations.RunPython(fold_login_history, migrations.RunPython.noop),
+    ]
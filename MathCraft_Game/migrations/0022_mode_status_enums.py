@@ -0,0 +1,134 @@
+# Generated by Django 5.2.8 on 2026-10-17 00:40
+
+from django.db import migrations, models
+from django.db.models.functions import Lower, Trim
+
+MODES = {"easy": 1, "intermediate": 2, "hard": 3}
+STATUSES = {"": 0, "correct": 1, "incorrect": 2, "skipped": 3}
+
+
+def _encode(queryset, source, target, codes):
+    """One UPDATE per known name (casing and padding normalized); unknown names abort."""
+    normalized = queryset.annotate(normalized=Lower(Trim(source)))
+    for name, code in codes.items():
+        normalized.filter(normalized=name).update(**{target: code})
+    unknown = sorted(
+        set(
+            queryset.filter(**{f"{target}__isnull": True}).values_list(
+                source, flat=True
+            )
+        )
+    )
+    if unknown:
+        raise RuntimeError(
+            f"{queryset.model.__name__}.{source} has values outside {sorted(codes)}: {unknown[:20]}. "
+            "Fix or delete those rows, then run the migration again."
+        )
+
+
+def encode_choices(apps, schema_editor):
+    GameMode = apps.get_model("MathCraft_Game", "GameMode")
+    GameQuestionRecord = apps.get_model("MathCraft_Game", "GameQuestionRecord")
+    _encode(GameMode.objects.all(), "mode", "mode_code", MODES)
+    _encode(GameQuestionRecord.objects.all(), "status", "status_code", STATUSES)
+
+
+def decode_choices(apps, schema_editor):
+    GameMode = apps.get_model("MathCraft_Game", "GameMode")
+    GameQuestionRecord = apps.get_model("MathCraft_Game", "GameQuestionRecord")
+    for name, code in MODES.items():
+        GameMode.objects.filter(mode_code=code).update(mode=name)
+    for name, code in STATUSES.items():
+        GameQuestionRecord.objects.filter(status_code=code).update(status=name)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("MathCraft_Game", "0021_dailyattemptcounter"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="gamemode",
+            name="mode_code",
+            field=models.PositiveSmallIntegerField(null=True),
+        ),
+        migrations.AddField(
+            model_name="gamequestionrecord",
+            name="status_code",
+            field=models.PositiveSmallIntegerField(null=True),
+        ),
+        # Defaults on the old columns only matter when the migration is reversed
+        migrations.AlterField(
+            model_name="gamemode",
+            name="mode",
+            field=models.CharField(default="", max_length=50),
+        ),
+        migrations.AlterField(
+            model_name="gamequestionrecord",
+            name="status",
+            field=models.CharField(
+                blank=True,
+                choices=[
+                    ("correct", "Correct"),
+                    ("incorrect", "Incorrect"),
+                    ("skipped", "Skipped"),
+                ],
+                default="",
+                max_length=20,
+            ),
+        ),
+        migrations.RunPython(encode_choices, decode_choices),
+        migrations.RemoveField(
+            model_name="gamemode",
+            name="mode",
+        ),
+        migrations.RemoveField(
+            model_name="gamequestionrecord",
+            name="status",
+        ),
+        migrations.RenameField(
+            model_name="gamemode",
+            old_name="mode_code",
+            new_name="mode",
+        ),
+        migrations.RenameField(
+            model_name="gamequestionrecord",
+            old_name="status_code",
+            new_name="status",
+        ),
+        migrations.AlterField(
+            model_name="gamemode",
+            name="mode",
+            field=models.PositiveSmallIntegerField(
+                choices=[(1, "easy"), (2, "intermediate"), (3, "hard")]
+            ),
+        ),
+        migrations.AlterField(
+            model_name="gamequestionrecord",
+            name="status",
+            field=models.PositiveSmallIntegerField(
+                choices=[(0, ""), (1, "correct"), (2, "incorrect"), (3, "skipped")],
+                default=0,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="gamemode",
+            index=models.Index(
+                fields=["user", "mode", "created_at"], name="gamemode_user_mode_created"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="gamemode",
+            index=models.Index(
+                fields=["user", "created_at"], name="gamemode_user_created"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="gamequestionrecord",
+            index=models.Index(
+                fields=["game_mode", "status"], name="record_game_mode_status"
+            ),
+        ),
+    ]
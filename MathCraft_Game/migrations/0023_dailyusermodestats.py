@@ -0,0 +1,59 @@
+# Generated by Django 5.2.8 on 2026-10-17 00:20
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("MathCraft_Game", "0022_mode_status_enums"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DailyUserModeStats",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.DateField()),
+                (
+                    "mode",
+                    models.PositiveSmallIntegerField(
+                        choices=[(1, "easy"), (2, "intermediate"), (3, "hard")]
+                    ),
+                ),
+                ("games", models.PositiveIntegerField(default=0)),
+                ("iq_sum", models.FloatField(default=0)),
+                ("iq_count", models.PositiveIntegerField(default=0)),
+                ("correct", models.PositiveIntegerField(default=0)),
+                (
+                    "time",
+                    models.PositiveIntegerField(
+                        default=0, help_text="Sum of question times in seconds"
+                    ),
+                ),
+                ("streak", models.PositiveIntegerField(default=0)),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="daily_stats",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("user", "day", "mode")},
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-17 00:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("MathCraft_Game", "0023_dailyusermodestats"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="userprofile",
+            name="data_version",
+            field=models.BigIntegerField(default=0),
+        ),
+    ]
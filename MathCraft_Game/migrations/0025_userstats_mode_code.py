@@ -0,0 +1,72 @@
+# Generated by Django 5.2.8 on 2026-10-17 09:12
+
+from django.db import migrations, models
+from django.db.models.functions import Lower, Trim
+
+MODES = {"easy": 1, "intermediate": 2, "hard": 3}
+
+
+def encode_modes(apps, schema_editor):
+    """One UPDATE per mode name (casing and padding normalized); unknown names abort."""
+    UserStats = apps.get_model("MathCraft_Game", "UserStats")
+    normalized = UserStats.objects.annotate(normalized=Lower(Trim("mode")))
+    for name, code in MODES.items():
+        normalized.filter(normalized=name).update(mode_code=code)
+    unknown = sorted(set(UserStats.objects.filter(mode_code__isnull=True).values_list("mode", flat=True)))
+    if unknown:
+        raise RuntimeError(
+            f"UserStats.mode has values outside {sorted(MODES)}: {unknown[:20]}. "
+            "Delete those rows and run `manage.py rebuild_user_stats` after the migration."
+        )
+
+
+def decode_modes(apps, schema_editor):
+    UserStats = apps.get_model("MathCraft_Game", "UserStats")
+    for name, code in MODES.items():
+        UserStats.objects.filter(mode_code=code).update(mode=name)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("MathCraft_Game", "0024_userprofile_data_version"),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name="userstats",
+            unique_together=set(),
+        ),
+        migrations.AddField(
+            model_name="userstats",
+            name="mode_code",
+            field=models.PositiveSmallIntegerField(null=True),
+        ),
+        # The default on the old column only matters when the migration is reversed
+        migrations.AlterField(
+            model_name="userstats",
+            name="mode",
+            field=models.CharField(default="", max_length=50),
+        ),
+        migrations.RunPython(encode_modes, decode_modes),
+        migrations.RemoveField(
+            model_name="userstats",
+            name="mode",
+        ),
+        migrations.RenameField(
+            model_name="userstats",
+            old_name="mode_code",
+            new_name="mode",
+        ),
+        migrations.AlterField(
+            model_name="userstats",
+            name="mode",
+            field=models.PositiveSmallIntegerField(
+                choices=[(1, "easy"), (2, "intermediate"), (3, "hard")]
+            ),
+        ),
+        migrations.AlterUniqueTogether(
+            name="userstats",
+            unique_together={("user", "mode")},
+        ),
+    ]
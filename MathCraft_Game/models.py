@@ -1,19 +1,48 @@
 from django.db import models
 from django.contrib.auth.models import User
 
+
+class NamedChoices(models.IntegerChoices):
+    """Integer choices whose labels are the names the API speaks ('easy', 'correct', ...)."""
+
+    @classmethod
+    def parse(cls, name):
+        """Member for a label (case and surrounding spaces ignored), or None."""
+        name = str(name).strip().lower()
+        for member in cls:
+            if member.label == name:
+                return member
+        return None
+
+
 class GameMode(models.Model):
+    class Mode(NamedChoices):
+        EASY = 1, 'easy'
+        INTERMEDIATE = 2, 'intermediate'
+        HARD = 3, 'hard'
+
     user = models.ForeignKey(User, on_delete=models.CASCADE)
-    mode = models.CharField(max_length=50)  # 'easy', 'intermediate', 'hard'
+    mode = models.PositiveSmallIntegerField(choices=Mode.choices)
     attempt = models.PositiveIntegerField()  # attempt number for the day
     created_at = models.DateTimeField(auto_now_add=True)
     date = models.DateField(auto_now_add=True)  # new field for daily grouping
     iq = models.FloatField(null=True, blank=True, help_text="Overall IQ for this attempt")
 
+    # Per-attempt summary of the question records, kept in sync by utils.stats.sync_game_summaries
+    total_streak = models.PositiveIntegerField(default=0)
+    total_time = models.PositiveIntegerField(default=0, help_text="Sum of question times in seconds")
+    correct_count = models.PositiveIntegerField(default=0)
+    question_count = models.PositiveIntegerField(default=0, help_text="Answered questions")
+
     class Meta:
-        unique_together = ('user', 'date', 'attempt')  # enforces 1,2,3... per day
+        unique_together = ('user', 'date', 'attempt')  # enforces 1,2,3... per day (and serves (user, date) lookups)
+        indexes = [
+            models.Index(fields=['user', 'mode', 'created_at'], name='gamemode_user_mode_created'),
+            models.Index(fields=['user', 'created_at'], name='gamemode_user_created'),
+        ]
 
     def __str__(self):
-        return f"{self.user.username} | {self.mode} | Attempt {self.attempt} | {self.date} | IQ: {self.iq}"
+        return f"{self.user.username} | {self.get_mode_display()} | Attempt {self.attempt} | {self.date} | IQ: {self.iq}"
 
 
 class GameQuestionRecord(models.Model):
@@ -26,26 +55,41 @@ class GameQuestionRecord(models.Model):
     streak = models.PositiveIntegerField(default=0)  # usually 0 by default, no need for null
     user_answer = models.CharField(max_length=255, blank=True)  # blank allows empty string
     correct_answer = models.CharField(max_length=255, blank=True)
-    status = models.CharField(
-    max_length=20, 
-    choices=[
-        ('correct', 'Correct'),
-        ('incorrect', 'Incorrect'),
-        ('skipped', 'Skipped'),
-    ],
-    blank=True  # optional if status not yet set
-) 
+
+    class Status(NamedChoices):
+        UNANSWERED = 0, ''  # fetched but not answered yet
+        CORRECT = 1, 'correct'
+        INCORRECT = 2, 'incorrect'
+        SKIPPED = 3, 'skipped'
+
+    status = models.PositiveSmallIntegerField(choices=Status.choices, default=Status.UNANSWERED)
 
     class Meta:
         unique_together = ('game_mode', 'question_number')  
         ordering = ['question_number']
+        indexes = [
+            models.Index(fields=['game_mode', 'status'], name='record_game_mode_status'),
+        ]
 
     def __str__(self):
-        return f"{self.game_mode.user.username} | Q{self.question_number} | {self.status}"
+        return f"{self.game_mode.user.username} | Q{self.question_number} | {self.get_status_display()}"
     
 
 from django.utils.timezone import now
 
+class DailyAttemptCounter(models.Model):
+    """Last attempt number handed out per user per day (see utils.attempts.allocate_attempt)."""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='attempt_counters')
+    date = models.DateField()
+    last_attempt = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('user', 'date')
+
+    def __str__(self):
+        return f"{self.user.username} | {self.date} | {self.last_attempt}"
+
+
 class LoginHistory(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     login_date = models.DateField(default=now)
@@ -74,23 +118,29 @@ class UserProfile(models.Model):
     photo = models.ImageField(upload_to='profile_photos/', null=True, blank=True)  # <-- new field
     created_at = models.DateTimeField(auto_now_add=True)
 
+    # Daily activity streak, maintained by utils.streaks.record_activity
+    current_streak = models.PositiveIntegerField(default=0)
+    longest_streak = models.PositiveIntegerField(default=0)
+    last_active_date = models.DateField(null=True, blank=True)
+
+    # Changes whenever anything the dashboards show for the user changes; drives their ETags (utils.data_versions)
+    data_version = models.BigIntegerField(default=0)
+
     def __str__(self):
         return f"{self.user.username} Profile"
 
-    def add_coins(self, amount):
-        """Safely add coins."""
-        self.coins += amount
-        self.total_earned += amount
-        self.save()
+    def add_coins(self, amount, reason="manual"):
+        """Safely add coins (atomic UPDATE + ledger entry, see utils.coins)."""
+        from .utils.coins import earn_coins
+        earn_coins(self.user_id, amount, reason)
+        self.refresh_from_db(fields=['coins', 'total_earned', 'total_spent'])
 
-    def spend_coins(self, amount):
+    def spend_coins(self, amount, reason="manual"):
         """Safely deduct coins (with check)."""
-        if amount <= self.coins:
-            self.coins -= amount
-            self.total_spent += amount
-            self.save()
-            return True
-        return False
+        from .utils.coins import spend_coins
+        success = spend_coins(self.user_id, amount, reason)
+        self.refresh_from_db(fields=['coins', 'total_earned', 'total_spent'])
+        return success
 
 
 # ✅ Automatically create or update profile for each new user
@@ -99,7 +149,9 @@ def create_or_update_user_profile(sender, instance, created, **kwargs):
     if created:
         UserProfile.objects.create(user=instance)  # creates with default 5000 coins
     else:
-        instance.profile.save()
+        # Only make sure the profile exists: re-saving a loaded profile would write
+        # back stale coin and streak counters
+        UserProfile.objects.get_or_create(user=instance)
         
         
         
@@ -119,7 +171,7 @@ class UserLevel(models.Model):
         Level increases by 1 for every 5 qualifying attempts.
         """
         qualifying_attempts = GameMode.objects.annotate(
-            correct_count=Count('questions', filter=Q(questions__status='correct'))
+            correct_count=Count('questions', filter=Q(questions__status=GameQuestionRecord.Status.CORRECT))
         ).filter(user=self.user, correct_count__gte=5).count()
 
         self.level = min(qualifying_attempts // 5, self.max_level)
@@ -133,3 +185,144 @@ class AchievementReward(models.Model):
 
     class Meta:
         unique_together = ('user', 'badge_name')
+
+
+class CoinLedgerEntry(models.Model):
+    """
+    Append-only record of every coin balance change, written by utils.coins in
+    the same transaction as the balance update.
+    """
+    EARNED = 'earned'
+    SPENT = 'spent'
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='coin_entries')
+    amount = models.PositiveIntegerField()
+    transaction_type = models.CharField(max_length=10, choices=[(EARNED, 'Earned'), (SPENT, 'Spent')])
+    reason = models.CharField(max_length=50)  # e.g. 'achievement', 'update_coins'
+    description = models.CharField(max_length=255, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['user', 'created_at'])]
+
+    def __str__(self):
+        return f"{self.user.username} | {self.transaction_type} {self.amount} | {self.reason}"
+
+
+class CoinMonthlyRollup(models.Model):
+    """Coins earned and spent per user per calendar month (first day of the month, local time)."""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='coin_rollups')
+    month = models.DateField()
+    earned = models.PositiveIntegerField(default=0)
+    spent = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('user', 'month')
+
+    def __str__(self):
+        return f"{self.user.username} | {self.month:%Y-%m} | +{self.earned} -{self.spent}"
+
+
+class AchievementProgress(models.Model):
+    """
+    Stored progress of one badge for one user, updated by utils.achievements
+    when an event the badge depends on happens. user_achievements only reads it.
+    Rows for users from before the engine: `manage.py backfill_achievements`.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='achievement_progress')
+    badge_name = models.CharField(max_length=100)
+    progress = models.JSONField(default=dict)
+    unlocked = models.BooleanField(default=False)
+    unlocked_at = models.DateTimeField(null=True, blank=True)
+    reward_seen = models.BooleanField(default=True)  # False until the reward is reported to the user
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('user', 'badge_name')
+
+    def __str__(self):
+        return f"{self.user.username} | {self.badge_name} | {'unlocked' if self.unlocked else 'locked'}"
+
+
+class AuthCacheVersion(models.Model):
+    """
+    Single row (pk=1) whose version is bumped to tell every worker to drop its
+    cached tokens (MathCraft_Game.authentication, AUTH_CACHE["CROSS_WORKER"]).
+    """
+    version = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"auth cache v{self.version}"
+
+
+class ActivityCalendar(models.Model):
+    """
+    One bit per day of `year` (bit 0 = January 1st) set on the user's first
+    activity of that day. The 366 bits are split over WORDS big-integer columns
+    of WORD_BITS bits each; see utils.activity_calendar for the bit arithmetic.
+    """
+    WORD_BITS = 61
+    WORDS = 6
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='activity_calendars')
+    year = models.PositiveSmallIntegerField()
+    w0 = models.BigIntegerField(default=0)
+    w1 = models.BigIntegerField(default=0)
+    w2 = models.BigIntegerField(default=0)
+    w3 = models.BigIntegerField(default=0)
+    w4 = models.BigIntegerField(default=0)
+    w5 = models.BigIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('user', 'year')
+
+    def __str__(self):
+        return f"{self.user.username} | {self.year}"
+
+
+class UserStats(models.Model):
+    """
+    Running per-user, per-mode totals, updated on every write so the dashboard
+    endpoints read at most one row per mode instead of re-aggregating history.
+    Rebuild from history with `manage.py rebuild_user_stats`.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='stats')
+    mode = models.PositiveSmallIntegerField(choices=GameMode.Mode.choices)
+    games_played = models.PositiveIntegerField(default=0)
+    questions_answered = models.PositiveIntegerField(default=0)
+    correct_answers = models.PositiveIntegerField(default=0)
+    iq_sum = models.FloatField(default=0)
+    iq_count = models.PositiveIntegerField(default=0)  # attempts with an IQ recorded
+    best_iq = models.FloatField(null=True, blank=True)
+    best_streak = models.PositiveIntegerField(default=0)  # highest total streak of one attempt
+    fastest_time = models.PositiveIntegerField(null=True, blank=True, help_text="Fastest finished attempt in seconds")
+    qualifying_games = models.PositiveIntegerField(default=0)  # attempts with >= 5 correct answers
+
+    class Meta:
+        unique_together = ('user', 'mode')
+
+    def __str__(self):
+        return f"{self.user.username} | {self.get_mode_display()} | {self.games_played} games"
+
+
+class DailyUserModeStats(models.Model):
+    """
+    Per-user, per-mode totals of one local (TIME_ZONE) day, kept up to date by
+    utils.stats alongside UserStats. Monthly charts sum at most a month's rows.
+    Backfill from history with `manage.py backfill_daily_stats`.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='daily_stats')
+    day = models.DateField()  # local date the attempt was started
+    mode = models.PositiveSmallIntegerField(choices=GameMode.Mode.choices)
+    games = models.PositiveIntegerField(default=0)
+    iq_sum = models.FloatField(default=0)
+    iq_count = models.PositiveIntegerField(default=0)  # attempts with an IQ recorded
+    correct = models.PositiveIntegerField(default=0)
+    time = models.PositiveIntegerField(default=0, help_text="Sum of question times in seconds")
+    streak = models.PositiveIntegerField(default=0)  # sum of the attempts' total streaks
+
+    class Meta:
+        unique_together = ('user', 'day', 'mode')
+
+    def __str__(self):
+        return f"{self.user.username} | {self.day} | {self.get_mode_display()} | {self.games} games"
@@ -50,11 +50,36 @@ class LoginSerializer(serializers.Serializer):
 from rest_framework import serializers
 from .models import GameMode
 
+
+class ChoiceNameField(serializers.Field):
+    """
+    Exposes a small-integer choices column (models.NamedChoices) by name, so the
+    API keeps speaking 'easy' / 'correct' while the database stores codes.
+    Input is case-insensitive.
+    """
+
+    def __init__(self, choices, **kwargs):
+        self.choices_class = choices
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        return self.choices_class(value).label
+
+    def to_internal_value(self, data):
+        member = self.choices_class.parse(data)
+        if member is None:
+            names = ', '.join(repr(member.label) for member in self.choices_class)
+            raise serializers.ValidationError(f"Must be one of {names}.")
+        return member
+
+
 class GameModeSerializer(serializers.ModelSerializer):
+    mode = ChoiceNameField(GameMode.Mode)
+
     class Meta:
         model = GameMode
         fields = ['id', 'user', 'mode', 'attempt', 'created_at', 'date', 'iq']  # add iq here
-        read_only_fields = ['id', 'created_at', 'user', 'date']
+        read_only_fields = ['id', 'created_at', 'user', 'date', 'attempt']  # attempt is assigned by the server
 
 
 
@@ -63,10 +88,11 @@ from .models import GameQuestionRecord
 class GameQuestionRecordSerializer(serializers.ModelSerializer):
     # Optional: show user and game_mode info in read-only fields
     user = serializers.CharField(source='game_mode.user.username', read_only=True)
-    mode = serializers.CharField(source='game_mode.mode', read_only=True)
+    mode = ChoiceNameField(GameMode.Mode, source='game_mode.mode', read_only=True)
     attempt = serializers.IntegerField(source='game_mode.attempt', read_only=True)
     date = serializers.DateField(source='game_mode.date', read_only=True)
     iq = serializers.FloatField(source='game_mode.iq', read_only=True)
+    status = ChoiceNameField(GameQuestionRecord.Status, required=False)
 
     class Meta:
         model = GameQuestionRecord
@@ -89,6 +115,59 @@ class GameQuestionRecordSerializer(serializers.ModelSerializer):
             'game_mode': {'required': True},
             'question_number': {'required': False, 'allow_null': True}, 
         }
+
+
+class GameQuestionRecordIngestSerializer(serializers.Serializer):
+    """
+    Flat input validation for bulk record uploads (CreateGameRecordsView).
+    No nested sources, so validating a record never touches the database;
+    game_mode ownership is checked per batch by utils.ingest.
+    """
+    game_mode = serializers.IntegerField(min_value=1)
+    question_number = serializers.IntegerField(min_value=0, required=False, allow_null=True, default=None)
+    time = serializers.IntegerField(min_value=0, required=False, allow_null=True, default=None)
+    streak = serializers.IntegerField(min_value=0, required=False, default=0)
+    user_answer = serializers.CharField(max_length=255, required=False, allow_blank=True, default='')
+    correct_answer = serializers.CharField(max_length=255, required=False, allow_blank=True, default='')
+    status = ChoiceNameField(GameQuestionRecord.Status, required=False, default=GameQuestionRecord.Status.UNANSWERED)
+
+
+class SessionAnswerSerializer(serializers.Serializer):
+    """One answer of an offline session (sync_session)."""
+    question_number = serializers.IntegerField(min_value=0)
+    user_answer = serializers.CharField(max_length=255, allow_blank=True)
+    time_taken = serializers.IntegerField(min_value=0)
+    hint_used = serializers.BooleanField(required=False, default=False)
+    question_token = serializers.CharField(required=False, allow_blank=True, default='')
+
+
+class SessionSyncSerializer(serializers.Serializer):
+    game_mode_id = serializers.IntegerField(min_value=1)
+    answers = SessionAnswerSerializer(many=True, allow_empty=False)
+    iq = serializers.FloatField(required=False)  # the client-computed attempt IQ, as for update-gameMode
+
+    def validate_answers(self, answers):
+        numbers = [answer['question_number'] for answer in answers]
+        if len(set(numbers)) != len(numbers):
+            raise serializers.ValidationError("Each question_number may only be answered once.")
+        return answers
+
+
+from .utils.batch import get_batch_settings
+
+class BatchPartSerializer(serializers.Serializer):
+    id = serializers.CharField(required=False, max_length=64)
+    path = serializers.CharField(max_length=500)
+
+
+class BatchSerializer(serializers.Serializer):
+    requests = BatchPartSerializer(many=True, allow_empty=False)
+
+    def validate_requests(self, parts):
+        limit = get_batch_settings()["MAX_PARTS"]
+        if len(parts) > limit:
+            raise serializers.ValidationError(f"At most {limit} requests per batch.")
+        return parts
      
      
 # New Update oct 26       
@@ -0,0 +1,22 @@
+from django.contrib.auth.models import User
+from django.test import override_settings
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+# Puzzles come from the in-process stand-in, never from the banana API
+OFFLINE_PUZZLES = override_settings(PUZZLE_POOL={"ENABLED": False, "UPSTREAM": "stub"})
+
+
+class PlayerMixin:
+    """Creates players with a token-authenticated APIClient each."""
+
+    def create_player(self, username, password="pw12345!"):
+        user = User.objects.create_user(username, f"{username}@example.com", password)
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Token {Token.objects.create(user=user).key}")
+        return user, client
+
+    def start_game(self, client, mode="easy"):
+        response = client.post("/api/create-game/", {"mode": mode, "attempt": 0}, format="json")
+        self.assertEqual(response.status_code, 201, response.data)
+        return response.data["id"]
@@ -0,0 +1,66 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from MathCraft_Game.models import AchievementProgress, GameMode, UserProfile
+from MathCraft_Game.utils.stats import rebuild_user_stats
+
+from .base import PlayerMixin
+
+
+class AchievementTests(PlayerMixin, TestCase):
+    def setUp(self):
+        self.user, self.client = self.create_player("alice")
+
+    def coins(self):
+        return UserProfile.objects.get(user=self.user).coins
+
+    def finish_game(self, iq):
+        game_id = self.start_game(self.client, "easy")
+        response = self.client.patch(f"/api/update-gameMode/{game_id}/", {"iq": iq}, format="json")
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_get_is_a_plain_read(self):
+        AchievementProgress.objects.create(user=self.user, badge_name="master_calibrator", unlocked=True,
+                                           reward_seen=False)
+        with CaptureQueriesContext(connection) as queries:
+            for _ in range(2):
+                response = self.client.get("/api/user-achievements/")
+                self.assertEqual(response.data["rewarded_badges"], ["master_calibrator"])
+        writes = [q["sql"] for q in queries if q["sql"].split(" ", 1)[0] in ("INSERT", "UPDATE", "DELETE")]
+        self.assertEqual(writes, [])
+        self.assertEqual(response.data["code_crusader"]["status"], "LOCKED")  # no row yet: reported locked
+
+    def test_reward_is_reported_by_the_unlocking_request(self):
+        coins = self.coins()
+        self.assertEqual(self.finish_game(95).data["rewarded_badges"], [])
+        self.assertEqual(self.finish_game(120).data["rewarded_badges"], ["master_calibrator"])
+        self.assertEqual(self.coins(), coins + 5000)
+
+        response = self.client.get("/api/user-achievements/")
+        self.assertEqual(response.data["master_calibrator"]["status"], "UNLOCKED")
+        self.assertEqual(response.data["rewarded_badges"], [])
+
+    def test_reward_unlocked_in_the_background_is_reported_by_the_next_write(self):
+        AchievementProgress.objects.create(user=self.user, badge_name="code_crusader", unlocked=True,
+                                           reward_seen=False)
+        self.assertEqual(self.client.get("/api/daily-streak/").data["rewarded_badges"], ["code_crusader"])
+        self.assertEqual(self.client.get("/api/daily-streak/").data["rewarded_badges"], [])
+
+    def test_backfill_evaluates_badges_without_a_row(self):
+        GameMode.objects.create(user=self.user, mode=GameMode.Mode.HARD, attempt=1, iq=130)
+        rebuild_user_stats([self.user.id])
+        AchievementProgress.objects.filter(user=self.user).delete()
+        coins = self.coins()
+
+        call_command("backfill_achievements", stdout=StringIO())
+        progress = AchievementProgress.objects.get(user=self.user, badge_name="master_calibrator")
+        self.assertTrue(progress.unlocked)
+        self.assertEqual(self.coins(), coins + 5000)
+
+        call_command("backfill_achievements", stdout=StringIO())  # nothing left to evaluate
+        self.assertEqual(self.coins(), coins + 5000)
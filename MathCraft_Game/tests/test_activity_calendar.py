@@ -0,0 +1,34 @@
+from datetime import date
+
+from django.test import TestCase
+
+from MathCraft_Game.models import ActivityCalendar
+from MathCraft_Game.utils import activity_calendar
+from MathCraft_Game.utils.activity_calendar import current_streak, load_years, mark_active
+
+from .base import PlayerMixin
+
+
+class ActivityCalendarTests(PlayerMixin, TestCase):
+    def test_marking_days_creates_one_row_per_year(self):
+        user, _ = self.create_player("alice")
+        days = [date(2024, 12, 30), date(2024, 12, 31), date(2025, 1, 1), date(2025, 1, 1), date(2025, 12, 31)]
+        for day in days:
+            mark_active(user.id, day)
+
+        self.assertEqual(ActivityCalendar.objects.filter(user=user).count(), 2)
+        years = load_years(user.id, [2024, 2025, 2026])
+        self.assertEqual(activity_calendar.active_dates(years[2024], 2024), days[:2])
+        self.assertEqual(activity_calendar.active_dates(years[2025], 2025), [date(2025, 1, 1), date(2025, 12, 31)])
+        self.assertEqual(years[2026], 0)
+        self.assertEqual(current_streak(user.id, date(2025, 1, 2)), 3)  # runs across New Year
+
+    def test_heatmap(self):
+        user, client = self.create_player("alice")
+        for day in (1, 2, 3, 10):
+            mark_active(user.id, date(2024, 2, day))
+        response = client.get("/api/activity-heatmap/2024/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["active_days"], 4)
+        self.assertEqual(response.data["monthly_active_days"][1], 4)
+        self.assertEqual(response.data["longest_streak"], 3)
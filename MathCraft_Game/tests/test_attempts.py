@@ -0,0 +1,80 @@
+import threading
+
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+
+from MathCraft_Game.models import DailyAttemptCounter, GameMode
+from MathCraft_Game.utils.attempts import allocate_attempt
+
+from .base import PlayerMixin
+
+
+class AllocateAttemptTests(PlayerMixin, TestCase):
+    def test_numbers_are_consecutive_per_day(self):
+        _, client = self.create_player("alice")
+        attempts = [
+            GameMode.objects.get(pk=self.start_game(client, mode)).attempt
+            for mode in ("easy", "hard", "intermediate")
+        ]
+        self.assertEqual(attempts, [1, 2, 3])
+
+    def test_first_counted_game_continues_after_existing_games(self):
+        user, _ = self.create_player("alice")
+        today = timezone.localdate()
+        GameMode.objects.bulk_create([
+            GameMode(user=user, mode=GameMode.Mode.EASY, attempt=n, date=today) for n in (1, 2)
+        ])
+        with transaction.atomic():
+            self.assertEqual(allocate_attempt(user.id, today), 3)
+        self.assertEqual(DailyAttemptCounter.objects.get(user=user, date=today).last_attempt, 3)
+
+    def test_rolled_back_start_releases_its_number(self):
+        user, _ = self.create_player("alice")
+        today = timezone.localdate()
+        with transaction.atomic():
+            self.assertEqual(allocate_attempt(user.id, today), 1)
+        try:
+            with transaction.atomic():
+                self.assertEqual(allocate_attempt(user.id, today), 2)
+                raise RuntimeError
+        except RuntimeError:
+            pass
+        with transaction.atomic():
+            self.assertEqual(allocate_attempt(user.id, today), 2)
+
+
+class ConcurrentAllocateAttemptTests(PlayerMixin, TransactionTestCase):
+    def setUp(self):
+        if connection.vendor == 'sqlite' and connection.is_in_memory_db():
+            self.skipTest("threads need a test database they can share (set DATABASES TEST NAME to a file)")
+
+    def test_concurrent_starts_get_unique_gap_free_numbers(self):
+        user, _ = self.create_player("alice")
+        today = timezone.localdate()
+        threads, per_thread = 8, 5
+        barrier = threading.Barrier(threads)
+        errors = []
+
+        def start_games():
+            try:
+                barrier.wait()  # every thread's first start races for the missing counter row
+                for _ in range(per_thread):
+                    with transaction.atomic():
+                        GameMode.objects.create(
+                            user=user, mode=GameMode.Mode.EASY, attempt=allocate_attempt(user.id, today), date=today
+                        )
+            except Exception as exc:
+                errors.append(exc)
+            finally:
+                connection.close()
+
+        workers = [threading.Thread(target=start_games) for _ in range(threads)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        self.assertEqual(errors, [])
+        attempts = sorted(GameMode.objects.filter(user=user, date=today).values_list('attempt', flat=True))
+        self.assertEqual(attempts, list(range(1, threads * per_thread + 1)))
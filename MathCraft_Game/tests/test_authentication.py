@@ -0,0 +1,50 @@
+from unittest import mock
+
+from django.test import TestCase
+from rest_framework.authtoken.models import Token
+
+from MathCraft_Game import authentication
+from MathCraft_Game.authentication import VersionChannel, get_token_cache
+
+from .base import PlayerMixin
+
+
+class CachedTokenAuthenticationTests(PlayerMixin, TestCase):
+    def setUp(self):
+        get_token_cache().clear()
+        self.clock = 1000.0
+        self.enterContext(mock.patch.object(authentication.time, "monotonic", lambda: self.clock))
+        self.interval = authentication.get_auth_cache_settings()["VERSION_CHECK_INTERVAL"]
+        self.enterContext(mock.patch.object(authentication, "_channel", VersionChannel(self.interval)))
+
+    def test_safe_requests_are_served_from_the_cache(self):
+        _, client = self.create_player("alice")
+        client.get("/api/user-credentials/")
+        with self.assertNumQueries(1):  # only the ETag's data-version read, no token / user / profile
+            self.assertEqual(client.get("/api/user-credentials/").status_code, 200)
+
+    def test_logout_revokes_the_token_at_once(self):
+        _, client = self.create_player("alice")
+        self.assertEqual(client.get("/api/user-credentials/").status_code, 200)
+        self.assertEqual(client.post("/api/logout/").status_code, 200)
+        self.assertEqual(client.get("/api/user-credentials/").status_code, 401)
+
+    def test_revocation_in_another_worker_reaches_this_one(self):
+        user, client = self.create_player("alice")
+        self.assertEqual(client.get("/api/user-credentials/").status_code, 200)
+
+        # Another worker deletes the token: no signal fires here, only the shared version moves
+        Token.objects.filter(user=user)._raw_delete(Token.objects.db)
+        VersionChannel.bump()
+
+        self.clock += self.interval
+        self.assertEqual(client.get("/api/user-credentials/").status_code, 401)
+
+    def test_deactivating_a_user_is_broadcast(self):
+        user, client = self.create_player("alice")
+        client.get("/api/user-credentials/")
+        with mock.patch.object(VersionChannel, "bump") as bump:
+            user.is_active = False
+            user.save()
+        bump.assert_called_once()
+        self.assertEqual(client.get("/api/user-credentials/").status_code, 401)
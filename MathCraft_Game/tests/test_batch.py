@@ -0,0 +1,43 @@
+from django.test import TestCase, override_settings
+
+from .base import PlayerMixin
+
+
+class BatchTests(PlayerMixin, TestCase):
+    def setUp(self):
+        self.user, self.client = self.create_player("alice")
+        self.start_game(self.client, "easy")
+
+    def batch(self, *paths):
+        response = self.client.post(
+            "/api/batch/", {"requests": [{"id": str(i), "path": path} for i, path in enumerate(paths)]}, format="json"
+        )
+        self.assertEqual(response.status_code, 200, response.data)
+        return [(result["status"], result["body"]) for result in response.data["results"]]
+
+    def test_parts_answer_like_the_routes_themselves(self):
+        expected = self.client.get("/api/user-mode-counts/").data
+        results = self.batch("user-mode-counts/", "/api/total-puzzles/")
+        self.assertEqual(results[0], (200, expected))
+        self.assertEqual(results[1], (200, {"total_puzzles_attempted": 1}))
+
+    def test_nested_batch_is_rejected(self):
+        for path in ("batch/", "/api/batch/"):
+            self.assertEqual(self.batch(path), [(400, {"error": "Batches cannot be nested."})])
+
+    def test_routes_outside_the_api_are_rejected(self):
+        rejected = (400, {"error": "Only /api/ routes can be batched."})
+        self.assertEqual(self.batch("/admin/", "/api/../admin/", "user-mode-counts/"),
+                         [rejected, (404, {"error": "No such route."}), (200, self.client.get("/api/user-mode-counts/").data)])
+
+    @override_settings(BATCH={"MAX_PARTS": 2})
+    def test_too_many_parts_are_refused(self):
+        response = self.client.post(
+            "/api/batch/", {"requests": [{"path": "total-puzzles/"}] * 3}, format="json"
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_requires_authentication(self):
+        self.client.credentials()
+        response = self.client.post("/api/batch/", {"requests": [{"path": "total-puzzles/"}]}, format="json")
+        self.assertEqual(response.status_code, 401)
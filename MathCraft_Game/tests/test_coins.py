@@ -0,0 +1,43 @@
+from django.test import TestCase
+from django.utils import timezone
+
+from MathCraft_Game.models import CoinLedgerEntry, CoinMonthlyRollup, UserProfile
+from MathCraft_Game.utils.coins import CoinChange, apply_coin_changes, earn_coins, get_balance, spend_coins
+
+from .base import PlayerMixin
+
+
+class CoinLedgerTests(PlayerMixin, TestCase):
+    def setUp(self):
+        self.user, self.client = self.create_player("alice")
+        UserProfile.objects.filter(user=self.user).update(coins=100)
+
+    def test_earn_and_spend_update_balance_ledger_and_rollup(self):
+        self.assertTrue(earn_coins(self.user.id, 50, "test"))
+        self.assertTrue(spend_coins(self.user.id, 30, "test"))
+
+        self.assertEqual(get_balance(self.user.id), {'coins': 120, 'total_earned': 50, 'total_spent': 30})
+        self.assertEqual(
+            list(CoinLedgerEntry.objects.filter(user=self.user).order_by('id').values_list('transaction_type', 'amount')),
+            [(CoinLedgerEntry.EARNED, 50), (CoinLedgerEntry.SPENT, 30)],
+        )
+        rollup = CoinMonthlyRollup.objects.get(user=self.user, month=timezone.localdate().replace(day=1))
+        self.assertEqual((rollup.earned, rollup.spent), (50, 30))
+
+    def test_insufficient_balance_changes_nothing(self):
+        self.assertFalse(spend_coins(self.user.id, 101, "test"))
+        # A batch is all or nothing, even when part of it is an earning
+        self.assertFalse(apply_coin_changes(self.user.id, [CoinChange(10, "test"), CoinChange(-111, "test")]))
+
+        self.assertEqual(get_balance(self.user.id), {'coins': 100, 'total_earned': 0, 'total_spent': 0})
+        self.assertFalse(CoinLedgerEntry.objects.filter(user=self.user).exists())
+        self.assertFalse(CoinMonthlyRollup.objects.filter(user=self.user).exists())
+
+    def test_spend_endpoint_rejects_an_overdraft(self):
+        response = self.client.post("/api/update-coins/", {"amount": 101, "action": "spend"}, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data, {"error": "Insufficient coins"})
+
+        response = self.client.post("/api/update-coins/", {"amount": 100, "action": "spend"}, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["coins"], 0)
@@ -0,0 +1,91 @@
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+
+from django.db import transaction
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from MathCraft_Game.models import DailyUserModeStats, GameMode, GameQuestionRecord
+from MathCraft_Game.utils.records import upsert_question_records
+from MathCraft_Game.utils.stats import rebuild_daily_stats, record_game_finished, sync_game_summaries
+
+from .base import PlayerMixin
+
+DAILY_FIELDS = ['day', 'mode', 'games', 'iq_sum', 'iq_count', 'correct', 'time', 'streak']
+
+
+@override_settings(TIME_ZONE="Asia/Colombo")
+class DailyUserModeStatsTests(PlayerMixin, TestCase):
+    def setUp(self):
+        self.user, self.client = self.create_player("alice")
+
+    def daily(self):
+        return list(DailyUserModeStats.objects.filter(user=self.user).order_by('day', 'mode').values_list(*DAILY_FIELDS))
+
+    def play(self, mode, correct, iq):
+        game = GameMode.objects.get(pk=self.start_game(self.client, mode))
+        with transaction.atomic():
+            upsert_question_records([
+                GameQuestionRecord(
+                    game_mode=game, question_number=q, correct_answer="1", user_answer="1", time=2, streak=q,
+                    status=GameQuestionRecord.Status.CORRECT if q <= correct else GameQuestionRecord.Status.INCORRECT,
+                )
+                for q in range(1, 6)
+            ], update_fields=['user_answer', 'status', 'time', 'streak'])
+            sync_game_summaries([game.id])
+        game.refresh_from_db()
+        game.iq = iq
+        game.save(update_fields=['iq'])
+        record_game_finished(game, None)
+        return game
+
+    def add_day(self, day, mode=GameMode.Mode.EASY, games=1, iq_sum=0.0, iq_count=0):
+        DailyUserModeStats.objects.create(user=self.user, day=day, mode=mode, games=games, iq_sum=iq_sum, iq_count=iq_count)
+
+    def test_incremental_rollup_matches_a_rebuild(self):
+        self.play("easy", 5, 110.0)
+        self.play("easy", 2, 90.0)
+        self.play("hard", 4, 120.0)
+
+        incremental = self.daily()
+        today = timezone.localdate()
+        self.assertEqual(incremental, [
+            (today, GameMode.Mode.EASY, 2, 200.0, 2, 7, 20, 30),
+            (today, GameMode.Mode.HARD, 1, 120.0, 1, 4, 10, 15),
+        ])
+        rebuild_daily_stats([self.user.id])
+        self.assertEqual(self.daily(), incremental)
+
+    def test_days_and_months_follow_the_local_time_zone(self):
+        late = self.play("easy", 5, 100.0)
+        # 20:00 UTC on 31 January is already 1 February in Colombo (UTC+5:30)
+        GameMode.objects.filter(pk=late.pk).update(created_at=datetime(2025, 1, 31, 20, 0, tzinfo=dt_timezone.utc))
+        early = self.play("hard", 5, 100.0)
+        GameMode.objects.filter(pk=early.pk).update(created_at=datetime(2025, 1, 31, 17, 0, tzinfo=dt_timezone.utc))
+        rebuild_daily_stats([self.user.id])
+
+        self.assertEqual([row[:3] for row in self.daily()], [
+            (date(2025, 1, 31), GameMode.Mode.HARD, 1),
+            (date(2025, 2, 1), GameMode.Mode.EASY, 1),
+        ])
+        january = self.client.get("/api/monthly-performance/2025/1/").data
+        february = self.client.get("/api/monthly-performance/2025/2/").data
+        self.assertEqual((january["total_puzzles"], january["mode_counts"]["Hard"]), (1, 1))
+        self.assertEqual((february["total_puzzles"], february["iqSummary"]["Easy"]), (1, 100))
+
+    def test_monthly_iq_chart_averages_the_last_six_months(self):
+        this_month = timezone.localdate().replace(day=1)
+        months = [this_month]
+        for _ in range(6):
+            months.append((months[-1] - timedelta(days=1)).replace(day=1))
+
+        self.add_day(months[0], iq_sum=200.0, iq_count=2)
+        self.add_day(months[0] + timedelta(days=1), mode=GameMode.Mode.HARD, iq_sum=130.0, iq_count=1)
+        self.add_day(months[2], iq_sum=0.0, iq_count=0)  # played, never finished: no data point
+        self.add_day(months[5], iq_sum=90.0, iq_count=1)
+        self.add_day(months[6], iq_sum=150.0, iq_count=1)  # seven months back: out of range
+
+        data = self.client.get("/api/monthly-iq-chart/").data
+        self.assertEqual(data, {
+            "labels": [months[5].strftime("%b"), months[0].strftime("%b")],
+            "avg_iq": [90.0, 110.0],
+        })
@@ -0,0 +1,45 @@
+from unittest import skipUnless
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.utils import timezone
+
+from MathCraft_Game.management.commands.explain_dashboard_queries import dashboard_queries, index_names
+from MathCraft_Game.models import GameMode, GameQuestionRecord
+
+Mode, Status = GameMode.Mode, GameQuestionRecord.Status
+
+
+@skipUnless(connection.features.supports_explaining_query_execution, "backend cannot EXPLAIN queries")
+class DashboardIndexTests(TestCase):
+    """Every per-user dashboard read must be planned on its supporting index."""
+
+    @classmethod
+    def setUpTestData(cls):
+        modes = list(Mode)
+        users = [User.objects.create_user(f"explain-{i}") for i in range(6)]
+        GameMode.objects.bulk_create([
+            GameMode(user=user, mode=modes[i % 3], attempt=i + 1)
+            for user in users
+            for i in range(60 if user is users[0] else 6)
+        ])
+        games = list(GameMode.objects.filter(user__in=users))
+        GameQuestionRecord.objects.bulk_create([
+            GameQuestionRecord(game_mode=game, question_number=q, status=[Status.CORRECT, Status.INCORRECT][q % 2])
+            for game in games
+            for q in range(1, 6)
+        ])
+        cls.user = users[0]
+        cls.game_ids = [game.pk for game in games if game.user_id == cls.user.pk][:20]
+
+    def test_supporting_indexes_exist(self):
+        for label, _queryset, model, columns in dashboard_queries(self.user, self.game_ids, timezone.localdate()):
+            with self.subTest(label):
+                self.assertTrue(index_names(model, columns), f"no index on {model._meta.db_table}({', '.join(columns)})")
+
+    def test_dashboard_queries_use_their_index(self):
+        for label, queryset, model, columns in dashboard_queries(self.user, self.game_ids, timezone.localdate()):
+            with self.subTest(label):
+                plan = queryset.explain()
+                self.assertTrue(any(name in plan for name in index_names(model, columns)), plan)
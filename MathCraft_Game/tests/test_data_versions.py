@@ -0,0 +1,57 @@
+from django.test import TestCase, override_settings
+
+from .base import PlayerMixin
+
+
+class VersionedEtagTests(PlayerMixin, TestCase):
+    def setUp(self):
+        self.user, self.client = self.create_player("alice")
+
+    def get(self, path, etag=None):
+        return self.client.get(path, HTTP_IF_NONE_MATCH=etag) if etag else self.client.get(path)
+
+    def test_unchanged_data_revalidates_with_304(self):
+        response = self.get("/api/player-overview/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Cache-Control"], "private, no-cache")
+
+        with self.assertNumQueries(1):  # the data version read; the view itself does not run
+            revalidated = self.get("/api/player-overview/", response["ETag"])
+        self.assertEqual(revalidated.status_code, 304)
+        self.assertEqual(revalidated["ETag"], response["ETag"])
+
+    def test_write_bumps_the_version(self):
+        etag = self.get("/api/player-overview/")["ETag"]
+        response = self.client.post("/api/update-coins/", {"amount": 25, "action": "add"}, format="json")
+        self.assertEqual(response.status_code, 200)
+
+        response = self.get("/api/player-overview/", etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertEqual(self.get("/api/player-overview/", response["ETag"]).status_code, 304)
+
+    def test_new_game_changes_the_counts_etag(self):
+        etag = self.get("/api/user-mode-counts/")["ETag"]
+        self.start_game(self.client, "easy")
+        response = self.get("/api/user-mode-counts/", etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["Easy"], 1)
+
+    def test_etags_are_per_user_and_endpoint(self):
+        _, other = self.create_player("bob")
+        etag = self.get("/api/player-overview/")["ETag"]
+        self.assertEqual(other.get("/api/player-overview/", HTTP_IF_NONE_MATCH=etag).status_code, 200)
+        self.assertEqual(self.get("/api/user-mode-counts/", etag).status_code, 200)
+
+    @override_settings(
+        CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "versions"}},
+        DATA_VERSIONS={"CACHE_ALIAS": "default"},
+    )
+    def test_cached_versions_are_published_on_commit(self):
+        etag = self.get("/api/player-overview/")["ETag"]
+        with self.assertNumQueries(0):
+            self.assertEqual(self.get("/api/player-overview/", etag).status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post("/api/update-coins/", {"amount": 25, "action": "add"}, format="json")
+        self.assertEqual(self.get("/api/player-overview/", etag).status_code, 200)
@@ -0,0 +1,138 @@
+import json
+import os
+from unittest import mock
+
+from django.test import TestCase, override_settings
+
+from MathCraft_Game.models import GameMode, GameQuestionRecord
+from MathCraft_Game.utils import game_sessions
+from MathCraft_Game.utils.game_sessions import CacheBackend, GameSessions, MemoryBackend
+
+from .base import PlayerMixin
+
+CORRECT = GameQuestionRecord.Status.CORRECT
+
+
+@override_settings(CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+                                       "LOCATION": "game-session-tests"}})
+class CacheBackendFlushTests(PlayerMixin, TestCase):
+    def setUp(self):
+        self.user, _ = self.create_player("alice")
+        self.game_id = GameMode.objects.create(user=self.user, mode=GameMode.Mode.EASY, attempt=1).pk
+        self.worker = self.new_worker()
+
+    def tearDown(self):
+        for game_mode_id in self.worker._backend.ids():
+            self.worker._backend.pop(game_mode_id)
+
+    @staticmethod
+    def new_worker():
+        """A store as another worker process would build it over the same cache."""
+        return GameSessions(CacheBackend("default", timeout=60), idle_timeout=60, flush_interval=60)
+
+    def answer(self, worker, question_number, answer="7"):
+        worker.record_answer(self.user.id, self.game_id, question_number, "7", answer, CORRECT, 3, question_number)
+
+    def records(self):
+        return dict(GameQuestionRecord.objects.filter(game_mode_id=self.game_id).values_list('question_number', 'user_answer'))
+
+    def test_flush_writes_the_answers_and_marks_them_clean(self):
+        self.worker.open_question(self.user.id, self.game_id, 1, "7")
+        self.answer(self.worker, 2)
+
+        self.assertEqual(self.worker.flush(), 2)
+        self.assertEqual(self.records(), {1: '', 2: '7'})
+        self.assertEqual(self.worker.stats()["dirty_questions"], 0)
+        self.assertEqual(self.worker.flush(), 0)
+
+    def test_answer_recorded_during_a_flush_is_not_lost(self):
+        other = self.new_worker()
+        self.answer(self.worker, 1)
+        write = self.worker._write
+
+        def write_while_answering(taken):
+            # Another worker answers the same question and the next one while the first flush writes
+            self.answer(other, 1, answer="8")
+            self.answer(other, 2)
+            return write(taken)
+
+        with mock.patch.object(self.worker, '_write', side_effect=write_while_answering):
+            self.assertEqual(self.worker.flush(), 1)
+        self.assertEqual(self.records(), {1: '7'})
+
+        self.assertEqual(self.worker.stats()["dirty_questions"], 2)
+        self.assertEqual(self.worker.flush(), 2)
+        self.assertEqual(self.records(), {1: '8', 2: '7'})
+
+    def test_another_worker_flushes_the_sessions_of_a_crashed_one(self):
+        self.answer(self.worker, 1)
+        # The worker dies before its flusher runs; any other worker finds the session in the shared id list
+        survivor = self.new_worker()
+        self.assertEqual(survivor.flush(), 1)
+        self.assertEqual(self.records(), {1: '7'})
+
+    def test_failed_write_keeps_the_questions_dirty(self):
+        self.answer(self.worker, 1)
+        with mock.patch.object(self.worker, '_write', side_effect=RuntimeError("database down")):
+            with self.assertRaises(RuntimeError):
+                self.worker.flush()
+        self.assertEqual(self.worker.stats()["dirty_questions"], 1)
+        self.assertEqual(self.worker.stats()["flush_errors"], 1)
+
+        self.assertEqual(self.worker.flush(), 1)
+        self.assertEqual(self.records(), {1: '7'})
+
+    def test_finish_drops_the_session_once_written(self):
+        self.answer(self.worker, 1)
+        self.assertEqual(self.worker.finish(self.game_id), 1)
+        self.assertEqual(self.worker._backend.ids(), [])
+        self.assertFalse(self.worker.owns(self.user.id, self.game_id))
+
+    def test_bad_records_do_not_hold_back_other_games(self):
+        other_game = GameMode.objects.create(user=self.user, mode=GameMode.Mode.HARD, attempt=2).pk
+        self.worker.record_answer(self.user.id, other_game, 1, "7", "7", CORRECT, "abc", 1)
+        self.answer(self.worker, 1)
+
+        with self.assertLogs('MathCraft_Game.utils.game_sessions', 'WARNING'):
+            self.assertEqual(self.worker.flush(), 1)
+        self.assertEqual(self.records(), {1: '7'})
+        self.assertFalse(GameQuestionRecord.objects.filter(game_mode_id=other_game).exists())
+        self.assertEqual(self.worker.stats()["discarded_records"], 1)
+        self.assertEqual(self.worker.stats()["dirty_questions"], 0)  # not retried on every flush
+
+
+@override_settings(GAME_SESSIONS={"ENABLED": True})
+class SessionEndpointTests(PlayerMixin, TestCase):
+    def setUp(self):
+        self.sessions = GameSessions(MemoryBackend(), flush_interval=3600)
+        self.sessions._pid = os.getpid()  # no flusher thread: the tests flush explicitly
+        patcher = mock.patch.object(game_sessions, '_sessions', self.sessions)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.user, self.client = self.create_player("alice")
+        self.game_id = self.start_game(self.client)
+        self.sessions.open_question(self.user.id, self.game_id, 1, "7")
+
+    def submit(self, time_taken):
+        return self.client.post("/api/submit-answer/", {
+            "game_mode_id": self.game_id, "question_number": 1, "user_answer": "7", "time_taken": time_taken,
+        }, format="json")
+
+    def test_submit_answer_rejects_a_bad_time(self):
+        for time_taken in ("abc", -1, 2.5):
+            self.assertEqual(self.submit(time_taken).status_code, 400, time_taken)
+        self.assertEqual(self.submit("4").status_code, 200)
+        self.sessions.flush()
+        self.assertEqual(GameQuestionRecord.objects.get(game_mode_id=self.game_id, question_number=1).time, 4)
+
+    def test_upload_finishes_the_session_first(self):
+        self.assertEqual(self.submit(4).status_code, 200)
+        body = [{"game_mode": self.game_id, "question_number": 1, "user_answer": "9", "correct_answer": "7",
+                 "status": "incorrect", "time": 6}]
+        response = self.client.post("/api/create-gameRecords/", json.dumps(body), content_type="application/json")
+        self.assertEqual(response.status_code, 201)
+
+        self.assertFalse(self.sessions.owns(self.user.id, self.game_id))
+        self.sessions.flush()
+        record = GameQuestionRecord.objects.get(game_mode_id=self.game_id, question_number=1)
+        self.assertEqual((record.user_answer, record.time), ("9", 6))
@@ -0,0 +1,59 @@
+import random
+import tempfile
+from unittest import mock
+
+from django.conf import settings
+from django.test import SimpleTestCase
+
+from MathCraft_Game.utils import hints, number_index
+from MathCraft_Game.utils.hints import (
+    NUMBER_HINT_POOL, collect_clues_indexed, collect_clues_reference, generate_hint,
+)
+from MathCraft_Game.utils.number_index import DEFAULT_INDEX_SETTINGS, NumberPropertyIndex
+from MathCraft_Game.utils.puzzle_engine import generate_equation
+
+
+class GenerateHintTests(SimpleTestCase):
+    def test_puzzle_solutions_use_the_hint_pool_without_building_the_index(self):
+        rng = random.Random(0)
+        solutions = {generate_equation(rng)[1] for _ in range(200)}
+        self.assertEqual(solutions, set(range(10)))
+
+        with mock.patch.object(hints, "get_number_index", side_effect=AssertionError("index used")):
+            for solution in solutions:
+                for rotation in range(6):
+                    self.assertEqual(
+                        generate_hint(str(solution), rotation),
+                        NUMBER_HINT_POOL[solution][rotation % 3],
+                    )
+
+    def test_other_solutions_are_answered_from_the_index(self):
+        index = NumberPropertyIndex.build(2000)
+        with mock.patch.object(number_index, "_index", index):
+            for solution in ("-64", "17", "125", "210", "1024", "1999"):
+                n = abs(int(solution))
+                sign = "NEGATIVE" if solution.startswith("-") else "POSITIVE"
+                self.assertEqual(generate_hint(solution, 0), collect_clues_reference(n, sign)[0])
+
+            with mock.patch.object(hints, "collect_clues_reference", side_effect=AssertionError("not indexed")):
+                generate_hint("1500", 0)
+            self.assertEqual(generate_hint("5000", 0), collect_clues_reference(5000, "POSITIVE")[0])
+
+    def test_index_matches_the_reference_clues_up_to_the_configured_limit(self):
+        limit = {**DEFAULT_INDEX_SETTINGS, **getattr(settings, "HINT_INDEX", {})}["LIMIT"]
+        index = NumberPropertyIndex.build(limit)
+        self.assertEqual(index.limit, limit)
+        self.assertNotIn(limit + 1, index)
+        for n in range(limit + 1):
+            self.assertEqual(collect_clues_indexed(n, "POSITIVE", index), collect_clues_reference(n, "POSITIVE"), n)
+        for n in (0, 1, 9, limit - 1, limit):
+            self.assertEqual(collect_clues_indexed(n, "NEGATIVE", index), collect_clues_reference(n, "NEGATIVE"), -n)
+
+    def test_memory_mapped_index_matches_the_built_one(self):
+        built = NumberPropertyIndex.build(1000)
+        with tempfile.TemporaryDirectory() as directory:
+            path = f"{directory}/index.bin"
+            built.save(path)
+            loaded = NumberPropertyIndex.load(path)
+            self.assertEqual(bytes(loaded.flags), bytes(built.flags))
+            self.assertEqual(bytes(loaded.digit_sums), bytes(built.digit_sums))
@@ -0,0 +1,47 @@
+import threading
+from unittest import mock
+
+import requests
+from django.test import SimpleTestCase
+
+from MathCraft_Game.utils.http_client import CircuitBreaker, PoolTimeoutError, PooledHTTPClient
+
+
+class CircuitBreakerTests(SimpleTestCase):
+    def open_client(self):
+        client = PooledHTTPClient(failure_threshold=1, cooldown=0)
+        client.breaker.record_failure()
+        self.assertEqual(client.breaker.state, CircuitBreaker.OPEN)
+        return client
+
+    def test_trial_raising_a_non_request_error_reopens_the_breaker(self):
+        client = self.open_client()
+        with mock.patch.object(requests.Session, 'get', side_effect=ValueError("bad url")):
+            with self.assertRaises(ValueError):
+                client.get("http://upstream.invalid/")
+        self.assertEqual(client.breaker.state, CircuitBreaker.OPEN)
+
+        ok = mock.Mock(status_code=200)
+        with mock.patch.object(requests.Session, 'get', return_value=ok):
+            self.assertIs(client.get("http://upstream.invalid/"), ok)
+        self.assertEqual(client.breaker.state, CircuitBreaker.CLOSED)
+
+    def test_full_pool_times_out_without_touching_the_breaker(self):
+        client = PooledHTTPClient(pool_maxsize=1, pool_timeout=0.05)
+        started, release = threading.Event(), threading.Event()
+
+        def slow_get(*args, **kwargs):
+            started.set()
+            release.wait(5)
+            return mock.Mock(status_code=200)
+
+        with mock.patch.object(requests.Session, 'get', side_effect=slow_get):
+            holder = threading.Thread(target=client.get, args=("http://upstream.invalid/",))
+            holder.start()
+            started.wait(5)
+            with self.assertRaises(PoolTimeoutError):
+                client.get("http://upstream.invalid/")
+            release.set()
+            holder.join()
+        self.assertEqual(client.stats()["pool_timeouts"], 1)
+        self.assertEqual(client.breaker.state, CircuitBreaker.CLOSED)
@@ -0,0 +1,84 @@
+import io
+import json
+
+from django.test import SimpleTestCase, TestCase
+
+from MathCraft_Game.models import GameMode, GameQuestionRecord
+from MathCraft_Game.utils.ingest import InvalidUpload, iter_json_array, iter_ndjson
+
+from .base import PlayerMixin
+
+
+class UploadParsingTests(SimpleTestCase):
+    def test_json_array_is_read_incrementally(self):
+        records = [{"game_mode": 1, "question_number": n, "user_answer": "é" * n} for n in range(20)]
+        body = json.dumps(records, ensure_ascii=False).encode()
+        self.assertEqual(list(iter_json_array(io.BytesIO(body), chunk_size=7)), records)
+        self.assertEqual(list(iter_json_array(io.BytesIO(b" [ ] "))), [])
+
+    def test_malformed_bodies(self):
+        for body in (b'{"game_mode": 1}', b'[1, 2]', b'[{"game_mode": 1} {"game_mode": 2}]',
+                     b'[{"game_mode": 1}] x', b'[{"game_mode": '):
+            with self.assertRaises(InvalidUpload, msg=body):
+                list(iter_json_array(io.BytesIO(body), chunk_size=4))
+        with self.assertRaisesMessage(InvalidUpload, "Line 2"):
+            list(iter_ndjson(io.BytesIO(b'{"game_mode": 1}\n[1]\n')))
+
+
+class CreateGameRecordsTests(PlayerMixin, TestCase):
+    def setUp(self):
+        self.user, self.client = self.create_player("alice")
+        self.game_id = self.start_game(self.client)
+
+    def upload(self, body, content_type="application/json", client=None):
+        return (client or self.client).post("/api/create-gameRecords/", body, content_type=content_type)
+
+    def records(self):
+        return list(
+            GameQuestionRecord.objects.filter(game_mode_id=self.game_id)
+            .order_by('question_number').values_list('question_number', 'user_answer', 'status')
+        )
+
+    def test_array_upload_upserts_and_updates_the_summary(self):
+        records = [
+            {"game_mode": self.game_id, "question_number": n, "user_answer": "3", "correct_answer": "3",
+             "status": "correct", "time": 4, "streak": n}
+            for n in (1, 2)
+        ]
+        response = self.upload(json.dumps(records))
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data, {"status": "success", "saved": 2, "rewarded_badges": []})
+
+        records[1].update(user_answer="5", status="incorrect")
+        self.assertEqual(self.upload(json.dumps(records[1:])).status_code, 201)
+        self.assertEqual(self.records(), [
+            (1, "3", GameQuestionRecord.Status.CORRECT), (2, "5", GameQuestionRecord.Status.INCORRECT),
+        ])
+        game = GameMode.objects.get(pk=self.game_id)
+        self.assertEqual((game.question_count, game.correct_count), (2, 1))
+
+    def test_ndjson_upload(self):
+        body = "\n".join(
+            json.dumps({"game_mode": self.game_id, "question_number": n, "status": "correct"}) for n in (1, 2, 3)
+        ) + "\n\n"
+        response = self.upload(body, content_type="application/x-ndjson")
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["saved"], 3)
+        self.assertEqual(len(self.records()), 3)
+
+    def test_foreign_game_mode_is_forbidden_and_nothing_is_saved(self):
+        _, mallory = self.create_player("mallory")
+        foreign_game = self.start_game(mallory)
+        body = "\n".join(json.dumps({"game_mode": game, "question_number": 1}) for game in (self.game_id, foreign_game))
+
+        response = self.upload(body, content_type="application/x-ndjson")
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(response.data, {"error": f"game_mode {foreign_game} does not belong to you."})
+        self.assertEqual(self.records(), [])
+        self.assertFalse(GameQuestionRecord.objects.filter(game_mode_id=foreign_game).exists())
+
+    def test_invalid_records_are_rejected(self):
+        self.assertEqual(self.upload('{"game_mode": 1}').status_code, 400)
+        response = self.upload(json.dumps([{"game_mode": self.game_id, "status": "maybe"}]))
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.records(), [])
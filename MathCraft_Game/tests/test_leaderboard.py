@@ -0,0 +1,88 @@
+import os
+from unittest import mock
+
+from django.test import SimpleTestCase, TestCase
+
+from MathCraft_Game import views
+from MathCraft_Game.models import GameMode, UserStats
+from MathCraft_Game.utils.leaderboard import Leaderboard, LeaderboardSnapshot, load_score_rows
+
+from .base import PlayerMixin
+
+ROWS = [
+    ("easy", 1, "dave", 90.0),
+    ("easy", 2, "carol", 120.0),
+    ("easy", 3, "bob", 120.0),
+    ("easy", 4, "alice", 150.0),
+    ("easy", 5, "erin", 80.0),
+    ("hard", 1, "dave", 300.0),
+]
+
+
+class LeaderboardSnapshotTests(SimpleTestCase):
+    def setUp(self):
+        self.snapshot = LeaderboardSnapshot(ROWS)
+
+    def test_ties_share_a_rank_and_are_ordered_by_username(self):
+        self.assertEqual(
+            [(row["rank"], row["username"], row["overall_score"]) for row in self.snapshot.top("easy", 10)],
+            [(1, "alice", 150), (2, "bob", 120), (2, "carol", 120), (4, "dave", 90), (5, "erin", 80)],
+        )
+        self.assertEqual(self.snapshot.size("intermediate"), 0)
+
+    def test_pages_are_slices_of_the_ranking(self):
+        self.assertEqual([row["username"] for row in self.snapshot.page("easy", 2, 2)], ["carol", "dave"])
+        self.assertEqual([row["rank"] for row in self.snapshot.page("easy", 3, 2)], [5])
+        self.assertEqual(self.snapshot.page("easy", 4, 2), [])
+
+    def test_around_clips_at_the_ends(self):
+        me, neighbours = self.snapshot.around("easy", 2, radius=1)
+        self.assertEqual(me, {"rank": 2, "username": "carol", "overall_score": 120})
+        self.assertEqual([row["username"] for row in neighbours], ["bob", "carol", "dave"])
+
+        me, neighbours = self.snapshot.around("easy", 4, radius=2)
+        self.assertEqual(me["rank"], 1)
+        self.assertEqual([row["username"] for row in neighbours], ["alice", "bob", "carol"])
+
+        self.assertEqual(self.snapshot.around("hard", 2, radius=2), (None, []))
+
+
+class LeaderboardTests(PlayerMixin, TestCase):
+    def add_score(self, user, mode, iq_sum):
+        UserStats.objects.update_or_create(user=user, mode=mode, defaults={"iq_sum": iq_sum, "games_played": 1})
+
+    def test_scores_come_from_user_stats(self):
+        alice, _ = self.create_player("alice")
+        bob, _ = self.create_player("bob")
+        self.add_score(alice, GameMode.Mode.EASY, 210.0)
+        self.add_score(bob, GameMode.Mode.EASY, 250.0)
+        self.add_score(bob, GameMode.Mode.HARD, 95.0)
+
+        self.assertCountEqual(load_score_rows(), [
+            ("easy", alice.id, "alice", 210.0),
+            ("easy", bob.id, "bob", 250.0),
+            ("hard", bob.id, "bob", 95.0),
+        ])
+
+    def test_refresh_swaps_in_a_new_snapshot_and_serves_the_endpoints(self):
+        alice, client = self.create_player("alice")
+        bob, _ = self.create_player("bob")
+        self.add_score(alice, GameMode.Mode.EASY, 100.0)
+        leaderboard = Leaderboard()
+        old = leaderboard.refresh()
+        leaderboard._pid = os.getpid()  # refreshed by hand: no refresher thread
+
+        self.add_score(bob, GameMode.Mode.EASY, 100.0)
+        self.add_score(alice, GameMode.Mode.EASY, 180.0)
+        self.assertIs(leaderboard.snapshot(), old)
+        leaderboard.refresh()
+        self.assertEqual(old.size("easy"), 1)
+
+        with mock.patch.object(views, "get_leaderboard", return_value=leaderboard):
+            page = client.get("/api/leaderboard/easy/?page_size=1&page=2").data
+            me = client.get("/api/leaderboard/easy/me/").data
+            unknown = client.get("/api/leaderboard/expert/")
+
+        self.assertEqual((page["total_players"], page["results"]), (2, [{"rank": 2, "username": "bob", "overall_score": 100}]))
+        self.assertEqual(me["me"], {"rank": 1, "username": "alice", "overall_score": 180})
+        self.assertEqual(unknown.status_code, 404)
@@ -0,0 +1,40 @@
+import tempfile
+from unittest import mock
+
+from django.test import TestCase, override_settings
+
+from MathCraft_Game.utils import puzzle_engine
+from MathCraft_Game.utils.puzzle_engine import LocalPuzzleProvider
+
+
+class PuzzleImageTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        self.enterContext(override_settings(MEDIA_ROOT=media_root.name))
+        self.provider = LocalPuzzleProvider(seed=7, pool_size=5, image_ttl=60)
+        self.enterContext(mock.patch.object(puzzle_engine, "_provider", self.provider))
+
+    def test_urls_are_opaque_and_never_repeat(self):
+        first, second = self.provider.image_url(3), self.provider.image_url(3)
+        self.assertNotEqual(first, second)
+        for url in (first, second):
+            self.assertTrue(url.startswith("/api/puzzle-image/"))
+            self.assertNotIn("/3.png", url)
+        self.assertRegex(self.provider.image_path(3), r"/[0-9a-f]{32}\.png$")
+
+    def test_image_is_served_by_token(self):
+        url, _ = self.provider()
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "image/png")
+        self.assertEqual(b"".join(response.streaming_content)[:8], b"\x89PNG\r\n\x1a\n")
+
+    def test_tampered_and_expired_tokens_are_404(self):
+        url = self.provider.image_url(1)
+        token = url.rstrip("/").rsplit("/", 1)[-1]
+        tampered = token[:-2] + ("AA" if token[-2:] != "AA" else "BB")
+        self.assertEqual(self.client.get(f"/api/puzzle-image/{tampered}/").status_code, 404)
+
+        with mock.patch("MathCraft_Game.utils.puzzle_engine.time.time", return_value=10 ** 10):
+            self.assertEqual(self.client.get(url).status_code, 404)
@@ -0,0 +1,106 @@
+import os
+import time
+from unittest import mock
+
+import requests
+from django.test import SimpleTestCase, override_settings
+
+from MathCraft_Game.utils import puzzle_pool as puzzle_pool_module
+from MathCraft_Game.utils.puzzle_pool import PuzzlePool, StubUpstream, next_puzzle
+
+PUZZLES = [(f"http://localhost/stub/{i}.png", i) for i in range(10)]
+
+
+class PuzzlePoolTests(SimpleTestCase):
+    def make_pool(self, fetcher=None, **options):
+        options = {"low_watermark": 2, "high_watermark": 5, "retry_delay": 0, **options}
+        pool = PuzzlePool(fetcher or StubUpstream(PUZZLES), **options)
+        pool._pid = os.getpid()  # refilled by hand: take() must not start the filler thread
+        return pool
+
+    def test_refill_stops_at_the_high_watermark(self):
+        stub = StubUpstream(PUZZLES)
+        pool = self.make_pool(stub)
+        pool.refill()
+
+        self.assertEqual(len(pool), 5)
+        self.assertEqual(stub.calls, 5)
+        self.assertEqual(pool.take(), PUZZLES[0])  # oldest first
+
+    def test_filler_is_woken_only_at_the_low_watermark(self):
+        pool = self.make_pool()
+        pool.refill()
+        pool._wakeup.clear()
+
+        pool.take()
+        pool.take()
+        self.assertFalse(pool._wakeup.is_set())  # 3 left
+        pool.take()
+        self.assertTrue(pool._wakeup.is_set())  # 2 left
+
+    def test_expired_puzzles_are_skipped(self):
+        now = [100.0]
+        with mock.patch.object(puzzle_pool_module, 'time', mock.Mock(monotonic=lambda: now[0])):
+            pool = self.make_pool(max_age=60)
+            pool.refill()
+            now[0] += 61
+
+            self.assertIsNone(pool.take())
+        self.assertEqual(pool.stats()["expired"], 5)
+        self.assertEqual(len(pool), 0)
+
+    def test_metrics(self):
+        pool = self.make_pool()
+        pool.refill()
+        for _ in range(7):
+            pool.take()
+
+        stats = pool.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["hit_rate"]), (5, 2, round(5 / 7, 4)))
+        self.assertEqual((stats["fetches"], stats["fetch_errors"]), (5, 0))
+        self.assertIsNotNone(stats["avg_fetch_ms"])
+        self.assertIsNotNone(stats["last_refill_ms"])
+
+    def test_upstream_failure_ends_the_refill_and_schedules_a_retry(self):
+        pool = self.make_pool(StubUpstream(PUZZLES, fail_every=3))
+        with self.assertLogs(puzzle_pool_module.logger, 'WARNING'):
+            pool.refill()
+
+        self.assertEqual(len(pool), 2)
+        self.assertEqual(pool.stats()["fetch_errors"], 1)
+        self.assertTrue(pool._wakeup.is_set())
+
+    def test_filler_thread_tops_the_pool_up(self):
+        pool = PuzzlePool(StubUpstream(PUZZLES), low_watermark=2, high_watermark=5)
+        self.addCleanup(pool.stop, 5)
+        self.assertIn(pool.take(), (None, PUZZLES[0]))  # starts the filler
+
+        deadline = time.monotonic() + 5
+        while len(pool) < 5 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(len(pool), 5)
+
+
+class NextPuzzleTests(SimpleTestCase):
+    def test_empty_pool_falls_back_to_a_live_fetch(self):
+        stub = StubUpstream(PUZZLES)
+        pool = PuzzlePool(stub)
+        pool._pid = os.getpid()
+        with mock.patch.object(puzzle_pool_module, 'get_puzzle_pool', return_value=pool):
+            self.assertEqual(next_puzzle(), PUZZLES[0])
+        self.assertEqual(stub.calls, 1)
+        self.assertEqual(pool.stats()["misses"], 1)
+
+    @override_settings(PUZZLE_POOL={"ENABLED": False, "UPSTREAM": "stub"})
+    def test_disabled_pool_fetches_from_the_stub(self):
+        with mock.patch.object(puzzle_pool_module, '_stub', None):
+            question, solution = next_puzzle()
+            self.assertEqual(puzzle_pool_module._stub.calls, 1)
+        self.assertTrue(question.startswith("http://localhost/stub-banana/"))
+        self.assertIn(solution, range(10))
+
+    def test_stub_fails_on_schedule(self):
+        stub = StubUpstream(PUZZLES, fail_every=2)
+        stub()
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            stub()
@@ -0,0 +1,66 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from MathCraft_Game.models import GameMode, GameQuestionRecord
+from MathCraft_Game.utils.stats import rebuild_user_stats, sync_game_summaries
+from MathCraft_Game.views import peak_metrics, player_overview, user_achievements
+
+# view -> most queries one request may issue (authentication excluded: the
+# cached token backend serves reads with request.user.profile preloaded),
+# including the data-version read behind the ETag
+BUDGETS = [
+    ("peak_metrics", peak_metrics, 2),
+    ("player_overview", player_overview, 3),
+    ("user_achievements", user_achievements, 3),
+]
+CONDITIONAL_BUDGET = 1  # a matching If-None-Match: the version read only
+
+
+class DashboardQueryBudgetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("query-check")
+        modes = list(GameMode.Mode)
+        GameMode.objects.bulk_create([
+            GameMode(user=cls.user, mode=modes[i % 3], attempt=i + 1, iq=90.0 + i) for i in range(30)
+        ])
+        game_ids = list(GameMode.objects.filter(user=cls.user).values_list('pk', flat=True))
+        GameQuestionRecord.objects.bulk_create([
+            GameQuestionRecord(game_mode_id=game_id, question_number=q, time=4, streak=q,
+                               status=GameQuestionRecord.Status.CORRECT)
+            for game_id in game_ids
+            for q in range(1, 6)
+        ])
+        sync_game_summaries(game_ids)
+        rebuild_user_stats([cls.user.id])
+
+    def request(self, **headers):
+        # Fresh user with the profile preloaded, as CachedTokenAuthentication provides it
+        request = APIRequestFactory().get("/", **headers)
+        force_authenticate(request, user=User.objects.select_related('profile').get(pk=self.user.pk))
+        return request
+
+    def test_dashboard_views_stay_within_their_budgets(self):
+        for name, view, budget in BUDGETS:
+            with self.subTest(name):
+                request = self.request()
+                with self.assertNumQueries(budget):
+                    response = view(request)
+                self.assertEqual(response.status_code, 200)
+
+                request = self.request(HTTP_IF_NONE_MATCH=response['ETag'])
+                with self.assertNumQueries(CONDITIONAL_BUDGET):
+                    response = view(request)
+                self.assertEqual(response.status_code, 304)
+
+    def test_reads_do_not_grow_with_history(self):
+        # Twice the attempts, same statements: the per-mode summaries are read, not the history
+        more = [GameMode(user=self.user, mode=GameMode.Mode.EASY, attempt=100 + i, iq=100.0) for i in range(30)]
+        GameMode.objects.bulk_create(more)
+        rebuild_user_stats([self.user.id])
+        for name, view, budget in BUDGETS:
+            with self.subTest(name):
+                request = self.request()
+                with self.assertNumQueries(budget):
+                    view(request)
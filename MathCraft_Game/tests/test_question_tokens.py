@@ -0,0 +1,77 @@
+from unittest import mock
+
+from django.test import SimpleTestCase, TestCase
+
+from MathCraft_Game.utils import question_tokens
+from MathCraft_Game.utils.question_tokens import InvalidQuestionToken, issue_question_token, read_question_token
+
+from .base import OFFLINE_PUZZLES, PlayerMixin
+
+
+class QuestionTokenTests(SimpleTestCase):
+    def test_round_trip(self):
+        token = issue_question_token(7, 11, 3, 5)
+        claims = read_question_token(token, 7, 11, 3)
+        self.assertEqual((claims.solution, claims.game_mode_id, claims.question_number), ("5", 11, 3))
+
+    def test_tampered_token_is_rejected(self):
+        token = issue_question_token(7, 11, 3, 5)
+        for position in (5, len(token) // 2, len(token) - 3):
+            flipped = token[:position] + ("A" if token[position] != "A" else "B") + token[position + 1:]
+            with self.assertRaisesMessage(InvalidQuestionToken, "signature mismatch"):
+                read_question_token(flipped, 7)
+        for malformed in ("", "not a token", token[:10]):
+            with self.assertRaises(InvalidQuestionToken):
+                read_question_token(malformed, 7)
+
+    def test_payload_is_not_readable(self):
+        raw = question_tokens._b64decode(question_tokens.seal(["solution-1234", 11]))
+        self.assertNotIn(b"solution-1234", raw)
+        self.assertNotEqual(question_tokens.seal([5]), question_tokens.seal([5]))
+
+    def test_namespaces_and_old_versions_do_not_unseal(self):
+        with self.assertRaisesMessage(InvalidQuestionToken, "signature mismatch"):
+            question_tokens.unseal(question_tokens.seal([5], "puzzle-image"))
+
+        raw = question_tokens._b64decode(question_tokens.seal([5]))
+        with self.assertRaisesMessage(InvalidQuestionToken, "Malformed"):
+            question_tokens.unseal(question_tokens._b64encode(b"\x01" + raw[1:]))
+
+    def test_expired_token_is_rejected(self):
+        token = issue_question_token(7, 11, 3, 5, ttl=60)
+        with mock.patch.object(question_tokens.time, "time", return_value=question_tokens.time.time() + 61):
+            with self.assertRaisesMessage(InvalidQuestionToken, "expired"):
+                read_question_token(token, 7)
+
+    def test_token_is_bound_to_user_game_and_question(self):
+        token = issue_question_token(7, 11, 3, 5)
+        with self.assertRaisesMessage(InvalidQuestionToken, "does not belong"):
+            read_question_token(token, 8)
+        with self.assertRaisesMessage(InvalidQuestionToken, "different game"):
+            read_question_token(token, 7, game_mode_id=12)
+        with self.assertRaisesMessage(InvalidQuestionToken, "different question"):
+            read_question_token(token, 7, question_number=4)
+
+
+@OFFLINE_PUZZLES
+class QuestionTokenFlowTests(PlayerMixin, TestCase):
+    def test_another_players_token_is_refused(self):
+        _, alice = self.create_player("alice")
+        _, mallory = self.create_player("mallory")
+        game_id = self.start_game(alice)
+        token = alice.post("/api/marcconrad-game/", {"game_mode_id": game_id, "question_number": 1},
+                           format="json").data["question_token"]
+
+        self.assertEqual(alice.post("/api/get-hint/", {"question_token": token}, format="json").status_code, 200)
+        for path, data in (
+            ("/api/get-hint/", {"question_token": token}),
+            ("/api/submit-answer/", {"question_token": token, "user_answer": 1, "time_taken": 3}),
+        ):
+            response = mallory.post(path, data, format="json")
+            self.assertEqual(response.status_code, 400)
+            self.assertIn("does not belong", response.data["error"])
+
+        response = alice.post("/api/submit-answer/", {"question_token": token, "user_answer": 1, "time_taken": 3},
+                              format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(response.data["status"], ("correct", "incorrect"))
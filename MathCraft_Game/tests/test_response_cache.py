@@ -0,0 +1,100 @@
+import threading
+from unittest import mock
+
+from django.core.cache import cache
+from django.http import JsonResponse
+from django.test import RequestFactory, SimpleTestCase
+
+from MathCraft_Game.utils import response_cache as response_cache_module
+from MathCraft_Game.utils.response_cache import ResponseCache
+
+
+class ResponseCacheTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.now = 1000.0
+        clock = mock.patch.object(response_cache_module, 'time', mock.Mock(time=lambda: self.now))
+        clock.start()
+        self.addCleanup(clock.stop)
+        self.responses = ResponseCache(ttl=10, stale_ttl=120)
+        self.calls = []
+
+    def view(self, request):
+        self.calls.append(request)
+        return JsonResponse({"call": len(self.calls)})
+
+    def get(self, **headers):
+        request = RequestFactory().get('/api/leaderboard/', **headers)
+        return request, self.responses.serve('board', self.view, request, (), {})
+
+    def join_refresh(self):
+        for thread in threading.enumerate():
+            if thread.name == 'response-refresh:board':
+                thread.join(5)
+
+    def test_fresh_entry_is_served_without_running_the_view(self):
+        _, first = self.get()
+        self.now += 5
+        _, second = self.get()
+
+        self.assertEqual((first['X-Cache'], second['X-Cache']), ("MISS", "HIT"))
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(len(self.calls), 1)
+        self.assertEqual(self.responses.stats()["hits"], 1)
+
+    def test_expired_entry_is_served_stale_and_refreshed_in_the_background(self):
+        _, first = self.get()
+        self.now += 11
+        request, stale = self.get()
+        self.join_refresh()
+
+        self.assertEqual(stale['X-Cache'], "STALE")
+        self.assertEqual(stale.content, first.content)
+        self.assertEqual(len(self.calls), 2)
+        # the refresh thread runs the view on a copy, never on the request being answered
+        self.assertIsNot(self.calls[1], request)
+        self.assertEqual(self.calls[1].path, request.path)
+
+        _, refreshed = self.get()
+        self.assertEqual(refreshed['X-Cache'], "HIT")
+        self.assertJSONEqual(refreshed.content, {"call": 2})
+        self.assertEqual(self.responses.stats()["refreshes"], 1)
+
+    def test_one_refresh_at_a_time(self):
+        self.get()
+        self.now += 11
+        with mock.patch.object(response_cache_module, 'threading') as threading_mock:
+            self.get()
+            self.get()
+        self.assertEqual(threading_mock.Thread.call_count, 1)
+        self.assertEqual(self.responses.stats()["stale_hits"], 2)
+
+    def test_version_bump_invalidates_and_rebuilds(self):
+        rebuilt = []
+        self.get()
+        self.responses.bump_version('board')
+        request = RequestFactory().get('/api/leaderboard/')
+        stale = self.responses.serve('board', self.view, request, (), {}, rebuild=lambda: rebuilt.append(1))
+        self.join_refresh()
+
+        self.assertEqual(stale['X-Cache'], "STALE")
+        self.assertEqual(rebuilt, [1])
+        _, fresh = self.get()
+        self.assertEqual(fresh['X-Cache'], "HIT")
+        self.assertJSONEqual(fresh.content, {"call": 2})
+
+    def test_matching_etag_gets_not_modified(self):
+        _, first = self.get()
+        _, revalidated = self.get(HTTP_IF_NONE_MATCH=first['ETag'])
+
+        self.assertEqual(revalidated.status_code, 304)
+        self.assertEqual(revalidated['ETag'], first['ETag'])
+        self.assertEqual(self.responses.stats()["not_modified"], 1)
+
+    def test_errors_are_not_cached(self):
+        request = RequestFactory().get('/api/leaderboard/')
+        response = self.responses.serve('board', lambda request: JsonResponse({}, status=503), request, (), {})
+
+        self.assertEqual(response.status_code, 503)
+        self.assertIsNone(cache.get('response:board:'))
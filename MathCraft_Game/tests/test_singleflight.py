@@ -0,0 +1,127 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+from django.test import SimpleTestCase
+from rest_framework.response import Response
+
+from MathCraft_Game.utils import singleflight as singleflight_module
+from MathCraft_Game.utils.singleflight import FileLocks, SingleFlight, fcntl, singleflight
+
+
+class SingleFlightTests(SimpleTestCase):
+    def test_concurrent_callers_share_one_computation(self):
+        flight = SingleFlight(wait_timeout=5)
+        started, release = threading.Event(), threading.Event()
+        calls = []
+
+        def compute():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return 200, {"value": 1}
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(flight.do("k", compute))) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        started.wait(5)
+        time.sleep(0.2)  # the other callers join the call in flight
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [(200, {"value": 1})] * 4)
+
+    def test_requests_checked_against_a_newer_data_version_do_not_share(self):
+        started, release = threading.Event(), threading.Event()
+        calls = []
+
+        @singleflight('versions')
+        def view(request):
+            calls.append(request.data_etag)
+            if len(calls) == 1:
+                started.set()
+                release.wait(5)
+            return Response({"etag": request.data_etag})
+
+        def request(etag):
+            return SimpleNamespace(method='GET', user=SimpleNamespace(id=1), data_etag=etag,
+                                   get_full_path=lambda: '/api/peak-metrics/')
+
+        with mock.patch.object(singleflight_module, '_flight', SingleFlight(wait_timeout=5)):
+            leader = threading.Thread(target=view, args=(request('"v1"'),))
+            leader.start()
+            started.wait(5)
+            threading.Timer(0.2, release.set).start()
+            # A write bumped the version while the leader was computing: this request must not get its result
+            response = view(request('"v2"'))
+            leader.join()
+
+        self.assertEqual(response.data, {"etag": '"v2"'})
+        self.assertEqual(calls, ['"v1"', '"v2"'])
+
+
+@unittest.skipIf(fcntl is None, "needs fcntl")
+class FileLocksTests(SimpleTestCase):
+    def setUp(self):
+        self.root = tempfile.TemporaryDirectory()
+        self.directory = os.path.join(self.root.name, "locks")
+
+    def tearDown(self):
+        self.root.cleanup()
+
+    def test_follower_reads_the_leaders_json_result(self):
+        leader, follower = FileLocks(self.directory), FileLocks(self.directory)
+        started, release = threading.Event(), threading.Event()
+
+        def compute():
+            started.set()
+            release.wait(5)
+            return [200, {"score": 1.5, "modes": ["easy"]}]
+
+        thread = threading.Thread(target=leader.do, args=("key", compute, 5))
+        thread.start()
+        started.wait(5)
+        threading.Timer(0.05, release.set).start()
+        result, shared = follower.do("key", lambda: self.fail("the follower computed"), 5)
+        thread.join()
+
+        self.assertTrue(shared)
+        self.assertEqual(result, [200, {"score": 1.5, "modes": ["easy"]}])
+
+    def test_planted_result_is_never_unpickled(self):
+        locks = FileLocks(self.directory)
+        _, result_path = locks._paths("key")
+        with open(result_path, "wb") as f:
+            f.write(b"\x80\x04cos\nsystem\n.")  # a pickle, not JSON
+        self.assertIsNone(locks._read(result_path, 0))
+
+    def test_refuses_a_directory_others_can_write(self):
+        os.makedirs(self.directory, mode=0o700)
+        os.chmod(self.directory, 0o777)
+        with self.assertRaises(PermissionError):
+            FileLocks(self.directory)
+
+    def test_refuses_a_symlinked_directory(self):
+        target = os.path.join(self.root.name, "elsewhere")
+        os.makedirs(target, mode=0o700)
+        os.symlink(target, self.directory)
+        with self.assertRaises(PermissionError):
+            FileLocks(self.directory)
+
+    def test_sweep_removes_expired_files(self):
+        locks = FileLocks(self.directory)
+        locks.do("old", lambda: [200, {}], 1)
+        expired = time.time() - locks.RESULT_TTL - 1
+        for name in os.listdir(self.directory):
+            os.utime(os.path.join(self.directory, name), (expired, expired))
+
+        locks._swept_at -= locks.RESULT_TTL
+        locks.do("new", lambda: [200, {}], 1)
+        self.assertEqual(sorted(os.listdir(self.directory)), sorted(os.path.basename(p) for p in locks._paths("new")))
@@ -0,0 +1,41 @@
+from django.db import transaction
+from django.test import TestCase
+
+from MathCraft_Game.models import GameMode, GameQuestionRecord, UserStats
+from MathCraft_Game.utils.records import upsert_question_records
+from MathCraft_Game.utils.stats import rebuild_user_stats, record_game_finished, sync_game_summaries
+
+from .base import PlayerMixin
+
+STAT_FIELDS = [
+    'mode', 'games_played', 'questions_answered', 'correct_answers', 'iq_sum', 'iq_count',
+    'best_iq', 'best_streak', 'fastest_time', 'qualifying_games',
+]
+
+
+class UserStatsTests(PlayerMixin, TestCase):
+    def stats(self, user):
+        return list(UserStats.objects.filter(user=user).order_by('mode').values_list(*STAT_FIELDS))
+
+    def test_incremental_rows_match_a_rebuild(self):
+        user, client = self.create_player("alice")
+        for mode, correct in (("easy", 5), ("easy", 2), ("hard", 6)):
+            game = GameMode.objects.get(pk=self.start_game(client, mode))
+            with transaction.atomic():
+                upsert_question_records([
+                    GameQuestionRecord(
+                        game_mode=game, question_number=q, correct_answer="1", user_answer="1", time=3, streak=q,
+                        status=GameQuestionRecord.Status.CORRECT if q <= correct else GameQuestionRecord.Status.INCORRECT,
+                    )
+                    for q in range(1, 7)
+                ], update_fields=['user_answer', 'status', 'time', 'streak'])
+                sync_game_summaries([game.id])
+            game.refresh_from_db()
+            game.iq = 100.0 + correct
+            game.save(update_fields=['iq'])
+            record_game_finished(game, None)
+
+        incremental = self.stats(user)
+        self.assertEqual([row[:2] for row in incremental], [(GameMode.Mode.EASY, 2), (GameMode.Mode.HARD, 1)])
+        rebuild_user_stats([user.id])
+        self.assertEqual(self.stats(user), incremental)
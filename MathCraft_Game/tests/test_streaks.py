@@ -0,0 +1,61 @@
+from datetime import date, timedelta
+from unittest import mock
+
+from django.test import TestCase
+
+from MathCraft_Game.models import UserProfile
+from MathCraft_Game.utils import streaks
+from MathCraft_Game.utils.streaks import get_streak, record_activity
+
+from .base import PlayerMixin
+
+MONDAY = date(2025, 3, 3)
+
+
+class StreakTests(PlayerMixin, TestCase):
+    def setUp(self):
+        self.user, self.client = self.create_player("alice")
+
+    def counters(self):
+        return UserProfile.objects.values_list('current_streak', 'longest_streak', 'last_active_date').get(user=self.user)
+
+    def test_consecutive_days_extend_the_streak(self):
+        for offset in range(3):
+            self.assertTrue(record_activity(self.user.id, MONDAY + timedelta(days=offset)))
+        self.assertEqual(self.counters(), (3, 3, MONDAY + timedelta(days=2)))
+
+    def test_repeat_activity_on_the_same_day_is_a_no_op(self):
+        record_activity(self.user.id, MONDAY)
+        with mock.patch.object(streaks, 'record_event') as record_event:
+            self.assertFalse(record_activity(self.user.id, MONDAY))
+        record_event.assert_not_called()
+        self.assertEqual(self.counters(), (1, 1, MONDAY))
+
+    def test_a_missed_day_restarts_the_streak_and_keeps_the_longest(self):
+        for offset in (0, 1, 2, 4):
+            record_activity(self.user.id, MONDAY + timedelta(days=offset))
+        self.assertEqual(self.counters(), (1, 3, MONDAY + timedelta(days=4)))
+
+        record_activity(self.user.id, MONDAY + timedelta(days=5))
+        self.assertEqual(self.counters(), (2, 3, MONDAY + timedelta(days=5)))
+
+    def test_an_earlier_day_does_not_rewind_the_counters(self):
+        record_activity(self.user.id, MONDAY + timedelta(days=1))
+        self.assertFalse(record_activity(self.user.id, MONDAY))
+        self.assertEqual(self.counters(), (1, 1, MONDAY + timedelta(days=1)))
+
+    def test_streak_reads_as_broken_after_a_missed_day(self):
+        record_activity(self.user.id, MONDAY)
+        record_activity(self.user.id, MONDAY + timedelta(days=1))
+
+        self.assertEqual(get_streak(self.user.id, today=MONDAY + timedelta(days=1))["current"], 2)
+        self.assertEqual(get_streak(self.user.id, today=MONDAY + timedelta(days=2))["current"], 2)  # not yet today
+        broken = get_streak(self.user.id, today=MONDAY + timedelta(days=3))
+        self.assertEqual((broken["current"], broken["longest"]), (0, 2))
+
+    def test_daily_streak_endpoint_records_today(self):
+        first = self.client.get("/api/daily-streak/").data
+        second = self.client.get("/api/daily-streak/").data
+
+        self.assertEqual((first["daily_streak"], first["longest_streak"]), (1, 1))
+        self.assertEqual((second["daily_streak"], second["longest_streak"]), (1, 1))
@@ -0,0 +1,81 @@
+import os
+from unittest import mock
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from MathCraft_Game.models import GameMode, GameQuestionRecord, UserStats
+from MathCraft_Game.utils import game_sessions
+from MathCraft_Game.utils.game_sessions import GameSessions, MemoryBackend
+from MathCraft_Game.utils.question_tokens import issue_question_token
+
+from .base import PlayerMixin
+
+
+class SyncSessionTests(PlayerMixin, TestCase):
+    def setUp(self):
+        self.user, self.client = self.create_player("alice")
+        self.game_id = self.start_game(self.client, "hard")
+        GameQuestionRecord.objects.bulk_create([
+            GameQuestionRecord(game_mode_id=self.game_id, question_number=n, correct_answer=str(n)) for n in (1, 2, 3)
+        ])
+
+    def sync(self, answers, **extra):
+        return self.client.post("/api/sync-session/", {"game_mode_id": self.game_id, "answers": answers, **extra},
+                                format="json")
+
+    def answer(self, number, user_answer, **extra):
+        return {"question_number": number, "user_answer": user_answer, "time_taken": 4, **extra}
+
+    def test_answers_are_scored_in_order_with_the_streak_carried(self):
+        token = issue_question_token(self.user.id, self.game_id, 4, "4")
+        answers = [self.answer(4, "4", question_token=token), self.answer(2, "2"), self.answer(1, "1"),
+                   self.answer(3, "x")]
+        response = self.sync(answers)
+        self.assertEqual(response.status_code, 200, response.data)
+
+        results = [(r["question_number"], r["status"], r["final_streak"]) for r in response.data["results"]]
+        self.assertEqual(results, [(1, "correct", 1), (2, "correct", 2), (3, "incorrect", 0), (4, "correct", 1)])
+        self.assertEqual((response.data["correct_count"], response.data["total_time"]), (3, 16))
+        game = GameMode.objects.get(pk=self.game_id)
+        self.assertEqual((game.correct_count, game.question_count), (3, 4))
+
+    def test_records_are_written_with_one_upsert(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.sync([self.answer(n, str(n)) for n in (1, 2, 3)]).status_code, 200)
+        writes = [q["sql"] for q in queries if q["sql"].startswith("INSERT") and "gamequestionrecord" in q["sql"]]
+        self.assertEqual(len(writes), 1)
+
+    def test_iq_is_left_alone_unless_the_client_sends_it(self):
+        self.client.patch(f"/api/update-gameMode/{self.game_id}/", {"iq": 118.5}, format="json")
+
+        response = self.sync([self.answer(1, "1")])
+        self.assertEqual(response.data["iq"], 118.5)
+        self.assertEqual(GameMode.objects.get(pk=self.game_id).iq, 118.5)
+
+        response = self.sync([self.answer(2, "2")], iq=121.0)
+        self.assertEqual(response.data["iq"], 121.0)
+        stats = UserStats.objects.get(user=self.user, mode=GameMode.Mode.HARD)
+        self.assertEqual((stats.iq_sum, stats.iq_count), (121.0, 1))
+
+    def test_rejected_requests(self):
+        self.assertEqual(self.sync([self.answer(1, "1"), self.answer(1, "2")]).status_code, 400)
+        response = self.sync([self.answer(9, "9")])
+        self.assertEqual((response.status_code, response.data["question_numbers"]), (404, [9]))
+        _, other = self.create_player("bob")
+        response = other.post("/api/sync-session/", {"game_mode_id": self.game_id, "answers": [self.answer(1, "1")]},
+                              format="json")
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(GameQuestionRecord.objects.filter(game_mode_id=self.game_id).exclude(user_answer='').exists())
+
+    @override_settings(GAME_SESSIONS={"ENABLED": True})
+    def test_active_session_is_finished_first(self):
+        sessions = GameSessions(MemoryBackend(), flush_interval=3600)
+        sessions._pid = os.getpid()  # no flusher thread
+        with mock.patch.object(game_sessions, '_sessions', sessions):
+            sessions.open_question(self.user.id, self.game_id, 5, "5")
+            response = self.sync([self.answer(5, "5")])
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(response.data["results"][0]["status"], "correct")
+        self.assertFalse(sessions.owns(self.user.id, self.game_id))
@@ -0,0 +1,55 @@
+import json
+
+from asgiref.sync import async_to_sync
+from django.db import connection
+from django.test import RequestFactory, TransactionTestCase
+from django.utils import timezone
+
+from MathCraft_Game import views_async
+
+from .base import PlayerMixin
+
+
+class AsyncDashboardTests(PlayerMixin, TransactionTestCase):
+    def setUp(self):
+        if connection.vendor == 'sqlite' and connection.is_in_memory_db():
+            self.skipTest("the database executor needs a test database it can share (set DATABASES TEST NAME to a file)")
+        self.user, self.client = self.create_player("alice")
+        self.start_game(self.client, "hard")
+        self.factory = RequestFactory(HTTP_AUTHORIZATION=self.client._credentials["HTTP_AUTHORIZATION"])
+
+    def call(self, view, request, **kwargs):
+        return async_to_sync(view)(request, **kwargs)
+
+    def test_responses_match_the_sync_views(self):
+        today = timezone.localdate()
+        cases = [
+            (views_async.player_overview, "/api/player-overview/", {}),
+            (views_async.monthly_performance, f"/api/monthly-performance/{today.year}/{today.month}/",
+             {"year": today.year, "month": today.month}),
+        ]
+        for view, path, kwargs in cases:
+            expected = self.client.get(path)
+            response = self.call(view, self.factory.get(path), **kwargs)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(json.loads(response.content), expected.json())
+
+    def test_etag_revalidation(self):
+        response = self.call(views_async.player_overview, self.factory.get("/api/player-overview/"))
+        etag = response["ETag"]
+        self.assertEqual(response["Cache-Control"], "private, no-cache")
+
+        response = self.call(
+            views_async.player_overview, self.factory.get("/api/player-overview/", HTTP_IF_NONE_MATCH=etag)
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_always_json_and_get_only(self):
+        # A separate endpoint family: no content negotiation, no browsable API
+        response = self.call(views_async.player_overview, self.factory.get("/api/player-overview/", HTTP_ACCEPT="text/html"))
+        self.assertEqual(response["Content-Type"], "application/json")
+        self.assertEqual(self.call(views_async.player_overview, self.factory.post("/api/player-overview/")).status_code, 405)
+
+    def test_requires_a_valid_token(self):
+        response = self.call(views_async.player_overview, RequestFactory().get("/api/player-overview/"))
+        self.assertEqual(response.status_code, 401)
@@ -7,8 +7,16 @@ from .views import (
    last_ten_games_chart,
     monthly_iq_chart,
     mode_distribution_chart,user_achievements,peak_metrics,monthly_performance,user_coins,update_coins,greeting_view, user_level_view, leaderboard_view,overall_score,
-    marcconrad_game,get_hint,submit_answer,player_overview,user_credentials,get_profile_photo,logout_view,password_reset_request,password_reset_confirm
+    marcconrad_game,puzzle_image,get_hint,submit_answer,player_overview,user_credentials,get_profile_photo,logout_view,password_reset_request,password_reset_confirm,
+    service_metrics, leaderboard_page, leaderboard_me, activity_heatmap, sync_session, batch
 )
+from .utils.async_db import get_async_settings
+
+# ASYNC_VIEWS["ENABLED"]: the dashboard reads fan their queries out concurrently (serve via asgi.py).
+# Same URLs and JSON, but plain async views: no DRF content negotiation and no @singleflight
+if get_async_settings()["ENABLED"]:
+    from .views_async import monthly_performance, player_overview, user_achievements
+
 urlpatterns = [
     path('register/', RegisterAPIView.as_view(), name='register'),
     path('login/', LoginAPIView.as_view(), name='login'),
@@ -34,22 +42,28 @@ urlpatterns = [
     path('user-achievements/', user_achievements, name='user-achievements'),
     path('peak-metrics/', peak_metrics, name='peak-metrics'),
     path('monthly-performance/<int:year>/<int:month>/',monthly_performance, name='monthly-performance'),
+    path('activity-heatmap/<int:year>/', activity_heatmap, name='activity-heatmap'),
     path('user-coins/', user_coins, name='user_coins'),
     
     path('update-coins/', update_coins, name='update_coins'),
     path("greeting/", greeting_view, name="greeting"),
     path("user-level/", user_level_view, name="user-level"),
     path("leaderboard/", leaderboard_view, name="leaderboard"),
+    path("leaderboard/<str:mode>/", leaderboard_page, name="leaderboard-page"),
+    path("leaderboard/<str:mode>/me/", leaderboard_me, name="leaderboard-me"),
     path('overall-score/', overall_score, name='overall-score'),
      
     # 1. Secure Question Fetch and Solution Storage (Used by loadNextQuestion)
     path('marcconrad-game/', marcconrad_game, name='marcconrad_game'),
+    path('puzzle-image/<str:token>/', puzzle_image, name='puzzle_image'),
     
     # 2. Secure Hint Generation (Used by handleHint)
     path('get-hint/', get_hint, name='get_hint'),
     
      # 3. Secure Answer Submission/Checking (NEW)
     path('submit-answer/', submit_answer, name='submit_answer'),
+    path('sync-session/', sync_session, name='sync_session'),
+    path('batch/', batch, name='batch'),
     path('player-overview/', player_overview, name='player-overview'),
     path('user-credentials/', user_credentials, name='user-credentials'),
     path('profile/',get_profile_photo, name='get_profile_photo'),
@@ -57,4 +71,7 @@ urlpatterns = [
     path('logout/', logout_view, name='logout'),
     path("password-reset/", password_reset_request, name="password-reset"),
     path('password-reset/confirm/', password_reset_confirm, name='password_reset_confirm'),
+
+    # Internal metrics for background subsystems (staff only)
+    path('service-metrics/', service_metrics, name='service-metrics'),
 ]
\ No newline at end of file
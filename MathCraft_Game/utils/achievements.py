@@ -0,0 +1,197 @@
+# utils/achievements.py
+
+from django.db import transaction
+from django.utils import timezone
+
+from ..models import AchievementProgress, AchievementReward, GameMode, UserProfile, UserStats
+from .coins import CoinChange, apply_coin_changes
+from .data_versions import bump_data_version
+
+# Events the write paths report; each badge re-evaluates only on the events it lists
+ANSWER_SUBMITTED = 'answer_submitted'  # submit_answer, CreateGameRecordsView
+GAME_STARTED = 'game_started'          # CreateGameModeView
+GAME_FINISHED = 'game_finished'        # UpdateGameModeIQView (IQ written)
+LOGIN = 'login'                        # first activity of a day (utils.streaks)
+
+REWARD_COINS = 5000
+
+
+class Badge:
+    def __init__(self, name, events, evaluate):
+        self.name = name
+        self.events = frozenset(events)
+        self.evaluate = evaluate  # (context, previous_progress_or_None) -> (progress, unlocked)
+
+
+class EvaluationContext:
+    """Per-event state shared by the badges being evaluated (UserStats is read at most once)."""
+
+    def __init__(self, user_id, payload):
+        self.user_id = user_id
+        self.payload = payload
+        self._stats = None
+
+    @property
+    def stats(self):
+        if self._stats is None:
+            self._stats = {row.get_mode_display(): row for row in UserStats.objects.filter(user_id=self.user_id)}
+        return self._stats
+
+    def stat(self, mode, field):
+        row = self.stats.get(mode)
+        return getattr(row, field) if row is not None else 0
+
+
+# ----------------------------------------------------------------------
+# Badge rules
+# ----------------------------------------------------------------------
+def _code_crusader(ctx, previous):
+    current = sum(row.correct_answers for row in ctx.stats.values())
+    return {'current': current}, current >= 100
+
+
+def _master_calibrator(ctx, previous):
+    best_iq = max((row.best_iq for row in ctx.stats.values() if row.best_iq is not None), default=0)
+    return {'best_iq': best_iq}, best_iq >= 100
+
+
+def _daily_devotion(ctx, previous):
+    # Streak counters are maintained on UserProfile by utils.streaks.record_activity
+    streak = UserProfile.objects.filter(user_id=ctx.user_id).values_list('current_streak', flat=True).first() or 0
+    return {'current_streak': streak}, streak >= 30
+
+
+def _lightning_solver(ctx, previous):
+    hit_max = bool(previous and previous.get('hit_max'))
+    if not hit_max:
+        hard_games = GameMode.objects.filter(user_id=ctx.user_id, mode=GameMode.Mode.HARD, total_streak=50)
+        if previous is not None and ctx.payload.get('game_mode_ids'):
+            hard_games = hard_games.filter(pk__in=ctx.payload['game_mode_ids'])
+        hit_max = hard_games.exists()
+    return {'best_streak': ctx.stat('hard', 'best_streak'), 'hit_max': hit_max}, hit_max
+
+
+def _apex_challenger(ctx, previous):
+    current = ctx.stat('hard', 'qualifying_games')
+    return {'current': current}, current >= 50
+
+
+def _true_polymath(ctx, previous):
+    counts = {mode: ctx.stat(mode, 'games_played') for mode in ('easy', 'intermediate', 'hard')}
+    return counts, all(count >= 5 for count in counts.values())
+
+
+BADGES = [
+    Badge('code_crusader', [ANSWER_SUBMITTED], _code_crusader),
+    Badge('master_calibrator', [GAME_FINISHED], _master_calibrator),
+    Badge('daily_devotion', [LOGIN], _daily_devotion),
+    Badge('lightning_solver', [ANSWER_SUBMITTED], _lightning_solver),
+    Badge('apex_challenger', [ANSWER_SUBMITTED], _apex_challenger),
+    Badge('true_polymath', [GAME_STARTED], _true_polymath),
+]
+
+
+# ----------------------------------------------------------------------
+# Engine
+# ----------------------------------------------------------------------
+def _evaluate(user_id, badges, payload):
+    """
+    Evaluates `badges` for one user inside a transaction, storing their progress
+    and paying the reward for every badge that becomes unlocked. The progress
+    rows are locked first, so concurrent events cannot pay a reward twice.
+    """
+    names = [badge.name for badge in badges]
+    with transaction.atomic():
+        locked = AchievementProgress.objects.select_for_update().filter(user_id=user_id, badge_name__in=names)
+        rows = {row.badge_name: row for row in locked}
+        if len(rows) < len(names):
+            AchievementProgress.objects.bulk_create(
+                [AchievementProgress(user_id=user_id, badge_name=name) for name in names if name not in rows],
+                ignore_conflicts=True,
+            )
+            rows = {row.badge_name: row for row in locked.all()}
+
+        ctx = EvaluationContext(user_id, payload)
+        changed, newly_unlocked = [], []
+        for badge in badges:
+            row = rows[badge.name]
+            progress, unlocked = badge.evaluate(ctx, row.progress or None)
+            if progress == row.progress and (row.unlocked or not unlocked):
+                continue
+            row.progress = progress
+            if unlocked and not row.unlocked:
+                row.unlocked = True
+                row.unlocked_at = timezone.now()
+                newly_unlocked.append(row)
+            changed.append(row)
+
+        payouts = []
+        for row in newly_unlocked:
+            reward, created = AchievementReward.objects.get_or_create(
+                user_id=user_id, badge_name=row.badge_name, defaults={'rewarded': True}
+            )
+            if created or not reward.rewarded:
+                if not created:
+                    AchievementReward.objects.filter(pk=reward.pk).update(rewarded=True)
+                payouts.append(CoinChange(REWARD_COINS, 'achievement', row.badge_name))
+                row.reward_seen = False  # reported once, by the next write response (take_unseen_rewards)
+        apply_coin_changes(user_id, payouts)
+
+        if changed:
+            AchievementProgress.objects.bulk_update(changed, ['progress', 'unlocked', 'unlocked_at', 'reward_seen'])
+            bump_data_version(user_id)
+    return rows
+
+
+def record_event(user_id, event, **payload):
+    """Re-evaluates the badges that depend on `event` (call inside the writing transaction)."""
+    badges = [badge for badge in BADGES if event in badge.events]
+    if badges:
+        _evaluate(user_id, badges, payload)
+
+
+def get_achievements(user):
+    """
+    Returns {badge_name: AchievementProgress} for every badge, as stored (a plain
+    read). A badge without a row has never been reached by one of its events and
+    is reported locked; rows of users from before the engine are created by
+    `manage.py backfill_achievements`.
+    """
+    rows = {row.badge_name: row for row in AchievementProgress.objects.filter(user=user)}
+    for badge in BADGES:
+        rows.setdefault(badge.name, AchievementProgress(user=user, badge_name=badge.name))
+    return rows
+
+
+def unseen_rewards(rows):
+    """Badge names rewarded but not yet reported (e.g. unlocked by a background flush)."""
+    return [name for name, row in rows.items() if not row.reward_seen]
+
+
+def take_unseen_rewards(user_id):
+    """
+    Badge names rewarded since they were last reported; marks them as seen.
+    Called by the write endpoints after their events, which report the
+    result as `rewarded_badges`.
+    """
+    unseen = list(
+        AchievementProgress.objects.filter(user_id=user_id, reward_seen=False).values_list('badge_name', flat=True)
+    )
+    if unseen:
+        AchievementProgress.objects.filter(user_id=user_id, badge_name__in=unseen).update(reward_seen=True)
+        bump_data_version(user_id)  # user_achievements no longer lists them
+    return unseen
+
+
+def backfill_achievements(user_ids):
+    """Evaluates the badges the given users have no row for yet. Returns the number of rows created."""
+    existing = {}
+    for user_id, name in AchievementProgress.objects.filter(user_id__in=user_ids).values_list('user_id', 'badge_name'):
+        existing.setdefault(user_id, set()).add(name)
+    created = 0
+    for user_id in user_ids:
+        missing = [badge for badge in BADGES if badge.name not in existing.get(user_id, ())]
+        if missing:
+            _evaluate(user_id, missing, {})
+            created += len(missing)
+    return created
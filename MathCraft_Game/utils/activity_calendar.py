@@ -0,0 +1,117 @@
+# utils/activity_calendar.py
+
+import calendar
+from datetime import date, timedelta
+from functools import lru_cache
+
+from django.db.models import F
+
+from ..models import ActivityCalendar
+from .records import update_counter_row
+
+# A year is stored as WORDS signed 64-bit integers holding WORD_BITS day bits each
+# (6 x 61 = 366), so every word stays positive on every database backend.
+WORD_BITS = ActivityCalendar.WORD_BITS
+WORDS = ActivityCalendar.WORDS
+WORD_FIELDS = [f"w{i}" for i in range(WORDS)]
+
+
+def day_index(day):
+    """0-based position of `day` within its year (Jan 1 -> 0)."""
+    return day.timetuple().tm_yday - 1
+
+
+def mark_active(user_id, day):
+    """
+    Sets the bit for `day` with an UPDATE (word = word | bit) of the year row,
+    which is claimed - or created, on the user's first activity of that
+    year - by an upsert just before (see update_counter_row).
+    """
+    index = day_index(day)
+    field = WORD_FIELDS[index // WORD_BITS]
+    update_counter_row(
+        ActivityCalendar, {'user_id': user_id, 'year': day.year},
+        {field: F(field).bitor(1 << (index % WORD_BITS))},
+    )
+
+
+def words_to_bits(words):
+    bits = 0
+    for i, word in enumerate(words):
+        bits |= (word or 0) << (i * WORD_BITS)
+    return bits
+
+
+def bits_to_words(bits):
+    mask = (1 << WORD_BITS) - 1
+    return [(bits >> (i * WORD_BITS)) & mask for i in range(WORDS)]
+
+
+def load_years(user_id, years):
+    """{year: bits} for the requested years (missing years are 0)."""
+    rows = ActivityCalendar.objects.filter(user_id=user_id, year__in=list(years)).values_list('year', *WORD_FIELDS)
+    found = {row[0]: words_to_bits(row[1:]) for row in rows}
+    return {year: found.get(year, 0) for year in years}
+
+
+# ----------------------------------------------------------------------
+# Bit arithmetic on one year
+# ----------------------------------------------------------------------
+def days_in_year(year):
+    return 366 if calendar.isleap(year) else 365
+
+
+@lru_cache(maxsize=256)
+def month_mask(year, month):
+    start = day_index(date(year, month, 1))
+    return ((1 << calendar.monthrange(year, month)[1]) - 1) << start
+
+
+def active_days_in_month(bits, year, month):
+    return (bits & month_mask(year, month)).bit_count()
+
+
+def run_ending_at(bits, index):
+    """Consecutive set bits ending at `index` (inclusive), counting downwards."""
+    window = bits & ((1 << (index + 1)) - 1)
+    gaps = ~window & ((1 << (index + 1)) - 1)  # zero bits at or below index
+    return index - gaps.bit_length() + 1
+
+
+def longest_run(bits):
+    """Longest run of set bits: shift-and until no bits are left."""
+    longest = 0
+    while bits:
+        bits &= bits >> 1
+        longest += 1
+    return longest
+
+
+def active_dates(bits, year):
+    start = date(year, 1, 1)
+    dates = []
+    while bits:
+        low = bits & -bits
+        dates.append(start + timedelta(days=low.bit_length() - 1))
+        bits ^= low
+    return dates
+
+
+def current_streak(user_id, today):
+    """
+    Streak ending today (or yesterday, if today is not active yet) computed from
+    the bitmaps; runs that reach January 1st continue into the previous year.
+    """
+    years = load_years(user_id, [today.year, today.year - 1])
+    day = today if years[today.year] >> day_index(today) & 1 else today - timedelta(days=1)
+    year, index = day.year, day_index(day)
+
+    streak = 0
+    while True:
+        bits = years[year] if year in years else load_years(user_id, [year])[year]
+        run = run_ending_at(bits, index)
+        streak += run
+        if run <= index:  # stopped at a gap inside this year
+            return streak
+        year -= 1
+        index = days_in_year(year) - 1
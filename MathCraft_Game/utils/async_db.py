@@ -0,0 +1,62 @@
+# utils/async_db.py
+
+import asyncio
+import contextvars
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connections
+
+DEFAULT_ASYNC_SETTINGS = {
+    "ENABLED": False,  # serve the dashboard reads from views_async.py (run the project under asgi.py)
+    "DB_WORKERS": 8,   # threads (= persistent database connections per worker process) the async views query through
+}
+
+
+def get_async_settings():
+    return {**DEFAULT_ASYNC_SETTINGS, **getattr(settings, "ASYNC_VIEWS", {})}
+
+
+_executor = None
+_executor_pid = None
+_executor_lock = threading.Lock()
+
+
+def get_db_executor():
+    """The process-wide thread pool the async views run their ORM calls on (re-created after a fork)."""
+    global _executor, _executor_pid
+    if _executor is None or _executor_pid != os.getpid():
+        with _executor_lock:
+            if _executor is None or _executor_pid != os.getpid():
+                _executor = ThreadPoolExecutor(
+                    max_workers=get_async_settings()["DB_WORKERS"], thread_name_prefix="async-db"
+                )
+                _executor_pid = os.getpid()
+    return _executor
+
+
+def _in_db_thread(call):
+    # Each pool thread keeps its connection for the life of the process
+    # (request_finished never fires here, so CONN_MAX_AGE does not apply);
+    # a connection that has failed and is no longer usable is replaced
+    for connection in connections.all(initialized_only=True):
+        if connection.connection is not None and connection.errors_occurred and not connection.is_usable():
+            connection.close()
+    return call()
+
+
+async def run_db(func, *args, **kwargs):
+    """
+    Awaits func(*args, **kwargs) on the database executor. The caller's
+    context variables (e.g. the batch request cache) are visible to func.
+    """
+    call = functools.partial(contextvars.copy_context().run, func, *args, **kwargs)
+    return await asyncio.get_running_loop().run_in_executor(get_db_executor(), _in_db_thread, call)
+
+
+async def gather_db(*calls):
+    """Runs independent (func, *args) calls concurrently, each on its own connection; results in order."""
+    return await asyncio.gather(*(run_db(func, *args) for func, *args in calls))
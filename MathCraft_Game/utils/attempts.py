@@ -0,0 +1,32 @@
+# utils/attempts.py
+
+from django.db.models import F, Max
+
+from ..models import DailyAttemptCounter, GameMode
+from .records import update_counter_row
+
+
+def allocate_attempt(user_id, day):
+    """
+    Returns the next attempt number of `day` for the user. Must run inside the
+    transaction that inserts the GameMode row.
+
+    The counter row is claimed with an upsert and incremented with a single
+    UPDATE (see update_counter_row), which keeps it locked until the
+    transaction ends: concurrent game starts of the same user - including
+    the first ones of the day, which insert the row - queue on that row and
+    receive consecutive numbers, and a rolled-back start releases its number
+    again. Cost does not depend on how many games the user has played that day.
+    """
+    lookup = {'user_id': user_id, 'date': day}
+    update_counter_row(DailyAttemptCounter, lookup, {'last_attempt': F('last_attempt') + 1})
+    counter = DailyAttemptCounter.objects.filter(**lookup)
+    attempt = counter.values_list('last_attempt', flat=True).get()
+    if attempt == 1:
+        # First counted game of the day: continue after games created before
+        # the counter existed (the row is locked, so this cannot race)
+        seed = GameMode.objects.filter(**lookup).aggregate(last=Max('attempt'))['last'] or 0
+        if seed:
+            attempt = seed + 1
+            counter.update(last_attempt=attempt)
+    return attempt
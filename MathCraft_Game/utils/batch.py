@@ -0,0 +1,110 @@
+# utils/batch.py
+
+import json
+import logging
+import time
+from urllib.parse import urlsplit
+
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.conf import settings
+from django.http import HttpRequest, QueryDict
+from django.urls import Resolver404, resolve, reverse
+
+from .request_cache import request_cache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SETTINGS = {
+    "MAX_PARTS": 20,  # sub-requests accepted in one batch
+}
+
+
+def get_batch_settings():
+    return {**DEFAULT_BATCH_SETTINGS, **getattr(settings, "BATCH", {})}
+
+
+def _api_prefix():
+    """'/api/' - the mount point of this app, taken from the batch route itself."""
+    return reverse('batch')[:-len('batch/')]
+
+
+def _elapsed_ms(started):
+    return round((time.perf_counter() - started) * 1000, 2)
+
+
+def _body(response):
+    if hasattr(response, 'data'):
+        return response.data
+    content = getattr(response, 'content', b'')
+    if response.get('Content-Type', '').startswith('application/json'):
+        return json.loads(content or b'null')
+    return content.decode(response.charset or 'utf-8', errors='replace')
+
+
+def _subrequest(parent, path, query):
+    """A GET for `path` carrying the parent's headers and already-authenticated user."""
+    sub = HttpRequest()
+    sub.method = 'GET'
+    sub.path = sub.path_info = path
+    sub.META = {
+        **parent.META,
+        'REQUEST_METHOD': 'GET',
+        'PATH_INFO': path,
+        'QUERY_STRING': query,
+        'CONTENT_LENGTH': '',
+        'CONTENT_TYPE': '',
+    }
+    sub.META.pop('HTTP_IF_NONE_MATCH', None)  # parts are always answered in full
+    sub.GET = QueryDict(query)
+    sub.COOKIES = parent.COOKIES
+    # DRF's ForcedAuthentication: the token was checked once, for the batch itself
+    sub._force_auth_user = parent.user
+    sub._force_auth_token = parent.auth
+    return sub
+
+
+def _dispatch(parent, part_id, target, prefix):
+    parts = urlsplit(target)
+    path = parts.path if parts.path.startswith('/') else prefix + parts.path
+    result = {"id": part_id, "path": target}
+    if not path.startswith(prefix):
+        return {**result, "status": 400, "body": {"error": f"Only {prefix} routes can be batched."}}
+    try:
+        match = resolve(path)
+    except Resolver404:
+        return {**result, "status": 404, "body": {"error": "No such route."}}
+    if match.url_name == 'batch':
+        return {**result, "status": 400, "body": {"error": "Batches cannot be nested."}}
+
+    sub = _subrequest(parent, path, parts.query)
+    sub.resolver_match = match
+    view = async_to_sync(match.func) if iscoroutinefunction(match.func) else match.func  # views_async
+    response = view(sub, *match.args, **match.kwargs)
+    if hasattr(response, 'render') and not getattr(response, 'is_rendered', True):
+        response.render()
+    return {**result, "status": response.status_code, "body": _body(response)}
+
+
+def run_batch(request, parts):
+    """
+    Runs each part ({"id", "path"}) as a GET against this app's routes, in order,
+    inside one request cache, so helpers marked @request_cached (per-user
+    stats, per-mode metrics) hit the database once for the whole batch.
+    A part that fails is reported with its own status; the others still run.
+    Returns {"results": [{id, path, status, ms, body}], "ms": total}.
+    """
+    started = time.perf_counter()
+    prefix = _api_prefix()
+    results = []
+    with request_cache():
+        for index, part in enumerate(parts):
+            part_id = part.get('id', index)
+            part_started = time.perf_counter()
+            try:
+                result = _dispatch(request, part_id, part['path'], prefix)
+            except Exception:
+                logger.exception("Batch part %r (%s) failed", part_id, part['path'])
+                result = {"id": part_id, "path": part['path'], "status": 500, "body": {"error": "Internal error."}}
+            result["ms"] = _elapsed_ms(part_started)
+            results.append(result)
+    return {"results": results, "ms": _elapsed_ms(started)}
@@ -0,0 +1,92 @@
+# utils/coins.py
+
+from collections import namedtuple
+from datetime import date
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from ..models import CoinLedgerEntry, CoinMonthlyRollup, UserProfile
+from .data_versions import new_version, publish_versions
+from .records import update_counter_row
+
+# amount > 0 earns, amount < 0 spends
+CoinChange = namedtuple("CoinChange", ["amount", "reason", "description"], defaults=[""])
+
+
+def _bump_rollup(user_id, month, earned, spent):
+    update_counter_row(
+        CoinMonthlyRollup, {'user_id': user_id, 'month': month},
+        {'earned': F('earned') + earned, 'spent': F('spent') + spent},
+    )
+
+
+def apply_coin_changes(user_id, changes):
+    """
+    Applies a batch of CoinChanges for one user atomically:
+    one conditional UPDATE of the balance (it only matches while the balance
+    covers the net amount spent), one bulk INSERT into the ledger and one
+    update of the month's rollup. Returns False, changing nothing, when the
+    balance is insufficient.
+    """
+    changes = [change for change in changes if change.amount]
+    if not changes:
+        return True
+
+    earned = sum(change.amount for change in changes if change.amount > 0)
+    spent = -sum(change.amount for change in changes if change.amount < 0)
+
+    with transaction.atomic():
+        profile = UserProfile.objects.filter(user_id=user_id)
+        if spent > earned:
+            profile = profile.filter(coins__gte=spent - earned)
+        version = new_version()
+        if not profile.update(
+            coins=F('coins') + (earned - spent),
+            total_earned=F('total_earned') + earned,
+            total_spent=F('total_spent') + spent,
+            data_version=version,
+        ):
+            return False
+        publish_versions([user_id], version)
+
+        CoinLedgerEntry.objects.bulk_create([
+            CoinLedgerEntry(
+                user_id=user_id,
+                amount=abs(change.amount),
+                transaction_type=CoinLedgerEntry.EARNED if change.amount > 0 else CoinLedgerEntry.SPENT,
+                reason=change.reason,
+                description=change.description,
+            )
+            for change in changes
+        ])
+        _bump_rollup(user_id, timezone.localdate().replace(day=1), earned, spent)
+    return True
+
+
+def earn_coins(user_id, amount, reason, description=""):
+    return apply_coin_changes(user_id, [CoinChange(amount, reason, description)])
+
+
+def spend_coins(user_id, amount, reason, description=""):
+    """Returns False when the user cannot afford `amount`."""
+    return apply_coin_changes(user_id, [CoinChange(-amount, reason, description)])
+
+
+def get_balance(user_id):
+    return (
+        UserProfile.objects.filter(user_id=user_id)
+        .values('coins', 'total_earned', 'total_spent')
+        .first()
+    ) or {'coins': 0, 'total_earned': 0, 'total_spent': 0}
+
+
+def get_monthly_rollup(user_id, year, month):
+    """{"earned", "spent"} for one calendar month (local time)."""
+    row = (
+        CoinMonthlyRollup.objects.filter(user_id=user_id, month=date(year, month, 1))
+        .values('earned', 'spent')
+        .first()
+    )
+    return row or {'earned': 0, 'spent': 0}
@@ -0,0 +1,152 @@
+# utils/dashboard.py
+
+from datetime import date
+
+from django.db.models import Sum
+from django.utils.timezone import localtime
+
+from ..models import AchievementReward, DailyUserModeStats, GameMode
+from . import activity_calendar, mode_metrics
+from .achievements import unseen_rewards
+from .stats import MODES, accuracy_percent
+from .streaks import streak_of
+
+# The dashboard views are split into independent loaders (one query each) and
+# a builder that shapes their results, so views.py can run the loaders one
+# after another and views_async.py can run them concurrently.
+
+
+# ----------------------------------------------------------------------
+# player_overview
+# ----------------------------------------------------------------------
+def unlocked_badge_names(user_id):
+    return list(
+        AchievementReward.objects.filter(user_id=user_id, rewarded=True).values_list('badge_name', flat=True)
+    )
+
+
+def overview_payload(request, user, metrics, unlocked):
+    profile = user.profile  # from UserProfile (auto-created)
+    join_date = localtime(user.date_joined).strftime("%Y-%m-%d")
+
+    photo_url = request.build_absolute_uri(profile.photo.url) if profile.photo else None
+
+    # 1️⃣ Overall Score
+    total_score = int(mode_metrics.total(metrics, 'iq_sum'))
+
+    # 2️⃣ Achievements Unlocked (human-readable): underscores to spaces & capitalized words
+    achievements_readable = [name.replace('_', ' ').title() for name in unlocked]
+
+    # 3️⃣ Overall Accuracy
+    total_questions = mode_metrics.total(metrics, 'answered')
+    correct_questions = mode_metrics.total(metrics, 'correct')
+    overall_accuracy = round(accuracy_percent(correct_questions, total_questions), 2)
+
+    # 4️⃣ Total Puzzles Solved
+    total_puzzles = mode_metrics.total(metrics, 'games')
+
+    # 5️⃣ Highest Streak Combo per mode
+    longest_streak_data = {mode.title(): metrics[mode]['best_streak'] or 0 for mode in MODES}
+
+    return {
+        "username": user.username,
+        "email": user.email,
+        "photo_url": photo_url,
+        "join_date": join_date,
+        "overall_score": total_score,
+        "overall_accuracy": overall_accuracy,
+        "total_puzzles_solved": total_puzzles,
+        "highest_streak_combo": longest_streak_data,  # per mode
+        "achievements_unlocked": achievements_readable,
+        "coins": profile.coins,
+    }
+
+
+# ----------------------------------------------------------------------
+# user_achievements
+# ----------------------------------------------------------------------
+def achievements_payload(user, badges, metrics):
+    """Badge progress from get_achievements() and get_mode_metrics() (no queries, no writes)."""
+    games = {mode: values['games'] for mode, values in metrics.items()}
+
+    def badge_status(name):
+        return "UNLOCKED" if badges[name].unlocked else "LOCKED"
+
+    return {
+        "code_crusader": {
+            "current": mode_metrics.total(metrics, 'correct'),
+            "target": 100,
+            "status": badge_status("code_crusader")
+        },
+        "master_calibrator": {
+            "best_iq": mode_metrics.best(metrics, 'best_iq'),
+            "status": badge_status("master_calibrator")
+        },
+        "daily_devotion": {
+            "current_streak": streak_of(user.profile)["current"],
+            "target": 30,
+            "status": badge_status("daily_devotion")
+        },
+        "speed_badge": {
+            "best_streak": metrics['hard']['best_streak'] or 0,
+            "max_streak": 50,
+            "status": badge_status("lightning_solver")
+        },
+        "apex_challenger": {
+            "current": metrics['hard']['qualifying'],
+            "target": 50,
+            "status": badge_status("apex_challenger")
+        },
+        "true_polymath": {
+            "Easy": games["easy"],
+            "Intermediate": games["intermediate"],
+            "Hard": games["hard"],
+            "status": badge_status("true_polymath")
+        },
+        "total_games": sum(games.values()),
+        "rewarded_badges": unseen_rewards(badges),
+        "coins": user.profile.coins
+    }
+
+
+# ----------------------------------------------------------------------
+# monthly_performance
+# ----------------------------------------------------------------------
+def month_bounds(year, month):
+    """[start, end) local dates of the month; ValueError for an invalid month."""
+    start_date = date(year, month, 1)
+    end_date = date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
+    return start_date, end_date
+
+
+def monthly_mode_totals(user_id, start_date, end_date):
+    """Games and IQ per mode code for the month, from the daily rollup (one query, <= 31 x 3 rows)."""
+    return {
+        row['mode']: row
+        for row in DailyUserModeStats.objects.filter(user_id=user_id, day__gte=start_date, day__lt=end_date)
+        .values('mode')
+        .annotate(games=Sum('games'), iq_sum=Sum('iq_sum'))
+        .order_by()
+    }
+
+
+def monthly_payload(per_mode, coins, year_bits, year, month):
+    total_puzzles = sum(row['games'] for row in per_mode.values())
+
+    # Mode breakdown and IQ summary (sum of per-attempt IQs per mode)
+    mode_counts = {}
+    iq_summary = {}
+    for mode in GameMode.Mode:
+        row = per_mode.get(mode, {'games': 0, 'iq_sum': 0})
+        mode_counts[mode.label.capitalize()] = row['games']
+        iq_summary[mode.label.capitalize()] = int(row['iq_sum'])  # remove decimals, integer only
+
+    return {
+        "total_puzzles": total_puzzles,
+        "total_coins_earned": coins["earned"],
+        "total_coins_spent": coins["spent"],
+        "iqSummary": iq_summary,
+        "mode_counts": mode_counts,
+        # Days with activity this month (one calendar row, counted with a bit mask)
+        "active_days": activity_calendar.active_days_in_month(year_bits, year, month),
+    }
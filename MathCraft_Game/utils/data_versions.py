@@ -0,0 +1,141 @@
+# utils/data_versions.py
+
+import functools
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils import timezone
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.response import Response
+
+from ..authentication import invalidate_user
+from ..models import UserProfile
+
+DEFAULT_DATA_VERSION_SETTINGS = {
+    "CACHE_ALIAS": None,  # None: one indexed UserProfile read per check; set a *shared* cache alias to skip it
+    "CACHE_TIMEOUT": 3600,
+}
+
+
+def get_data_version_settings():
+    return {**DEFAULT_DATA_VERSION_SETTINGS, **getattr(settings, "DATA_VERSIONS", {})}
+
+
+def _cache():
+    alias = get_data_version_settings()["CACHE_ALIAS"]
+    return caches[alias] if alias else None
+
+
+def _key(user_id):
+    return f"data-version:{user_id}"
+
+
+def new_version():
+    """
+    A fresh UserProfile.data_version value. Versions are not counters: a bump
+    writes a new value without reading the old one, so it can ride along in
+    an UPDATE the write path already issues (see utils.coins, utils.streaks).
+    """
+    return time.time_ns()
+
+
+def publish_versions(user_ids, version):
+    """Pushes a version written to UserProfile to the cache once the transaction commits."""
+    cache = _cache()
+    if cache is not None:
+        timeout = get_data_version_settings()["CACHE_TIMEOUT"]
+        transaction.on_commit(lambda: cache.set_many({_key(user_id): version for user_id in user_ids}, timeout))
+
+
+def bump_data_versions(user_ids):
+    """Marks everything the dashboards show for these users as changed (one UPDATE)."""
+    user_ids = sorted(set(user_ids))
+    if not user_ids:
+        return
+    version = new_version()
+    UserProfile.objects.filter(user_id__in=user_ids).update(data_version=version)
+    publish_versions(user_ids, version)
+
+
+def bump_data_version(user_id):
+    bump_data_versions([user_id])
+
+
+def get_data_version(user_id):
+    """The user's current data version: a cache hit, or one read by the unique user_id index."""
+    cache = _cache()
+    if cache is not None:
+        version = cache.get(_key(user_id))
+        if version is not None:
+            return version
+    version = UserProfile.objects.filter(user_id=user_id).values_list('data_version', flat=True).first() or 0
+    if cache is not None:
+        # add(), not set(): never overwrite a version a concurrent bump has just published
+        cache.add(_key(user_id), version, get_data_version_settings()["CACHE_TIMEOUT"])
+    return version
+
+
+def etag_for(view_name, request, user_id, version):
+    """
+    Strong ETag of one user's response: the endpoint, its path and query,
+    the negotiated format, the data version and today's local date (several
+    endpoints count days or months relative to today).
+    """
+    source = "|".join([
+        view_name, str(user_id), str(version), timezone.localdate().isoformat(),
+        request.get_full_path(), request.META.get('HTTP_ACCEPT', ''),
+    ])
+    return '"%s"' % hashlib.sha1(source.encode()).hexdigest()
+
+
+def etag_matches(request, etag):
+    return etag in parse_etags(request.META.get('HTTP_IF_NONE_MATCH', ''))
+
+
+def check_etag(view_name, request):
+    """
+    Returns (etag, matches_if_none_match) for the request's user. A profile
+    preloaded by the token cache that is older than the current version is
+    reloaded first (and the worker's cached copy dropped), so the response
+    built after a miss is at least as new as its ETag.
+    """
+    user = request.user
+    version = get_data_version(user.id)
+    if type(user).profile.is_cached(user) and user.profile.data_version != version:
+        user.profile.refresh_from_db()
+        invalidate_user(user.id, broadcast=False)
+    etag = etag_for(view_name, request, user.id, version)
+    return etag, etag_matches(request, etag)
+
+
+def versioned_etag(view):
+    """
+    Conditional GET for a per-user dashboard view (place it under
+    @api_view / @permission_classes, so the user is authenticated).
+    A matching If-None-Match returns 304 before the view runs; other GETs
+    get the ETag and `Cache-Control: private, no-cache` attached. The ETag
+    is also left on request.data_etag for @singleflight below it.
+    """
+    view_name = f"{view.__module__}.{view.__qualname__}"
+
+    @functools.wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if request.method != 'GET':
+            return view(request, *args, **kwargs)
+        etag, matches = check_etag(view_name, request)
+        request.data_etag = etag
+        if matches:
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = view(request, *args, **kwargs)
+            if response.status_code != status.HTTP_200_OK:
+                return response
+        response['ETag'] = etag
+        response['Cache-Control'] = "private, no-cache"
+        return response
+
+    return wrapper
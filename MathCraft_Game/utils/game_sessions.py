@@ -0,0 +1,467 @@
+# utils/game_sessions.py
+
+import atexit
+import copy
+import logging
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ValidationError
+from django.db import DataError, IntegrityError, close_old_connections, transaction
+
+from ..models import GameMode, GameQuestionRecord
+from .achievements import ANSWER_SUBMITTED, record_event
+from .records import upsert_question_records
+from .stats import sync_game_summaries
+
+logger = logging.getLogger(__name__)
+
+# Errors caused by the records themselves: retrying cannot help, unlike a lost connection
+RECORD_ERRORS = (DataError, IntegrityError, ValidationError, TypeError, ValueError)
+
+DEFAULT_SESSION_SETTINGS = {
+    "ENABLED": False,         # off: marcconrad_game / get_hint / submit_answer write through to the DB
+    "BACKEND": "memory",      # "memory" (this worker only) or "cache" (a Django cache shared by the workers, atomic add())
+    "CACHE_ALIAS": "default",
+    "IDLE_TIMEOUT": 1800,     # seconds without activity before a session is flushed and dropped
+    "FLUSH_INTERVAL": 5,      # seconds between write-behind flushes
+}
+
+ANSWER_FIELDS = ['correct_answer', 'user_answer', 'status', 'time', 'streak']
+
+
+class QuestionState:
+    __slots__ = ("solution", "user_answer", "status", "time", "streak", "hints_used", "answered", "dirty", "revision")
+
+    def __init__(self, solution):
+        self.solution = str(solution)
+        self.user_answer = ''
+        self.status = GameQuestionRecord.Status.UNANSWERED
+        self.time = None
+        self.streak = 0
+        self.hints_used = 0
+        self.answered = False
+        self.dirty = True  # the solution itself still has to reach GameQuestionRecord
+        self.revision = 0
+
+    def changed(self):
+        """Marks the question for the next flush; a flush only cleans the revision it wrote."""
+        self.dirty = True
+        self.revision += 1
+
+
+class GameSession:
+    __slots__ = ("game_mode_id", "user_id", "questions", "touched_at")
+
+    def __init__(self, game_mode_id, user_id):
+        self.game_mode_id = game_mode_id
+        self.user_id = user_id
+        self.questions = {}  # question_number -> QuestionState
+        self.touched_at = time.time()
+
+
+class SessionStoreBusy(RuntimeError):
+    """Raised when a session lock in the shared cache could not be taken in time."""
+
+
+class MemoryBackend:
+    """Sessions live in this worker's memory."""
+
+    def __init__(self):
+        self._sessions = {}
+        self._lock = threading.RLock()
+
+    def locked(self, game_mode_id):
+        return self._lock
+
+    def get(self, game_mode_id):
+        return self._sessions.get(game_mode_id)
+
+    def put(self, session):
+        self._sessions[session.game_mode_id] = session
+
+    def pop(self, game_mode_id):
+        self._sessions.pop(game_mode_id, None)
+
+    def forget(self, game_mode_id):
+        pass
+
+    def ids(self):
+        return list(self._sessions)
+
+
+class CacheBackend:
+    """
+    Sessions are pickled into a Django cache shared by the workers (Redis,
+    Memcached or the database cache: add() must be atomic).
+
+    Every read-modify-write of a session runs under a per-game lock taken
+    with cache.add(), so an answer recorded by one worker is never
+    overwritten by another worker's copy. The ids of all active sessions are
+    kept in the cache too, so every worker's flusher writes every session -
+    including those last touched by a worker that has since died.
+    """
+
+    IDS_KEY = "game-session:ids"
+
+    def __init__(self, alias, timeout, lock_timeout=5):
+        self._cache = caches[alias]
+        self._timeout = timeout
+        self._lock_timeout = lock_timeout  # a crashed holder's lock expires after this
+
+    @staticmethod
+    def _key(game_mode_id):
+        return f"game-session:{game_mode_id}"
+
+    @contextmanager
+    def _lock(self, key):
+        token = uuid.uuid4().hex
+        deadline = time.monotonic() + self._lock_timeout + 1
+        while not self._cache.add(key, token, self._lock_timeout):
+            if time.monotonic() > deadline:
+                raise SessionStoreBusy(f"Could not lock {key}.")
+            time.sleep(0.005)
+        try:
+            yield
+        finally:
+            if self._cache.get(key) == token:  # not expired and taken over meanwhile
+                self._cache.delete(key)
+
+    def locked(self, game_mode_id):
+        return self._lock(f"{self._key(game_mode_id)}:lock")
+
+    def get(self, game_mode_id):
+        return self._cache.get(self._key(game_mode_id))
+
+    def put(self, session):
+        self._cache.set(self._key(session.game_mode_id), session, self._timeout)
+        if session.game_mode_id not in (self._cache.get(self.IDS_KEY) or ()):
+            self._update_ids(lambda ids: ids.add(session.game_mode_id))
+
+    def pop(self, game_mode_id):
+        self._cache.delete(self._key(game_mode_id))
+        self.forget(game_mode_id)
+
+    def forget(self, game_mode_id):
+        """Drops the id of a session that is gone (popped, or expired in the cache)."""
+        self._update_ids(lambda ids: ids.discard(game_mode_id))
+
+    def _update_ids(self, change):
+        with self._lock(f"{self.IDS_KEY}:lock"):
+            ids = self._cache.get(self.IDS_KEY) or set()
+            change(ids)
+            self._cache.set(self.IDS_KEY, ids, None)
+
+    def ids(self):
+        return list(self._cache.get(self.IDS_KEY) or ())
+
+
+def _as_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class GameSessions:
+    """
+    Active-game store keyed by game_mode_id. While a game is running, the
+    puzzle fetch, hints and answers only touch the session; the question
+    records are written behind in bulk every FLUSH_INTERVAL seconds, when the
+    game finishes (finish()) or after IDLE_TIMEOUT seconds without activity.
+
+    A flush copies the dirty questions, writes them without holding any lock
+    and then marks clean only the questions whose revision it wrote: an
+    answer recorded meanwhile stays dirty for the next flush, and a failed
+    write leaves everything dirty.
+
+    Recovery: a graceful worker shutdown flushes everything (atexit). A
+    crashed worker loses at most the last FLUSH_INTERVAL seconds of answers
+    with the memory backend; with the cache backend the sessions stay in the
+    cache and the other workers' flushers write them. A request that finds
+    no session falls back to the database exactly as with the store disabled
+    (the question token still carries the solution). Without question tokens,
+    several workers need the cache backend: a solution held by one worker's
+    memory is invisible to the others until it is flushed.
+    """
+
+    def __init__(self, backend, idle_timeout=1800, flush_interval=5):
+        self._backend = backend
+        self.idle_timeout = idle_timeout
+        self.flush_interval = flush_interval
+        self._flusher_lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        self.flushes = 0
+        self.flushed_records = 0
+        self.flush_errors = 0
+        self.discarded_records = 0
+        self.last_flush_seconds = None
+
+    # ------------------------------------------------------------------
+    # Game loop
+    # ------------------------------------------------------------------
+    def _session(self, user_id, game_mode_id):
+        session = self._backend.get(game_mode_id)
+        if session is None or session.user_id != user_id:
+            return None
+        return session
+
+    def _touch(self, session):
+        session.touched_at = time.time()
+        self._backend.put(session)
+        self.ensure_flusher()
+
+    def _question(self, user_id, game_mode_id, question_number):
+        session = self._session(user_id, game_mode_id)
+        return session.questions.get(question_number) if session is not None else None
+
+    def owns(self, user_id, game_mode_id):
+        """True if the user's session for the game is active (skips the ownership query)."""
+        game_mode_id = _as_int(game_mode_id)
+        return game_mode_id is not None and self._session(user_id, game_mode_id) is not None
+
+    def open_question(self, user_id, game_mode_id, question_number, solution):
+        """marcconrad_game: keeps the solution; the caller has checked ownership."""
+        game_mode_id, question_number = int(game_mode_id), int(question_number)
+        with self._backend.locked(game_mode_id):
+            session = self._session(user_id, game_mode_id) or GameSession(game_mode_id, user_id)
+            state = session.questions.get(question_number)
+            if state is None:
+                session.questions[question_number] = QuestionState(solution)
+            else:
+                state.solution = str(solution)
+                state.changed()
+            self._touch(session)
+
+    def solution(self, user_id, game_mode_id, question_number):
+        """The stored solution, or None when this store does not know the question."""
+        state = self._question(user_id, _as_int(game_mode_id), _as_int(question_number))
+        return state.solution if state is not None else None
+
+    def use_hint(self, user_id, game_mode_id, question_number):
+        """get_hint: counts the hint and returns the solution (None if unknown)."""
+        game_mode_id, question_number = _as_int(game_mode_id), _as_int(question_number)
+        if self._question(user_id, game_mode_id, question_number) is None:
+            return None
+        with self._backend.locked(game_mode_id):
+            session = self._session(user_id, game_mode_id)
+            state = session.questions.get(question_number) if session is not None else None
+            if state is None:
+                return None
+            state.hints_used += 1  # not stored in GameQuestionRecord: no flush needed
+            self._touch(session)
+            return state.solution
+
+    def hints_used(self, user_id, game_mode_id, question_number):
+        state = self._question(user_id, _as_int(game_mode_id), _as_int(question_number))
+        return state.hints_used if state is not None else 0
+
+    def record_answer(self, user_id, game_mode_id, question_number, solution, user_answer, status, time_taken, streak):
+        """submit_answer: stores the scored answer; it reaches the database on the next flush."""
+        game_mode_id, question_number = int(game_mode_id), int(question_number)
+        with self._backend.locked(game_mode_id):
+            session = self._session(user_id, game_mode_id) or GameSession(game_mode_id, user_id)
+            state = session.questions.get(question_number)
+            if state is None:
+                state = session.questions[question_number] = QuestionState(solution)
+            state.solution = str(solution)
+            state.user_answer, state.status, state.time, state.streak = user_answer, status, time_taken, streak
+            state.answered = True
+            state.changed()
+            self._touch(session)
+
+    # ------------------------------------------------------------------
+    # Write-behind
+    # ------------------------------------------------------------------
+    def finish(self, *game_mode_ids):
+        """Flushes the games' sessions and drops them (game over, or before a bulk write to them)."""
+        return self.flush(game_mode_ids, drop=True)
+
+    def flush(self, game_mode_ids=None, drop=False):
+        """
+        Writes the dirty questions of the given sessions (default: every active
+        session in the store) with one upsert per kind (fetched / answered) and
+        updates the attempt summaries. Idle sessions are dropped once nothing
+        in them is left to write. Returns the number of records written.
+
+        If the batch is rejected because of its records, the games are written
+        one by one, each in its own savepoint; the records of a game that still
+        fails are logged and discarded, so one bad game cannot hold back the
+        others. Any other error leaves every question dirty for the next flush.
+        """
+        started = time.monotonic()
+        ids = self._backend.ids() if game_mode_ids is None else [_as_int(i) for i in game_mode_ids]
+
+        taken = []  # (game_mode_id, user_id, question_number, revision, copy of the state)
+        for game_mode_id in ids:
+            with self._backend.locked(game_mode_id):
+                session = self._backend.get(game_mode_id)
+                if session is None:
+                    self._backend.forget(game_mode_id)  # expired from the cache
+                    continue
+                for number, state in session.questions.items():
+                    if state.dirty:
+                        taken.append((game_mode_id, session.user_id, number, state.revision, copy.copy(state)))
+
+        written = 0
+        if taken:
+            try:
+                written = self._write(taken)
+            except Exception:
+                self.flush_errors += 1  # nothing was marked clean: the next flush retries
+                raise
+            self.flushes += 1
+            self.flushed_records += written
+            self.last_flush_seconds = time.monotonic() - started
+
+        self._settle(ids, taken, drop)
+        return written
+
+    def _settle(self, ids, taken, drop):
+        """Marks the written revisions clean and drops finished or idle sessions with nothing left to write."""
+        revisions = {}
+        for game_mode_id, _, number, revision, _ in taken:
+            revisions.setdefault(game_mode_id, {})[number] = revision
+        now = time.time()
+        for game_mode_id in ids:
+            if game_mode_id is None:
+                continue
+            with self._backend.locked(game_mode_id):
+                session = self._backend.get(game_mode_id)
+                if session is None:
+                    continue
+                for number, revision in revisions.get(game_mode_id, {}).items():
+                    state = session.questions.get(number)
+                    if state is not None and state.revision == revision:
+                        state.dirty = False
+                pending = any(state.dirty for state in session.questions.values())
+                if not pending and (drop or now - session.touched_at > self.idle_timeout):
+                    self._backend.pop(game_mode_id)
+                elif game_mode_id in revisions:
+                    self._backend.put(session)
+
+    def _write(self, taken):
+        games = {}
+        for item in taken:
+            games.setdefault(item[0], []).append(item)
+        # Attempts deleted while their session was active are skipped
+        existing = set(GameMode.objects.filter(pk__in=games).values_list('pk', flat=True))
+
+        try:
+            return self._write_batch(taken, existing)
+        except RECORD_ERRORS:
+            logger.warning("Game session batch of %d games rejected; writing them one by one", len(games))
+
+        written = 0
+        for game_mode_id, items in games.items():
+            try:
+                written += self._write_batch(items, existing)
+            except RECORD_ERRORS:
+                self.discarded_records += len(items)
+                logger.exception("Discarding %d unsaved records of game %s", len(items), game_mode_id)
+        return written
+
+    def _write_batch(self, taken, existing):
+        fetched, answered, answered_by_user = [], [], {}
+        for game_mode_id, user_id, number, _, state in taken:
+            if game_mode_id not in existing:
+                continue
+            record = GameQuestionRecord(
+                game_mode_id=game_mode_id,
+                question_number=number,
+                correct_answer=state.solution,
+                user_answer=state.user_answer,
+                status=state.status,
+                time=state.time,
+                streak=state.streak,
+            )
+            if state.answered:
+                answered.append(record)
+                answered_by_user.setdefault(user_id, set()).add(game_mode_id)
+            else:
+                fetched.append(record)
+
+        with transaction.atomic():
+            if fetched:
+                upsert_question_records(fetched, update_fields=['correct_answer'])
+            if answered:
+                upsert_question_records(answered, update_fields=ANSWER_FIELDS)
+                sync_game_summaries({record.game_mode_id for record in answered})
+                for user_id, ids in answered_by_user.items():
+                    record_event(user_id, ANSWER_SUBMITTED, game_mode_ids=sorted(ids))
+        return len(fetched) + len(answered)
+
+    def ensure_flusher(self):
+        """Starts this process's write-behind thread (once, and again after a fork)."""
+        if self._pid != os.getpid():
+            with self._flusher_lock:
+                if self._pid != os.getpid():
+                    self._pid = os.getpid()
+                    self._thread = threading.Thread(target=self._flush_loop, name="game-session-flusher", daemon=True)
+                    self._thread.start()
+
+    def _flush_loop(self):
+        pid = os.getpid()
+        while self._pid == pid:
+            time.sleep(self.flush_interval)
+            self.flush_quietly()
+
+    def flush_quietly(self):
+        try:
+            self.flush()
+        except Exception:
+            logger.exception("Game session flush failed; retrying on the next cycle")
+        finally:
+            close_old_connections()
+
+    def stats(self):
+        sessions = [self._backend.get(game_mode_id) for game_mode_id in self._backend.ids()]
+        sessions = [session for session in sessions if session is not None]
+        dirty = sum(state.dirty for session in sessions for state in session.questions.values())
+        return {
+            "sessions": len(sessions),
+            "dirty_questions": dirty,
+            "flushes": self.flushes,
+            "flushed_records": self.flushed_records,
+            "flush_errors": self.flush_errors,
+            "discarded_records": self.discarded_records,
+            "last_flush_ms": round(self.last_flush_seconds * 1000, 2) if self.last_flush_seconds is not None else None,
+        }
+
+
+def get_session_settings():
+    return {**DEFAULT_SESSION_SETTINGS, **getattr(settings, "GAME_SESSIONS", {})}
+
+
+_sessions = None
+_sessions_lock = threading.Lock()
+
+
+def get_game_sessions():
+    """The process-wide store, or None when GAME_SESSIONS["ENABLED"] is off."""
+    global _sessions
+    config = get_session_settings()
+    if not config["ENABLED"]:
+        return None
+    if _sessions is None:
+        with _sessions_lock:
+            if _sessions is None:
+                if config["BACKEND"] == "cache":
+                    backend = CacheBackend(config["CACHE_ALIAS"], config["IDLE_TIMEOUT"] * 2)
+                else:
+                    backend = MemoryBackend()
+                _sessions = GameSessions(
+                    backend,
+                    idle_timeout=config["IDLE_TIMEOUT"],
+                    flush_interval=config["FLUSH_INTERVAL"],
+                )
+                atexit.register(_sessions.flush_quietly)
+    # Every worker flushes, even before it handles a game itself (cache backend: the sessions of dead workers)
+    _sessions.ensure_flusher()
+    return _sessions
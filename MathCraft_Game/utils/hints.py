@@ -2,6 +2,8 @@
 
 import math
 
+from .number_index import CUBE, POWER5, PRIME, SQUARE, TRIANGULAR, get_number_index
+
 # Constants migrated from Games.jsx
 NUMBER_HINT_POOL = {
     # A pool of three unique hints for each single-digit solution (0 through 9)
@@ -65,26 +67,13 @@ def is_prime(x):
             return False
     return True
 
-def generate_hint(solution_str: str, rotation_index: int) -> str:
+def collect_clues_reference(abs_n: int, sign: str) -> list:
     """
-    Generates a hint for the given solution based on number properties.
+    Reference implementation: derives every clue by direct computation.
+    Used for values outside the number index and to verify the index.
     """
-    try:
-        n = int(solution_str)
-    except ValueError:
-        return "Input error: The system failed to interpret the solution."
-
-    abs_n = abs(n)
-    sign = "NEGATIVE" if n < 0 else "POSITIVE"
     clues = []
 
-    # --- NEW: Priority Clues for single-digit solutions (0-9) ---
-    if 0 <= abs_n <= 9:
-        pool = NUMBER_HINT_POOL.get(abs_n)
-        if pool:
-            # Use modulo operator to cycle through the hints in the pool
-            return pool[rotation_index % len(pool)]
-
     # --- 1. Strongest Clues: Powers and Roots (for abs_n > 9) ---
     root = round(math.sqrt(abs_n))
     if root * root == abs_n and abs_n > 1:
@@ -107,9 +96,10 @@ def generate_hint(solution_str: str, rotation_index: int) -> str:
         clues.append("The absolute value is a Triangular Number (it's the sum of consecutive integers from 1 to some number).")
 
     # --- 3. Prime and Divisibility Clues ---
-    if is_prime(abs_n):
+    prime = is_prime(abs_n)
+    if prime:
       clues.append(f"This number is a {sign} Prime, only divisible by 1 and itself.")
-    if not is_prime(abs_n) and abs_n > 1:
+    if not prime and abs_n > 1:
       if abs_n % 6 == 0:
         clues.append("The absolute value is a multiple of 6 (it's divisible by both 2 and 3).")
       elif abs_n % 5 == 0:
@@ -121,6 +111,54 @@ def generate_hint(solution_str: str, rotation_index: int) -> str:
         clues.append(f"The absolute value is a {len_n}-digit number.")
 
     sum_digits = sum(int(d) for d in str(abs_n))
+    _append_digit_sum_clue(clues, sum_digits)
+
+    # --- 5. Generic Parity Clue (Last Resort) ---
+    parity = "EVEN" if abs_n % 2 == 0 else "ODD"
+    clues.append(f"The solution is a {sign} {parity} number.")
+
+    return clues
+
+def collect_clues_indexed(abs_n: int, sign: str, index) -> list:
+    """
+    Same clues as collect_clues_reference, but every number property is
+    a lookup in the precomputed NumberPropertyIndex (abs_n must be in range).
+    """
+    clues = []
+    flags = index.flags[abs_n]
+
+    # --- 1. Powers and Roots ---
+    if flags & SQUARE:
+        clues.append(f"The absolute value is a Perfect Square (i.e., {math.isqrt(abs_n)}²).")
+    elif flags & CUBE:
+        clues.append(f"The absolute value is a Perfect Cube (i.e., {round(abs_n**(1/3))}³).")
+    elif flags & POWER5:
+        clues.append(f"The absolute value is a Perfect Power (specifically, {round(abs_n**(1/5))} raised to the power of 5).")
+
+    # --- 2. Sequence Clues ---
+    if flags & TRIANGULAR:
+        clues.append("The absolute value is a Triangular Number (it's the sum of consecutive integers from 1 to some number).")
+
+    # --- 3. Prime and Divisibility Clues ---
+    if flags & PRIME:
+        clues.append(f"This number is a {sign} Prime, only divisible by 1 and itself.")
+    elif abs_n > 1:
+        if abs_n % 6 == 0:
+            clues.append("The absolute value is a multiple of 6 (it's divisible by both 2 and 3).")
+        elif abs_n % 5 == 0:
+            clues.append("The number's last digit is 0 or 5. (i.e., it's a multiple of 5).")
+
+    # --- 4. Digit/Magnitude Clues ---
+    clues.append(f"The absolute value is a {len(str(abs_n))}-digit number.")
+    _append_digit_sum_clue(clues, index.digit_sums[abs_n])
+
+    # --- 5. Generic Parity Clue ---
+    parity = "EVEN" if abs_n % 2 == 0 else "ODD"
+    clues.append(f"The solution is a {sign} {parity} number.")
+
+    return clues
+
+def _append_digit_sum_clue(clues, sum_digits):
     if sum_digits % 9 == 0:
         clues.append("The sum of the digits of the absolute value is a multiple of 9.")
     elif sum_digits % 3 == 0:
@@ -128,12 +166,33 @@ def generate_hint(solution_str: str, rotation_index: int) -> str:
     else:
         clues.append(f"The sum of the digits of the absolute value is {sum_digits}.")
 
-    # --- 5. Generic Parity Clue (Last Resort) ---
-    parity = "EVEN" if abs_n % 2 == 0 else "ODD"
-    clues.append(f"The solution is a {sign} {parity} number.")
+def generate_hint(solution_str: str, rotation_index: int) -> str:
+    """
+    Generates a hint for the given solution based on number properties.
+    """
+    try:
+        n = int(solution_str)
+    except ValueError:
+        return "Input error: The system failed to interpret the solution."
+
+    abs_n = abs(n)
+    sign = "NEGATIVE" if n < 0 else "POSITIVE"
+
+    # --- NEW: Priority Clues for single-digit solutions (0-9) ---
+    if 0 <= abs_n <= 9:
+        pool = NUMBER_HINT_POOL.get(abs_n)
+        if pool:
+            # Use modulo operator to cycle through the hints in the pool
+            return pool[rotation_index % len(pool)]
+
+    index = get_number_index()
+    if abs_n in index:
+        clues = collect_clues_indexed(abs_n, sign, index)
+    else:
+        clues = collect_clues_reference(abs_n, sign)
 
     if clues:
         # For multi-digit numbers, we return the strongest single clue (the first one)
         return clues[0]
 
-    return "The sequence follows a linear or recursive pattern. Focus on the differences or ratios between terms."
\ No newline at end of file
+    return "The sequence follows a linear or recursive pattern. Focus on the differences or ratios between terms."
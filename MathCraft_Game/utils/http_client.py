@@ -0,0 +1,204 @@
+# utils/http_client.py
+
+import os
+import threading
+import time
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+DEFAULT_CLIENT_SETTINGS = {
+    "CONNECT_TIMEOUT": 3,      # seconds to establish the TCP connection
+    "READ_TIMEOUT": 5,         # seconds to wait for the response body
+    "POOL_MAXSIZE": 10,        # keep-alive connections kept per host (and concurrent requests allowed)
+    "POOL_TIMEOUT": 2,         # seconds a request waits for a free connection before failing
+    "FAILURE_THRESHOLD": 5,    # consecutive failures before the breaker opens
+    "COOLDOWN": 30,            # seconds the breaker stays open before a trial request
+}
+
+
+class CircuitOpenError(requests.exceptions.RequestException):
+    """Raised without touching the network while the circuit breaker is open."""
+
+
+class PoolTimeoutError(requests.exceptions.ConnectionError):
+    """Raised when every pooled connection stayed busy for the whole pool timeout."""
+
+
+class CircuitBreaker:
+    """
+    Classic closed / open / half-open breaker.
+
+    After `failure_threshold` consecutive failures the breaker opens and every
+    call fails fast for `cooldown` seconds. The first call after the cool-down
+    is let through as a trial: success closes the breaker, failure re-opens it.
+    Callers must report the outcome of every allowed call, whatever it raised,
+    or a half-open breaker never leaves that state.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold=5, cooldown=30):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self._lock = threading.Lock()
+
+    def allow_request(self):
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.cooldown:
+                self.state = self.HALF_OPEN  # let exactly one trial request through
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.consecutive_failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self.consecutive_failures += 1
+            if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+
+class PooledHTTPClient:
+    """
+    Keep-alive HTTP client for one upstream host.
+
+    Holds a requests.Session with a bounded connection pool (re-created after
+    a fork so workers never share sockets), guards every call with a circuit
+    breaker and keeps latency / error counters. At most `pool_maxsize` calls
+    run at once; a call that cannot get a slot within `pool_timeout` seconds
+    fails with PoolTimeoutError instead of waiting on the pool indefinitely
+    (requests never passes a pool timeout to urllib3).
+    """
+
+    def __init__(self, connect_timeout=3, read_timeout=5, pool_maxsize=10, pool_timeout=2,
+                 failure_threshold=5, cooldown=30):
+        self.timeout = (connect_timeout, read_timeout)
+        self.pool_maxsize = pool_maxsize
+        self.pool_timeout = pool_timeout
+        self.breaker = CircuitBreaker(failure_threshold, cooldown)
+        self._slots = threading.BoundedSemaphore(pool_maxsize)
+
+        self._session = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+        # Metrics
+        self.requests = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.short_circuited = 0
+        self.pool_timeouts = 0
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+
+    @property
+    def session(self):
+        if self._session is None or self._pid != os.getpid():
+            with self._lock:
+                if self._session is None or self._pid != os.getpid():
+                    session = requests.Session()
+                    adapter = HTTPAdapter(
+                        pool_connections=1,
+                        pool_maxsize=self.pool_maxsize,
+                        pool_block=False,  # _slots already bounds concurrency to pool_maxsize
+                    )
+                    session.mount("http://", adapter)
+                    session.mount("https://", adapter)
+                    self._session = session
+                    self._pid = os.getpid()
+        return self._session
+
+    def get(self, url, **kwargs):
+        """
+        GET through the pooled session. Raises CircuitOpenError while the
+        breaker is open and PoolTimeoutError when no connection frees up in time.
+        """
+        if not self._slots.acquire(timeout=self.pool_timeout):
+            with self._lock:
+                self.pool_timeouts += 1
+            raise PoolTimeoutError(f"No free upstream connection within {self.pool_timeout}s.")
+        try:
+            return self._get(url, **kwargs)
+        finally:
+            self._slots.release()
+
+    def _get(self, url, **kwargs):
+        if not self.breaker.allow_request():
+            self.short_circuited += 1
+            raise CircuitOpenError("Upstream circuit is open; failing fast.")
+
+        kwargs.setdefault("timeout", self.timeout)
+        started = time.monotonic()
+        try:
+            response = self.session.get(url, **kwargs)
+            response.raise_for_status()
+        except BaseException as e:
+            # Anything - not only RequestException (unwrapped urllib3 / ssl
+            # errors, a bad URL, KeyboardInterrupt) - counts as a failure, so
+            # a half-open breaker always re-opens instead of staying stuck
+            self._record(started, error=e)
+            self.breaker.record_failure()
+            raise
+        self._record(started)
+        self.breaker.record_success()
+        return response
+
+    def _record(self, started, error=None):
+        elapsed = time.monotonic() - started
+        with self._lock:
+            self.requests += 1
+            self.latency_total += elapsed
+            self.latency_max = max(self.latency_max, elapsed)
+            if error is not None:
+                self.errors += 1
+                if isinstance(error, requests.exceptions.Timeout):
+                    self.timeouts += 1
+
+    def stats(self):
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "timeouts": self.timeouts,
+            "short_circuited": self.short_circuited,
+            "pool_timeouts": self.pool_timeouts,
+            "avg_latency_ms": round(self.latency_total / self.requests * 1000, 2) if self.requests else None,
+            "max_latency_ms": round(self.latency_max * 1000, 2),
+            "circuit_state": self.breaker.state,
+            "consecutive_failures": self.breaker.consecutive_failures,
+        }
+
+
+_banana_client = None
+_client_lock = threading.Lock()
+
+
+def get_banana_client():
+    """Returns the process-wide client for the banana API, configured from settings.BANANA_API."""
+    global _banana_client
+    if _banana_client is None:
+        with _client_lock:
+            if _banana_client is None:
+                config = {**DEFAULT_CLIENT_SETTINGS, **getattr(settings, "BANANA_API", {})}
+                _banana_client = PooledHTTPClient(
+                    connect_timeout=config["CONNECT_TIMEOUT"],
+                    read_timeout=config["READ_TIMEOUT"],
+                    pool_maxsize=config["POOL_MAXSIZE"],
+                    pool_timeout=config["POOL_TIMEOUT"],
+                    failure_threshold=config["FAILURE_THRESHOLD"],
+                    cooldown=config["COOLDOWN"],
+                )
+    return _banana_client
@@ -0,0 +1,149 @@
+# utils/ingest.py
+
+import codecs
+import json
+
+from rest_framework import serializers
+
+from ..models import GameMode, GameQuestionRecord
+from ..serializers import GameQuestionRecordIngestSerializer
+from .records import upsert_question_records
+
+NDJSON_CONTENT_TYPES = {"application/x-ndjson", "application/ndjson", "application/jsonl", "application/x-jsonlines"}
+READ_CHUNK = 64 * 1024
+INGEST_BATCH = 500
+UPSERT_FIELDS = ['time', 'streak', 'user_answer', 'correct_answer', 'status']
+
+
+class InvalidUpload(ValueError):
+    """Raised for bodies that are not a JSON array / NDJSON stream of objects."""
+
+
+class ForeignGameMode(PermissionError):
+    """Raised when a record references a game mode of another user (or none)."""
+
+
+def iter_json_array(stream, chunk_size=READ_CHUNK):
+    """
+    Yields the objects of a top-level JSON array read incrementally from
+    `stream`, so only one chunk and the current object are held in memory.
+    """
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder('utf-8')()
+    buf, pos, eof = '', 0, False
+
+    def more():
+        nonlocal buf, pos, eof
+        if eof:
+            return False
+        chunk = stream.read(chunk_size)
+        eof = not chunk
+        buf = buf[pos:] + utf8.decode(chunk or b'', final=eof)
+        pos = 0
+        return not eof
+
+    def peek():
+        nonlocal pos
+        while True:
+            while pos < len(buf) and buf[pos] in ' \t\r\n':
+                pos += 1
+            if pos < len(buf):
+                return buf[pos]
+            if not more():
+                return ''
+
+    if peek() != '[':
+        raise InvalidUpload("Expected a list of records")
+    pos += 1
+    if peek() == ']':
+        pos += 1
+    else:
+        while True:
+            if peek() != '{':
+                raise InvalidUpload("Each record must be a JSON object.")
+            while True:
+                try:
+                    record, pos = decoder.raw_decode(buf, pos)
+                    break
+                except json.JSONDecodeError:
+                    if not more():
+                        raise InvalidUpload("Malformed JSON.")
+            yield record
+
+            separator = peek()
+            pos += 1
+            if separator == ']':
+                break
+            if separator != ',':
+                raise InvalidUpload("Malformed JSON array.")
+    if peek():
+        raise InvalidUpload("Unexpected data after the JSON array.")
+
+
+def iter_ndjson(stream):
+    """Yields one object per non-empty line."""
+    for number, line in enumerate(stream, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            raise InvalidUpload(f"Malformed JSON on line {number}.")
+        if not isinstance(record, dict):
+            raise InvalidUpload(f"Line {number} is not a JSON object.")
+        yield record
+
+
+def iter_upload(stream, content_type):
+    if stream is None:
+        raise InvalidUpload("Expected a list of records")
+    if content_type in NDJSON_CONTENT_TYPES:
+        return iter_ndjson(stream)
+    return iter_json_array(stream)
+
+
+def ingest_question_records(user, records, batch_size=INGEST_BATCH, before_write=None):
+    """
+    Validates and upserts question records in batches of `batch_size`:
+    one ownership query for the batch's new game modes and one upsert
+    statement on (game_mode, question_number) per batch. `before_write`, if
+    given, is called with the ids of the user's game modes seen for the first
+    time, before their records are written.
+    Must run inside a transaction. Returns (saved_count, game_mode_ids).
+    """
+    owned = set()
+    saved = 0
+    batch = []
+
+    def flush():
+        nonlocal saved
+        serializer = GameQuestionRecordIngestSerializer(data=batch, many=True)
+        if not serializer.is_valid():
+            errors = {saved + i: e for i, e in enumerate(serializer.errors) if e}
+            raise serializers.ValidationError({"errors": errors})
+
+        game_mode_ids = {row['game_mode'] for row in serializer.validated_data}
+        unknown = game_mode_ids - owned
+        if unknown:
+            owned.update(GameMode.objects.filter(pk__in=unknown, user=user).values_list('pk', flat=True))
+            foreign = unknown - owned
+            if foreign:
+                raise ForeignGameMode(f"game_mode {min(foreign)} does not belong to you.")
+            if before_write is not None:
+                before_write(unknown)
+
+        upsert_question_records(
+            [GameQuestionRecord(game_mode_id=row.pop('game_mode'), **row) for row in serializer.validated_data],
+            update_fields=UPSERT_FIELDS,
+        )
+        saved += len(batch)
+        batch.clear()
+
+    for record in records:
+        batch.append(record)
+        if len(batch) >= batch_size:
+            flush()
+    if batch:
+        flush()
+    return saved, owned
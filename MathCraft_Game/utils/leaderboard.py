@@ -0,0 +1,166 @@
+# utils/leaderboard.py
+
+import os
+import threading
+import time
+
+from django.conf import settings
+from django.db import close_old_connections
+
+from ..models import GameMode, UserStats
+from .stats import MODES
+
+DEFAULT_LEADERBOARD_SETTINGS = {
+    "REFRESH_INTERVAL": 30,  # seconds between background rebuilds
+    "MIN_INTERVAL": 2,       # rebuilds triggered by IQ updates are spaced at least this far apart
+    "PAGE_SIZE": 20,
+    "MAX_PAGE_SIZE": 100,
+}
+
+
+class LeaderboardSnapshot:
+    """
+    Immutable, fully sorted view of every player's score per mode.
+
+    Entries are (username, score, user_id) tuples ordered by score (desc) then
+    username. Ranks use competition ranking (1, 2, 2, 4) and are precomputed,
+    as is a user_id -> position map, so top-K and page reads are list slices
+    and "my rank" is one dict lookup.
+    """
+
+    def __init__(self, rows, built_at=None):
+        self.built_at = built_at if built_at is not None else time.time()
+        self.entries = {mode: [] for mode in MODES}
+        for mode, user_id, username, score in rows:
+            if mode in self.entries:
+                self.entries[mode].append((username, score or 0.0, user_id))
+
+        self.ranks = {}
+        self.positions = {}
+        for mode, entries in self.entries.items():
+            entries.sort(key=lambda e: (-e[1], e[0]))
+            ranks = []
+            for i, (_, score, _) in enumerate(entries):
+                ranks.append(ranks[-1] if i and score == entries[i - 1][1] else i + 1)
+            self.ranks[mode] = ranks
+            self.positions[mode] = {user_id: i for i, (_, _, user_id) in enumerate(entries)}
+
+    def size(self, mode):
+        return len(self.entries[mode])
+
+    def _rows(self, mode, start, stop):
+        entries, ranks = self.entries[mode], self.ranks[mode]
+        return [
+            {"rank": ranks[i], "username": entries[i][0], "overall_score": int(entries[i][1])}
+            for i in range(max(start, 0), min(stop, len(entries)))
+        ]
+
+    def top(self, mode, k):
+        return self._rows(mode, 0, k)
+
+    def page(self, mode, page, page_size):
+        start = (page - 1) * page_size
+        return self._rows(mode, start, start + page_size)
+
+    def around(self, mode, user_id, radius):
+        """Returns (my_row_or_None, neighbours) with `radius` players above and below."""
+        position = self.positions[mode].get(user_id)
+        if position is None:
+            return None, []
+        start = max(position - radius, 0)
+        rows = self._rows(mode, start, position + radius + 1)
+        return rows[position - start], rows
+
+
+def load_score_rows():
+    """Per-mode total IQ per player, straight from the UserStats score table."""
+    rows = UserStats.objects.values_list('mode', 'user_id', 'user__username', 'iq_sum').iterator(chunk_size=5000)
+    return ((GameMode.Mode(mode).label, *rest) for mode, *rest in rows)
+
+
+class Leaderboard:
+    """
+    Holds the current snapshot and rebuilds it in a background thread every
+    REFRESH_INTERVAL seconds, or sooner after mark_dirty(). Readers never wait
+    for a rebuild except for the very first one in a process.
+    """
+
+    def __init__(self, loader=load_score_rows, refresh_interval=30, min_interval=2):
+        self.loader = loader
+        self.refresh_interval = refresh_interval
+        self.min_interval = min_interval
+        self._snapshot = None
+        self._lock = threading.Lock()
+        self._dirty = threading.Event()
+        self._thread = None
+        self._pid = None
+        self.refreshes = 0
+        self.last_build_seconds = None
+
+    def snapshot(self):
+        if self._snapshot is None or self._pid != os.getpid():
+            with self._lock:
+                if self._snapshot is None or self._pid != os.getpid():
+                    self.refresh()
+                    self._start_refresher()
+        return self._snapshot
+
+    def refresh(self):
+        started = time.monotonic()
+        snapshot = LeaderboardSnapshot(self.loader())
+        self._snapshot = snapshot  # atomic reference swap; readers keep their old snapshot
+        self.refreshes += 1
+        self.last_build_seconds = time.monotonic() - started
+        return snapshot
+
+    def mark_dirty(self):
+        """Asks the refresher for an early rebuild (e.g. after an IQ update)."""
+        self._dirty.set()
+
+    def _start_refresher(self):
+        self._pid = os.getpid()
+        self._thread = threading.Thread(target=self._refresh_loop, name="leaderboard-refresher", daemon=True)
+        self._thread.start()
+
+    def _refresh_loop(self):
+        pid = os.getpid()
+        while self._pid == pid:
+            self._dirty.wait(self.refresh_interval)
+            self._dirty.clear()
+            try:
+                self.refresh()
+            except Exception:
+                pass  # keep serving the previous snapshot; retry on the next cycle
+            finally:
+                close_old_connections()
+            time.sleep(self.min_interval)
+
+    def stats(self):
+        snapshot = self._snapshot
+        return {
+            "refreshes": self.refreshes,
+            "last_build_ms": round(self.last_build_seconds * 1000, 2) if self.last_build_seconds is not None else None,
+            "age_seconds": round(time.time() - snapshot.built_at, 1) if snapshot else None,
+            "players": {mode: snapshot.size(mode) for mode in MODES} if snapshot else None,
+        }
+
+
+def get_leaderboard_settings():
+    return {**DEFAULT_LEADERBOARD_SETTINGS, **getattr(settings, "LEADERBOARD", {})}
+
+
+_leaderboard = None
+_leaderboard_lock = threading.Lock()
+
+
+def get_leaderboard():
+    global _leaderboard
+    if _leaderboard is None:
+        with _leaderboard_lock:
+            if _leaderboard is None:
+                config = get_leaderboard_settings()
+                _leaderboard = Leaderboard(
+                    refresh_interval=config["REFRESH_INTERVAL"],
+                    min_interval=config["MIN_INTERVAL"],
+                )
+    return _leaderboard
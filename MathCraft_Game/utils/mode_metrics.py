@@ -0,0 +1,52 @@
+# utils/mode_metrics.py
+
+from ..models import GameMode, UserStats
+from .request_cache import request_cached
+
+# metric -> UserStats column (the running per-mode totals kept by utils.stats)
+METRICS = {
+    'games': 'games_played',
+    'answered': 'questions_answered',
+    'correct': 'correct_answers',
+    'best_streak': 'best_streak',
+    'fastest_time': 'fastest_time',
+    'iq_sum': 'iq_sum',
+    'iq_count': 'iq_count',
+    'best_iq': 'best_iq',
+    'qualifying': 'qualifying_games',
+}
+
+
+@request_cached
+def get_mode_metrics(user_id):
+    """
+    Every per-mode metric of the user in one indexed read of their UserStats
+    rows (at most one per mode), whatever the length of their history:
+    {'easy': {'games': ..., 'answered': ..., ...}, 'intermediate': ..., 'hard': ...}.
+
+    Sums and counts of modes never played are 0; best_streak, fastest_time
+    and best_iq are None.
+    """
+    rows = {
+        mode: values
+        for mode, *values in UserStats.objects.filter(user_id=user_id).values_list('mode', *METRICS.values())
+    }
+
+    metrics = {}
+    for mode in GameMode.Mode:
+        values = rows.get(mode)
+        if values is None:
+            metrics[mode.label] = {
+                metric: None if metric in ('best_streak', 'fastest_time', 'best_iq') else 0 for metric in METRICS
+            }
+        else:
+            metrics[mode.label] = dict(zip(METRICS, values))
+    return metrics
+
+
+def total(metrics, metric):
+    return sum(values[metric] or 0 for values in metrics.values())
+
+
+def best(metrics, metric, default=0):
+    return max((values[metric] for values in metrics.values() if values[metric] is not None), default=default)
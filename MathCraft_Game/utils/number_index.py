@@ -0,0 +1,135 @@
+# utils/number_index.py
+
+import math
+import mmap
+import os
+import struct
+import threading
+
+from django.conf import settings
+
+# Bit flags stored per number in NumberPropertyIndex.flags
+PRIME = 1
+SQUARE = 2
+CUBE = 4
+POWER5 = 8
+TRIANGULAR = 16
+
+FILE_MAGIC = b"MCNIDX01"
+HEADER = struct.Struct("<8sQ")  # magic, limit
+
+DEFAULT_INDEX_SETTINGS = {
+    "LIMIT": 100000,  # largest absolute value served from the index (must be >= 9)
+    "PATH": None,     # optional file the index is memory-mapped from (written on first build)
+}
+
+
+class NumberPropertyIndex:
+    """
+    Precomputed number properties for 0..limit.
+
+    `flags[n]` packs PRIME / SQUARE / CUBE / POWER5 / TRIANGULAR bits and
+    `digit_sums[n]` holds the decimal digit sum, so every property the hint
+    generator asks about is a single array lookup. Both arrays are either
+    plain bytearrays or slices of a read-only memory-mapped file.
+    """
+
+    def __init__(self, limit, flags, digit_sums, mapped=None):
+        self.limit = limit
+        self.flags = flags
+        self.digit_sums = digit_sums
+        self._mapped = mapped  # keeps the mmap alive for memoryview slices
+
+    @classmethod
+    def build(cls, limit):
+        size = limit + 1
+
+        # Sieve of Eratosthenes; PRIME is bit 1, so the sieve doubles as the flag array
+        flags = bytearray([PRIME]) * size
+        flags[0] = flags[1] = 0
+        for i in range(2, math.isqrt(limit) + 1):
+            if flags[i]:
+                flags[i * i::i] = bytes(len(range(i * i, size, i)))
+
+        # Perfect powers (base > 1, matching the "abs_n > 1" rule of the hint text)
+        for bit, exponent in ((SQUARE, 2), (CUBE, 3), (POWER5, 5)):
+            base = 2
+            while base ** exponent <= limit:
+                flags[base ** exponent] |= bit
+                base += 1
+
+        # Triangular numbers k(k+1)/2 for k >= 1
+        k = 1
+        while k * (k + 1) // 2 <= limit:
+            flags[k * (k + 1) // 2] |= TRIANGULAR
+            k += 1
+
+        # Digit sums: ds(n) = ds(n // 10) + n % 10
+        digit_sums = bytearray(range(10)) + bytearray(size - 10)
+        for n in range(10, size):
+            digit_sums[n] = digit_sums[n // 10] + n % 10
+
+        return cls(limit, flags, digit_sums)
+
+    def save(self, path):
+        """Writes the index in the layout load() memory-maps."""
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(HEADER.pack(FILE_MAGIC, self.limit))
+            f.write(self.flags)
+            f.write(self.digit_sums)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """Memory-maps an index written by save(); pages are shared between workers."""
+        with open(path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, limit = HEADER.unpack_from(mapped)
+        size = limit + 1
+        if magic != FILE_MAGIC or len(mapped) != HEADER.size + 2 * size:
+            mapped.close()
+            raise ValueError(f"{path} is not a valid number index file.")
+        view = memoryview(mapped)
+        start = HEADER.size
+        return cls(limit, view[start:start + size], view[start + size:start + 2 * size], mapped=mapped)
+
+    def __contains__(self, n):
+        return 0 <= n <= self.limit
+
+    def has(self, n, bit):
+        return bool(self.flags[n] & bit)
+
+    def digit_sum(self, n):
+        return self.digit_sums[n]
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_number_index():
+    """
+    Returns the process-wide index: memory-mapped from settings.HINT_INDEX["PATH"]
+    when that file exists, otherwise built once (and saved to PATH if configured).
+    """
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                config = {**DEFAULT_INDEX_SETTINGS, **getattr(settings, "HINT_INDEX", {})}
+                limit, path = config["LIMIT"], config["PATH"]
+                index = None
+                if path and os.path.exists(path):
+                    try:
+                        index = NumberPropertyIndex.load(path)
+                    except (OSError, ValueError, struct.error):
+                        index = None
+                    if index is not None and index.limit != limit:
+                        index = None  # stale file from a different LIMIT
+                if index is None:
+                    index = NumberPropertyIndex.build(limit)
+                    if path:
+                        index.save(path)
+                _index = index
+    return _index
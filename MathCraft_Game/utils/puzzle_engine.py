@@ -0,0 +1,202 @@
+# utils/puzzle_engine.py
+
+import hashlib
+import hmac
+import os
+import random
+import threading
+import time
+
+from django.conf import settings
+from django.urls import reverse
+from PIL import Image, ImageDraw, ImageFont
+
+from .question_tokens import InvalidQuestionToken, seal, unseal
+
+BANANA = "BANANA"  # placeholder token for the hidden number
+
+IMAGE_SIZE = (480, 160)
+BACKGROUND = (255, 255, 255)
+TEXT_COLOR = (33, 37, 41)
+BANANA_COLOR = (250, 204, 21)
+BANANA_TIP = (120, 83, 18)
+
+DEFAULT_ENGINE_SETTINGS = {
+    "SEED": 2025,         # the pool is fully determined by the seed
+    "POOL_SIZE": 1000,    # number of distinct pre-rendered puzzles
+    "MEDIA_DIR": "puzzles",
+    "IMAGE_TTL": 1800,    # seconds an image URL stays valid (pool age + answering time)
+}
+
+IMAGE_TOKEN_NAMESPACE = "puzzle-image"
+
+
+def _build_equation(rng, b):
+    """
+    Builds one equation around the hidden value `b`.
+    Returns the token list; the right-hand side is always a non-negative integer.
+    """
+    a = rng.randint(1, 9)
+    c = rng.randint(1, 9)
+    template = rng.randrange(6)
+
+    if template == 0:
+        return [BANANA, "+", a, "=", b + a]
+    if template == 1:
+        return [a, "x", BANANA, "=", a * b]
+    if template == 2:
+        return [a, "x", BANANA, "+", c, "=", a * b + c]
+    if template == 3:
+        return [a, "+", BANANA, "x", c, "=", a + b * c]
+    if template == 4:
+        big = a + b + c
+        return [big, "-", BANANA, "=", big - b]
+    return [BANANA, "x", BANANA, "+", a, "=", b * b + a]
+
+
+def generate_equation(rng):
+    """Returns (tokens, solution) for a random banana equation with a solution in 0-9."""
+    solution = rng.randint(0, 9)
+    return _build_equation(rng, solution), solution
+
+
+def equation_text(tokens):
+    """Plain-text form of an equation, e.g. '3 x 🍌 + 2 = 17'."""
+    return " ".join("🍌" if t == BANANA else str(t) for t in tokens)
+
+
+def _load_font(size):
+    try:
+        return ImageFont.load_default(size=size)
+    except TypeError:  # Pillow built without FreeType only has the bitmap font
+        return ImageFont.load_default()
+
+
+def _draw_banana(draw, x, y, size):
+    """Draws a simple crescent banana with its top-left corner at (x, y)."""
+    draw.ellipse([x, y, x + size, y + size], fill=BANANA_COLOR)
+    inset = size * 0.22
+    draw.ellipse([x + inset, y - inset, x + size + inset, y + size - inset], fill=BACKGROUND)
+    tip = max(3, size // 10)
+    draw.rectangle([x + size * 0.08, y + size * 0.42, x + size * 0.08 + tip, y + size * 0.42 + tip], fill=BANANA_TIP)
+
+
+def render_equation(tokens, path):
+    """Renders an equation to a PNG at `path` (written atomically)."""
+    width, height = IMAGE_SIZE
+    image = Image.new("RGB", IMAGE_SIZE, BACKGROUND)
+    draw = ImageDraw.Draw(image)
+    font = _load_font(56)
+
+    gap = 16
+    banana_size = 60
+    pieces = [str(t) for t in tokens]
+    widths = [banana_size if t == BANANA else draw.textlength(p, font=font) for t, p in zip(tokens, pieces)]
+    x = (width - (sum(widths) + gap * (len(tokens) - 1))) / 2
+
+    for token, piece, w in zip(tokens, pieces, widths):
+        if token == BANANA:
+            _draw_banana(draw, x, (height - banana_size) / 2, banana_size)
+        else:
+            draw.text((x, height / 2), piece, fill=TEXT_COLOR, font=font, anchor="lm")
+        x += w + gap
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    image.save(tmp_path, format="PNG")
+    os.replace(tmp_path, path)
+
+
+class LocalPuzzleProvider:
+    """
+    In-process replacement for the banana API.
+
+    Puzzle `i` of the pool is derived from (seed, i) alone, so the solution can
+    be recomputed at any time and the image only ever needs rendering once.
+
+    The pool index never reaches the client: knowing it (and the seed) gives
+    the solution away. Images are stored under MEDIA_ROOT/<MEDIA_DIR>/<seed>/
+    with file names keyed by SECRET_KEY, so they cannot be enumerated, and each
+    issued puzzle links to them through a fresh encrypted, expiring token
+    (see image_url / resolve_image_token), so a URL is never seen twice.
+    """
+
+    def __init__(self, seed=2025, pool_size=1000, media_dir="puzzles", image_ttl=1800):
+        self.seed = seed
+        self.pool_size = pool_size
+        self.image_ttl = image_ttl
+        self.relative_dir = f"{media_dir}/{seed}"
+        self._rng = random.Random()
+        self._rng_lock = threading.Lock()
+
+    def puzzle(self, index):
+        """Returns (tokens, solution) for pool entry `index`."""
+        return generate_equation(random.Random(f"{self.seed}:{index}"))
+
+    def image_name(self, index):
+        key = hashlib.sha256(f"mathcraft.puzzle-file:{settings.SECRET_KEY}".encode()).digest()
+        return hmac.new(key, f"{self.seed}:{index}".encode(), hashlib.sha256).hexdigest()[:32]
+
+    def image_path(self, index):
+        return os.path.join(settings.MEDIA_ROOT, self.relative_dir, f"{self.image_name(index)}.png")
+
+    def image_url(self, index):
+        """A single-use-looking URL for pool entry `index`: new on every call, valid for image_ttl seconds."""
+        token = seal([self.seed, int(index), int(time.time()) + self.image_ttl], IMAGE_TOKEN_NAMESPACE)
+        return reverse('puzzle_image', args=[token])
+
+    def resolve_image_token(self, token):
+        """Returns the image path an image_url() token points to; raises InvalidQuestionToken."""
+        try:
+            seed, index, expires_at = unseal(token, IMAGE_TOKEN_NAMESPACE)
+        except (TypeError, ValueError):
+            raise InvalidQuestionToken("Malformed image token.")
+        if seed != self.seed or not 0 <= index < self.pool_size:
+            raise InvalidQuestionToken("Image token is not for this puzzle pool.")
+        if expires_at < time.time():
+            raise InvalidQuestionToken("Image token has expired.")
+        return self.ensure_rendered(index)
+
+    def ensure_rendered(self, index):
+        path = self.image_path(index)
+        if not os.path.exists(path):
+            tokens, _ = self.puzzle(index)
+            render_equation(tokens, path)
+        return path
+
+    def render_all(self):
+        """Pre-renders the whole pool; returns how many images were newly written."""
+        written = 0
+        for index in range(self.pool_size):
+            if not os.path.exists(self.image_path(index)):
+                self.ensure_rendered(index)
+                written += 1
+        return written
+
+    def __call__(self):
+        """Same contract as fetch_banana_puzzle: returns (question_image_url, solution)."""
+        with self._rng_lock:
+            index = self._rng.randrange(self.pool_size)
+        _, solution = self.puzzle(index)
+        self.ensure_rendered(index)
+        return self.image_url(index), solution
+
+
+_provider = None
+_provider_lock = threading.Lock()
+
+
+def get_local_provider():
+    """Returns the process-wide local provider configured from settings.PUZZLE_ENGINE."""
+    global _provider
+    if _provider is None:
+        with _provider_lock:
+            if _provider is None:
+                config = {**DEFAULT_ENGINE_SETTINGS, **getattr(settings, "PUZZLE_ENGINE", {})}
+                _provider = LocalPuzzleProvider(
+                    seed=config["SEED"],
+                    pool_size=config["POOL_SIZE"],
+                    media_dir=config["MEDIA_DIR"],
+                    image_ttl=config["IMAGE_TTL"],
+                )
+    return _provider
@@ -0,0 +1,301 @@
+# utils/puzzle_pool.py
+
+import logging
+import os
+import random
+import threading
+import time
+from collections import deque
+
+import requests
+from django.conf import settings
+
+from .http_client import get_banana_client
+from .puzzle_engine import get_local_provider
+
+logger = logging.getLogger(__name__)
+
+BANANA_API_URL = "http://marcconrad.com/uob/banana/api.php?out=json"
+
+DEFAULT_POOL_SETTINGS = {
+    "ENABLED": True,
+    "LOW_WATERMARK": 5,      # wake the filler when the buffer drops to this size
+    "HIGH_WATERMARK": 20,    # filler stops once the buffer holds this many puzzles
+    "MAX_AGE": 600,          # seconds before a buffered puzzle is considered stale
+    "RETRY_DELAY": 2.0,      # back-off after a failed upstream fetch
+    "UPSTREAM": "remote",    # "remote" (banana API), "local" (puzzle_engine) or "stub" (test stand-in)
+}
+
+
+def parse_banana_payload(data):
+    """
+    Extracts (question_image, solution) from a banana API response body.
+    The API sometimes wraps the object in a list, so both shapes are accepted.
+    """
+    if isinstance(data, list) and len(data) > 0:
+        question_data = data[0]
+    elif isinstance(data, dict):
+        question_data = data
+    else:
+        raise ValueError("External API returned empty or unreadable data structure.")
+
+    question = question_data.get('question')
+    solution = question_data.get('solution')
+
+    if not question or solution is None:  # Check for None explicitly
+        raise ValueError("External API response was valid JSON but lacked 'question' or 'solution' fields.")
+
+    return question, solution
+
+
+def fetch_banana_puzzle():
+    """
+    Live fetch of one puzzle from the banana API over the shared keep-alive client.
+    Raises the usual requests exceptions (CircuitOpenError included) so callers
+    can map them to 503/504.
+    """
+    response = get_banana_client().get(BANANA_API_URL)  # raises HTTPError for 4xx/5xx
+    return parse_banana_payload(response.json())
+
+
+class StubUpstream:
+    """
+    Local stand-in for the banana API, used in tests and offline development.
+    Serves puzzles from a fixed list (or generates placeholder ones) and can
+    simulate latency and periodic failures.
+    """
+
+    def __init__(self, puzzles=None, delay=0.0, fail_every=0):
+        self.puzzles = list(puzzles or [])
+        self.delay = delay
+        self.fail_every = fail_every
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        with self._lock:
+            self.calls += 1
+            call_number = self.calls
+
+        if self.delay:
+            time.sleep(self.delay)
+        if self.fail_every and call_number % self.fail_every == 0:
+            raise requests.exceptions.ConnectionError("Stub upstream failure")
+
+        if self.puzzles:
+            return self.puzzles[(call_number - 1) % len(self.puzzles)]
+        solution = random.randint(0, 9)
+        return f"http://localhost/stub-banana/{call_number}.png", solution
+
+
+class PuzzlePool:
+    """
+    Bounded buffer of pre-fetched (question_image, solution) pairs.
+
+    A daemon thread keeps the buffer topped up: it wakes whenever the size
+    drops to the low watermark and fetches until the high watermark is reached.
+    take() never touches the network; it returns None when the buffer is empty
+    so the caller can fall back to a live fetch.
+    """
+
+    def __init__(self, fetcher, low_watermark=5, high_watermark=20, max_age=600, retry_delay=2.0):
+        if not 0 <= low_watermark < high_watermark:
+            raise ValueError("low_watermark must be smaller than high_watermark")
+
+        self.fetcher = fetcher
+        self.low_watermark = low_watermark
+        self.high_watermark = high_watermark
+        self.max_age = max_age
+        self.retry_delay = retry_delay
+
+        self._buffer = deque(maxlen=high_watermark)
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+        self._pid = None
+
+        # Metrics
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.fetches = 0
+        self.fetch_errors = 0
+        self.fetch_time_total = 0.0
+        self.fetch_time_max = 0.0
+        self.last_refill_seconds = None
+
+    # ------------------------------------------------------------------
+    # Consumer side
+    # ------------------------------------------------------------------
+    def take(self):
+        """Pops the oldest fresh puzzle in O(1), or returns None if the pool is empty."""
+        self._ensure_started()
+
+        puzzle = None
+        with self._lock:
+            while self._buffer:
+                question, solution, fetched_at = self._buffer.popleft()
+                if self.max_age and time.monotonic() - fetched_at > self.max_age:
+                    self.expired += 1
+                    continue
+                puzzle = (question, solution)
+                break
+
+            if puzzle is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            size = len(self._buffer)
+
+        if size <= self.low_watermark:
+            self._wakeup.set()
+        return puzzle
+
+    def __len__(self):
+        return len(self._buffer)
+
+    # ------------------------------------------------------------------
+    # Filler side
+    # ------------------------------------------------------------------
+    def start(self):
+        """Starts the background filler for the current process."""
+        with self._lock:
+            self._start_locked()
+
+    def stop(self, timeout=None):
+        self._stopped.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _ensure_started(self):
+        # Threads do not survive a fork (e.g. gunicorn --preload), so restart per PID
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._buffer.clear()
+                    self._start_locked()
+
+    def _start_locked(self):
+        if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+            return
+        self._pid = os.getpid()
+        self._stopped.clear()
+        self._wakeup.set()  # fill immediately on start
+        self._thread = threading.Thread(target=self._fill_loop, name="puzzle-pool-filler", daemon=True)
+        self._thread.start()
+
+    def _fill_loop(self):
+        while not self._stopped.is_set():
+            self._wakeup.wait()
+            self._wakeup.clear()
+            if self._stopped.is_set():
+                break
+            self.refill()
+
+    def refill(self):
+        """Fetches puzzles until the high watermark is reached (or upstream fails)."""
+        started = time.monotonic()
+        while not self._stopped.is_set() and len(self._buffer) < self.high_watermark:
+            fetch_started = time.monotonic()
+            try:
+                question, solution = self.fetcher()
+            except Exception as e:
+                self.fetch_errors += 1
+                logger.warning("Puzzle pool refill failed: %s: %s", type(e).__name__, e)
+                self._stopped.wait(self.retry_delay)
+                self._wakeup.set()  # try again on the next loop iteration
+                return
+            elapsed = time.monotonic() - fetch_started
+
+            with self._lock:
+                self._buffer.append((question, solution, time.monotonic()))
+                self.fetches += 1
+                self.fetch_time_total += elapsed
+                self.fetch_time_max = max(self.fetch_time_max, elapsed)
+
+        self.last_refill_seconds = time.monotonic() - started
+
+    # ------------------------------------------------------------------
+    # Metrics
+    # ------------------------------------------------------------------
+    def stats(self):
+        requests_served = self.hits + self.misses
+        return {
+            "size": len(self._buffer),
+            "low_watermark": self.low_watermark,
+            "high_watermark": self.high_watermark,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / requests_served, 4) if requests_served else None,
+            "expired": self.expired,
+            "fetches": self.fetches,
+            "fetch_errors": self.fetch_errors,
+            "avg_fetch_ms": round(self.fetch_time_total / self.fetches * 1000, 2) if self.fetches else None,
+            "max_fetch_ms": round(self.fetch_time_max * 1000, 2),
+            "last_refill_ms": round(self.last_refill_seconds * 1000, 2) if self.last_refill_seconds is not None else None,
+        }
+
+
+_pool = None
+_stub = None
+_pool_lock = threading.Lock()
+
+
+def get_pool_settings():
+    return {**DEFAULT_POOL_SETTINGS, **getattr(settings, "PUZZLE_POOL", {})}
+
+
+def get_puzzle_provider():
+    """
+    Returns the callable that produces (question_image, solution) pairs
+    for this deployment, selected by settings.PUZZLE_POOL["UPSTREAM"].
+    """
+    global _stub
+    upstream = get_pool_settings()["UPSTREAM"]
+    if upstream == "local":
+        return get_local_provider()
+    if upstream == "stub":
+        if _stub is None:
+            _stub = StubUpstream()
+        return _stub
+    return fetch_banana_puzzle
+
+
+def get_puzzle_pool():
+    """
+    Returns the process-wide puzzle pool configured from settings.PUZZLE_POOL,
+    or None when the pool is disabled.
+    """
+    global _pool
+    config = get_pool_settings()
+    if not config["ENABLED"]:
+        return None
+
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = PuzzlePool(
+                    get_puzzle_provider(),
+                    low_watermark=config["LOW_WATERMARK"],
+                    high_watermark=config["HIGH_WATERMARK"],
+                    max_age=config["MAX_AGE"],
+                    retry_delay=config["RETRY_DELAY"],
+                )
+    return _pool
+
+
+def next_puzzle():
+    """
+    Returns (question_image, solution): from the pool when possible,
+    otherwise straight from the configured provider.
+    """
+    pool = get_puzzle_pool()
+    if pool is None:
+        return get_puzzle_provider()()
+
+    puzzle = pool.take()
+    if puzzle is None:
+        puzzle = pool.fetcher()  # pool ran dry: live fetch in the request thread
+    return puzzle
@@ -0,0 +1,115 @@
+# utils/question_tokens.py
+
+import base64
+import hashlib
+import json
+import os
+import time
+from collections import namedtuple
+
+from cryptography.exceptions import InvalidTag
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from django.conf import settings
+
+TOKEN_VERSION = b"\x02"  # version 1 tokens (before AES-GCM) are rejected
+NONCE_SIZE = 12  # the AES-GCM standard nonce
+TAG_SIZE = 16
+
+DEFAULT_TOKEN_SETTINGS = {
+    "TTL": 900,          # seconds a question token stays valid
+    "STATELESS": False,  # when True, marcconrad_game skips the DB write and relies on the token
+}
+
+QuestionClaims = namedtuple("QuestionClaims", ["solution", "game_mode_id", "question_number", "user_id", "expires_at"])
+
+
+class InvalidQuestionToken(ValueError):
+    """Raised for tampered, malformed, expired or mismatched question tokens."""
+
+
+def get_token_settings():
+    return {**DEFAULT_TOKEN_SETTINGS, **getattr(settings, "QUESTION_TOKENS", {})}
+
+
+def _aead(namespace):
+    """AES-256-GCM under a key derived from SECRET_KEY for this namespace."""
+    return AESGCM(hashlib.sha256(f"mathcraft.{namespace}.aead:{settings.SECRET_KEY}".encode()).digest())
+
+
+def _b64encode(raw):
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def _b64decode(token):
+    return base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+
+
+def seal(values, namespace="question-token"):
+    """
+    Encrypts and authenticates a JSON list into an opaque URL-safe token with
+    AES-GCM (the version byte is authenticated too). A fresh random nonce per
+    call: sealing the same values twice gives unrelated tokens. `namespace`
+    keeps the keys of different uses apart.
+    """
+    payload = json.dumps(values, separators=(",", ":")).encode()
+    nonce = os.urandom(NONCE_SIZE)
+    return _b64encode(TOKEN_VERSION + nonce + _aead(namespace).encrypt(nonce, payload, TOKEN_VERSION))
+
+
+def unseal(token, namespace="question-token"):
+    """Returns the list sealed into `token`; raises InvalidQuestionToken if it was not issued by seal()."""
+    try:
+        raw = _b64decode(str(token))
+    except (ValueError, TypeError):
+        raise InvalidQuestionToken("Malformed question token.")
+
+    if len(raw) <= 1 + NONCE_SIZE + TAG_SIZE or raw[:1] != TOKEN_VERSION:
+        raise InvalidQuestionToken("Malformed question token.")
+
+    nonce, ciphertext = raw[1:1 + NONCE_SIZE], raw[1 + NONCE_SIZE:]
+    try:
+        payload = _aead(namespace).decrypt(nonce, ciphertext, TOKEN_VERSION)
+    except InvalidTag:
+        raise InvalidQuestionToken("Question token signature mismatch.")
+    try:
+        return json.loads(payload)
+    except ValueError:
+        raise InvalidQuestionToken("Malformed question token.")
+
+
+def issue_question_token(user_id, game_mode_id, question_number, solution, ttl=None):
+    """
+    Returns an opaque token carrying the solution for one question.
+    The payload is encrypted and authenticated (AES-GCM), so the client can
+    neither read nor alter the solution.
+    """
+    ttl = get_token_settings()["TTL"] if ttl is None else ttl
+    return seal([str(solution), int(game_mode_id), int(question_number), int(user_id), int(time.time()) + ttl])
+
+
+def read_question_token(token, user_id, game_mode_id=None, question_number=None):
+    """
+    Validates a token and returns its QuestionClaims.
+    The token must belong to `user_id`; game_mode_id / question_number, when
+    given, must match the ones it was issued for.
+    """
+    try:
+        claims = QuestionClaims(*unseal(token))
+    except TypeError:
+        raise InvalidQuestionToken("Malformed question token.")
+
+    if claims.expires_at < time.time():
+        raise InvalidQuestionToken("Question token has expired.")
+    if claims.user_id != int(user_id):
+        raise InvalidQuestionToken("Question token does not belong to this user.")
+    try:
+        game_mode_id = None if game_mode_id is None else int(game_mode_id)
+        question_number = None if question_number is None else int(question_number)
+    except (TypeError, ValueError):
+        raise InvalidQuestionToken("Invalid game context for question token.")
+    if game_mode_id is not None and game_mode_id != claims.game_mode_id:
+        raise InvalidQuestionToken("Question token was issued for a different game.")
+    if question_number is not None and question_number != claims.question_number:
+        raise InvalidQuestionToken("Question token was issued for a different question.")
+
+    return claims
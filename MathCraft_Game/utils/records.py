@@ -0,0 +1,43 @@
+# utils/records.py
+
+from django.db import connection
+
+from ..models import GameQuestionRecord
+
+
+def _conflict_options(unique_fields, update_fields):
+    options = {"update_conflicts": True, "update_fields": update_fields}
+    # MySQL's ON DUPLICATE KEY UPDATE cannot name the conflict target; SQLite/PostgreSQL require it
+    if connection.features.supports_update_conflicts_with_target:
+        options["unique_fields"] = unique_fields
+    return options
+
+
+def update_counter_row(model, lookup, updates, **defaults):
+    """
+    Applies F()-expression `updates` to the row matching the unique `lookup`,
+    inserting the row (with `defaults`) first if it does not exist yet.
+
+    The row is claimed with a no-op INSERT ... ON DUPLICATE KEY UPDATE /
+    ON CONFLICT DO UPDATE, which inserts it or takes an exclusive lock on the
+    existing one in a single statement; the UPDATE then runs on a row the
+    transaction already holds. An UPDATE that matches nothing is never issued:
+    on InnoDB (REPEATABLE READ) it takes a gap lock, and two concurrent first
+    writes holding that gap deadlock on their INSERTs.
+    """
+    model.objects.bulk_create(
+        [model(**lookup, **defaults)],
+        **_conflict_options(list(lookup), [next(iter(lookup))]),
+    )
+    return model.objects.filter(**lookup).update(**updates)
+
+
+def upsert_question_records(records, update_fields):
+    """
+    Inserts GameQuestionRecord rows, updating `update_fields` on rows that
+    already exist for the same (game_mode, question_number), in one statement.
+    No read is needed beforehand.
+    """
+    return GameQuestionRecord.objects.bulk_create(
+        records, **_conflict_options(["game_mode", "question_number"], update_fields)
+    )
@@ -0,0 +1,47 @@
+# utils/request_cache.py
+
+import contextvars
+import functools
+from contextlib import contextmanager
+
+_store = contextvars.ContextVar("request_cache", default=None)
+
+
+@contextmanager
+def request_cache():
+    """
+    Opens a cache scoped to the current context (one batch request): functions
+    decorated with @request_cached return the first result for the same
+    arguments until the block exits. Outside the block they run normally.
+    """
+    token = _store.set({})
+    try:
+        yield
+    finally:
+        _store.reset(token)
+
+
+def request_cached(func):
+    """Memoizes a read helper inside request_cache(); model arguments are keyed by pk."""
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        store = _store.get()
+        if store is None:
+            return func(*args, **kwargs)
+        key = (
+            func.__module__, func.__qualname__,
+            tuple(getattr(arg, 'pk', arg) for arg in args),
+            tuple(sorted((name, getattr(value, 'pk', value)) for name, value in kwargs.items())),
+        )
+        if key not in store:
+            store[key] = func(*args, **kwargs)
+        return store[key]
+
+    return wrapper
+
+
+def stats():
+    """Entries cached in the current scope (None outside request_cache())."""
+    store = _store.get()
+    return None if store is None else len(store)
@@ -0,0 +1,198 @@
+# utils/response_cache.py
+
+import copy
+import functools
+import hashlib
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import close_old_connections
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RESPONSE_CACHE_SETTINGS = {
+    "CACHE_ALIAS": "default",  # a shared cache (Redis, memcached, file) lets every worker serve one copy
+    "TTL": 10,                 # seconds a cached response is fresh
+    "STALE_TTL": 120,          # seconds it may still be served while one worker recomputes it
+    "LOCK_TIMEOUT": 30,        # seconds a recompute may hold the refresh lock
+}
+
+
+class CachedResponse:
+    __slots__ = ("body", "content_type", "etag", "version", "built_at")
+
+    def __init__(self, body, content_type, version):
+        self.body = body
+        self.content_type = content_type
+        self.etag = '"%s"' % hashlib.sha1(body).hexdigest()
+        self.version = version
+        self.built_at = time.time()
+
+
+class ResponseCache:
+    """
+    Rendered responses of public (user-independent) GET endpoints, keyed by
+    endpoint and query string, with stale-while-revalidate.
+
+    A fresh entry (younger than TTL and built at the endpoint's current
+    version) is served as is. A stale one - too old, or built before
+    bump_version() - is still served, up to STALE_TTL, while the single
+    worker that wins the refresh lock recomputes it in a background thread.
+    Missing or expired entries are computed in the request. Every response
+    carries a strong ETag, so revalidating clients get a 304.
+    """
+
+    def __init__(self, alias="default", ttl=10, stale_ttl=120, lock_timeout=30):
+        self._cache = caches[alias]
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.lock_timeout = lock_timeout
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.refreshes = 0
+        self.refresh_errors = 0
+
+    @staticmethod
+    def _version_key(name):
+        return f"response-version:{name}"
+
+    def version(self, name):
+        return self._cache.get(self._version_key(name), 0)
+
+    def bump_version(self, name):
+        """Marks every cached response of the endpoint stale (e.g. after an IQ update)."""
+        key = self._version_key(name)
+        try:
+            self._cache.incr(key)
+        except ValueError:
+            if not self._cache.add(key, 1, None):
+                self._cache.incr(key)
+
+    def _count(self, counter):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def _build(self, view, request, args, kwargs, version):
+        """Runs the view; returns a CachedResponse for a cacheable (200, JSON) response, else the response."""
+        response = view(request, *args, **kwargs)
+        if hasattr(response, 'render'):
+            response.render()
+        if response.status_code != 200 or not response.get('Content-Type', '').startswith('application/json'):
+            return response
+        return CachedResponse(response.content, response['Content-Type'], version)
+
+    def _refresh(self, key, lock_key, view, request, args, kwargs, version, rebuild):
+        try:
+            if rebuild is not None:
+                rebuild()
+            entry = self._build(view, request, args, kwargs, version)
+            if isinstance(entry, CachedResponse):
+                self._cache.set(key, entry, self.stale_ttl)
+            self._count('refreshes')
+        except Exception:
+            self._count('refresh_errors')
+            logger.exception("Background refresh of %s failed; the stale copy stays in place", key)
+        finally:
+            self._cache.delete(lock_key)
+            close_old_connections()
+
+    def serve(self, name, view, request, args, kwargs, rebuild=None):
+        key = f"response:{name}:{request.META.get('QUERY_STRING', '')}"
+        version = self.version(name)
+        entry = self._cache.get(key)
+
+        if entry is None:
+            self._count('misses')
+            entry = self._build(view, request, args, kwargs, version)
+            if not isinstance(entry, CachedResponse):
+                return entry
+            self._cache.set(key, entry, self.stale_ttl)
+            state = "MISS"
+        elif entry.version == version and time.time() - entry.built_at < self.ttl:
+            self._count('hits')
+            state = "HIT"
+        else:
+            self._count('stale_hits')
+            state = "STALE"
+            lock_key = f"{key}:refreshing"
+            if self._cache.add(lock_key, 1, self.lock_timeout):
+                threading.Thread(
+                    target=self._refresh,
+                    args=(key, lock_key, view, copy.copy(request), args, kwargs, version,
+                          rebuild if entry.version != version else None),
+                    name=f"response-refresh:{name}",
+                    daemon=True,
+                ).start()
+
+        if entry.etag in parse_etags(request.META.get('HTTP_IF_NONE_MATCH', '')):
+            self._count('not_modified')
+            response = HttpResponseNotModified()
+        else:
+            response = HttpResponse(entry.body, content_type=entry.content_type)
+        response['ETag'] = entry.etag
+        response['Cache-Control'] = f"public, max-age={self.ttl}, stale-while-revalidate={self.stale_ttl - self.ttl}"
+        response['X-Cache'] = state
+        patch_vary_headers(response, ['Accept'])
+        return response
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "not_modified": self.not_modified,
+            "refreshes": self.refreshes,
+            "refresh_errors": self.refresh_errors,
+        }
+
+
+def get_response_cache_settings():
+    return {**DEFAULT_RESPONSE_CACHE_SETTINGS, **getattr(settings, "RESPONSE_CACHE", {})}
+
+
+_response_cache = None
+_response_cache_lock = threading.Lock()
+
+
+def get_response_cache():
+    global _response_cache
+    if _response_cache is None:
+        with _response_cache_lock:
+            if _response_cache is None:
+                config = get_response_cache_settings()
+                _response_cache = ResponseCache(
+                    alias=config["CACHE_ALIAS"],
+                    ttl=config["TTL"],
+                    stale_ttl=config["STALE_TTL"],
+                    lock_timeout=config["LOCK_TIMEOUT"],
+                )
+    return _response_cache
+
+
+def cache_public_response(name, rebuild=None):
+    """
+    Serves a public GET view through the response cache (outermost decorator,
+    above @api_view). `rebuild` runs before a recompute triggered by
+    bump_version(name), e.g. to reload an in-memory snapshot first.
+    Browsable-API (HTML) requests bypass the cache.
+    """
+
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method != 'GET' or 'text/html' in request.META.get('HTTP_ACCEPT', ''):
+                return view(request, *args, **kwargs)
+            return get_response_cache().serve(name, view, request, args, kwargs, rebuild)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,54 @@
+# utils/scoring.py
+
+from collections import namedtuple
+
+from ..models import GameQuestionRecord
+
+STREAK_CAP = 5          # Max streak of 5
+CORRECT_IQ_DELTA = 5.0  # Example gain
+WRONG_IQ_DELTA = -3.0   # Example loss
+HINT_FACTOR = 0.5       # Penalty for using a hint
+
+ScoredAnswer = namedtuple("ScoredAnswer", ["status", "final_streak", "iq_delta"])
+
+
+def score_answer(correct_answer, user_answer, current_streak, hint_used=False):
+    """
+    Status (a GameQuestionRecord.Status), streak and IQ delta of one answer
+    (the submit_answer rules). Answers are compared as strings; "SKIPPED"
+    marks a skipped question.
+    """
+    Status = GameQuestionRecord.Status
+    user_answer = str(user_answer)
+    if user_answer == "SKIPPED":
+        status, final_streak = Status.SKIPPED, 0
+    elif str(correct_answer) == user_answer:
+        status, final_streak = Status.CORRECT, min(current_streak + 1, STREAK_CAP)
+    else:
+        status, final_streak = Status.INCORRECT, 0
+
+    # NOTE: placeholder scoring, kept identical to the original submit_answer
+    iq_delta = 0.0
+    if status == Status.CORRECT:
+        iq_delta = CORRECT_IQ_DELTA
+    elif status == Status.INCORRECT:
+        iq_delta = WRONG_IQ_DELTA
+    if hint_used:
+        iq_delta = iq_delta * HINT_FACTOR
+    return ScoredAnswer(status, final_streak, iq_delta)
+
+
+def score_session(answers):
+    """
+    Scores answers of one attempt in question order, carrying the streak from
+    one answer to the next. `answers` are (correct_answer, user_answer, hint_used)
+    tuples; returns a list of ScoredAnswer. The attempt IQ is the client's
+    (see UpdateGameModeIQView): the iq_delta values are per-answer feedback only.
+    """
+    scored = []
+    streak = 0
+    for correct_answer, user_answer, hint_used in answers:
+        result = score_answer(correct_answer, user_answer, streak, hint_used)
+        streak = result.final_streak
+        scored.append(result)
+    return scored
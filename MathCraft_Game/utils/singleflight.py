@@ -0,0 +1,308 @@
+# utils/singleflight.py
+
+import functools
+import hashlib
+import json
+import logging
+import os
+import stat
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import fcntl
+except ImportError:  # not on Windows: cross-process coalescing is unavailable
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SINGLEFLIGHT_SETTINGS = {
+    "ENABLED": True,
+    "CROSS_PROCESS": False,  # also coalesce across the workers of one host (file locks in LOCK_DIR)
+    "LOCK_DIR": None,        # default: <tempdir>/mathcraft-singleflight-<uid>; must be ours and mode 0700
+    "WAIT_TIMEOUT": 10,      # seconds a follower waits before computing on its own
+}
+
+
+class _Call:
+    __slots__ = ("done", "result", "failed")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.failed = False
+
+
+class FileLocks:
+    """
+    Same-host coalescing between worker processes. The worker that takes the
+    key's flock first computes and leaves its result, as JSON, next to the
+    lock; the others wait for the lock and read that result instead of
+    recomputing. Results are only ever parsed as JSON, so a file planted in
+    the directory cannot run code.
+
+    The directory must be owned by this process's user and closed to
+    everyone else (mode 0700, not a symlink); FileLocks refuses it otherwise.
+    Files are opened without following symlinks. Result files older than
+    RESULT_TTL and idle lock files are swept every RESULT_TTL seconds.
+    """
+
+    RESULT_TTL = 60  # seconds; far longer than any follower waits for a result
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        self._check_directory()
+        self._swept_at = time.monotonic()
+
+    def _check_directory(self):
+        st = os.lstat(self.directory)
+        if not stat.S_ISDIR(st.st_mode) or st.st_uid != os.geteuid() or st.st_mode & 0o077:
+            raise PermissionError(
+                f"{self.directory} must be a directory owned by uid {os.geteuid()} with mode 0700 "
+                f"(found uid {st.st_uid}, mode {stat.filemode(st.st_mode)})"
+            )
+
+    def _paths(self, key):
+        name = hashlib.sha1(key.encode()).hexdigest()
+        return os.path.join(self.directory, f"{name}.lock"), os.path.join(self.directory, f"{name}.result")
+
+    @staticmethod
+    def _open(path, flags):
+        return os.open(path, flags | os.O_CREAT | os.O_NOFOLLOW, 0o600)
+
+    def do(self, key, fn, timeout):
+        """Returns (result, shared). Results must be JSON-serializable to be shared."""
+        lock_path, result_path = self._paths(key)
+        fd = self._open(lock_path, os.O_RDWR)
+        try:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                waited_from = time.time()
+                if self._wait(fd, timeout):
+                    fcntl.flock(fd, fcntl.LOCK_UN)
+                    result = self._read(result_path, waited_from)
+                    if result is not None:
+                        return result, True
+                return fn(), False  # the leader failed or is too slow
+
+            try:
+                result = fn()
+                self._write(result_path, result)
+                return result, False
+            finally:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+        finally:
+            os.close(fd)
+            self._sweep()
+
+    @staticmethod
+    def _wait(fd, timeout):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return True
+            except BlockingIOError:
+                time.sleep(0.01)
+        return False
+
+    @staticmethod
+    def _read(path, not_before):
+        try:
+            fd = os.open(path, os.O_RDONLY | os.O_NOFOLLOW)
+            with os.fdopen(fd, 'rb') as f:
+                if os.fstat(f.fileno()).st_mtime < not_before:
+                    return None  # left by an earlier computation, not the one we waited for
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write(self, path, result):
+        try:
+            content = json.dumps(result, cls=JSONEncoder).encode()
+        except (TypeError, ValueError):
+            logger.warning("Singleflight result for %s is not JSON-serializable; followers compute their own", path)
+            return
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}"
+        with os.fdopen(self._open(temp_path, os.O_WRONLY | os.O_TRUNC), 'wb') as f:
+            f.write(content)
+        os.replace(temp_path, path)
+
+    def _sweep(self):
+        """Deletes expired results and lock files nobody holds (at most once per RESULT_TTL per process)."""
+        now = time.monotonic()
+        if now - self._swept_at < self.RESULT_TTL:
+            return
+        self._swept_at = now
+        expired = time.time() - self.RESULT_TTL
+        try:
+            entries = list(os.scandir(self.directory))
+        except OSError:
+            return
+        for entry in entries:
+            try:
+                if entry.stat(follow_symlinks=False).st_mtime >= expired:
+                    continue
+                if entry.name.endswith('.lock'):
+                    self._unlink_idle_lock(entry.path)
+                else:
+                    os.unlink(entry.path)
+            except OSError:
+                pass
+
+    @staticmethod
+    def _unlink_idle_lock(path):
+        # A worker that opened the file just before the unlink may still lock
+        # the old inode and compute alongside the next leader: a duplicate
+        # computation, never a wrong result
+        fd = os.open(path, os.O_RDWR | os.O_NOFOLLOW)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            os.unlink(path)
+        except BlockingIOError:
+            pass
+        finally:
+            os.close(fd)
+
+
+class SingleFlight:
+    """
+    Coalesces identical concurrent computations: while one call for a key is
+    in flight, other callers with the same key wait for it and get its result
+    instead of running their own. Nothing is cached once the call returns. If
+    the leading call raises, its waiters compute for themselves.
+    """
+
+    def __init__(self, wait_timeout=10, file_locks=None):
+        self.wait_timeout = wait_timeout
+        self.file_locks = file_locks
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.computations = 0
+        self.shared = 0
+        self.shared_cross_process = 0
+        self.timeouts = 0
+
+    def _count(self, counter):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def do(self, key, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            if call.done.wait(self.wait_timeout) and not call.failed:
+                self._count('shared')
+                return call.result
+            if not call.done.is_set():
+                self._count('timeouts')
+            self._count('computations')
+            return fn()
+
+        try:
+            call.result = self._lead(key, fn)
+            return call.result
+        except BaseException:
+            call.failed = True
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def _lead(self, key, fn):
+        if self.file_locks is None:
+            self._count('computations')
+            return fn()
+        result, shared = self.file_locks.do(key, fn, self.wait_timeout)
+        self._count('shared_cross_process' if shared else 'computations')
+        return result
+
+    def stats(self):
+        return {
+            "in_flight": len(self._calls),
+            "computations": self.computations,
+            "shared": self.shared,
+            "shared_cross_process": self.shared_cross_process,
+            "timeouts": self.timeouts,
+            "cross_process": self.file_locks is not None,
+        }
+
+
+def get_singleflight_settings():
+    return {**DEFAULT_SINGLEFLIGHT_SETTINGS, **getattr(settings, "SINGLEFLIGHT", {})}
+
+
+_flight = None
+_flight_lock = threading.Lock()
+
+
+def get_singleflight():
+    """The process-wide coalescer, or None when SINGLEFLIGHT["ENABLED"] is off."""
+    global _flight
+    config = get_singleflight_settings()
+    if not config["ENABLED"]:
+        return None
+    if _flight is None:
+        with _flight_lock:
+            if _flight is None:
+                file_locks = None
+                if config["CROSS_PROCESS"]:
+                    if fcntl is None:
+                        logger.warning("SINGLEFLIGHT['CROSS_PROCESS'] needs fcntl; coalescing within each worker only")
+                    else:
+                        directory = config["LOCK_DIR"] or os.path.join(
+                            tempfile.gettempdir(), f"mathcraft-singleflight-{os.geteuid()}"
+                        )
+                        try:
+                            file_locks = FileLocks(directory)
+                        except OSError as exc:
+                            logger.warning("SINGLEFLIGHT lock directory refused (%s); coalescing within each worker only", exc)
+                _flight = SingleFlight(wait_timeout=config["WAIT_TIMEOUT"], file_locks=file_locks)
+    return _flight
+
+
+def singleflight(name, per_user=True):
+    """
+    Coalesces concurrent identical GETs of a DRF view, keyed on (name, user,
+    path and query). Place it directly above the view function; waiters get
+    a new Response with the leader's status and data.
+
+    Only for views whose GET has no side effects: the waiters' own calls
+    never run, so anything the view writes happens once for all of them.
+
+    Under @versioned_etag the key includes the request's ETag, i.e. the data
+    version it was checked against: a request that arrives after a write
+    never gets a result computed before it under the newer ETag.
+    """
+
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(request, *args, **kwargs):
+            flight = get_singleflight()
+            if flight is None or request.method != 'GET':
+                return view(request, *args, **kwargs)
+
+            def compute():
+                response = view(request, *args, **kwargs)
+                return response.status_code, response.data
+
+            user = request.user.id if per_user else '-'
+            version = getattr(request, 'data_etag', '-')
+            status_code, data = flight.do(f"{name}:{user}:{version}:{request.get_full_path()}", compute)
+            return Response(data, status=status_code)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,251 @@
+# utils/stats.py
+
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum, Value
+from django.db.models.functions import Coalesce, Greatest, Least
+from django.utils import timezone
+
+from ..models import DailyUserModeStats, GameMode, GameQuestionRecord, UserStats
+from .data_versions import bump_data_version, bump_data_versions
+from .records import update_counter_row
+from .request_cache import request_cached
+
+MODES = GameMode.Mode.labels  # the mode names the API speaks: 'easy', 'intermediate', 'hard'
+QUALIFYING_CORRECT = 5  # correct answers an attempt needs to count towards levels
+
+
+def _update_stats(user_id, mode, **updates):
+    """UserStats row of the user's mode (created on the first game of that mode)."""
+    update_counter_row(UserStats, {'user_id': user_id, 'mode': mode}, updates)
+
+
+def rollup_day(game_mode):
+    """Local (TIME_ZONE) date the attempt belongs to in DailyUserModeStats."""
+    return timezone.localdate(game_mode.created_at)
+
+
+def _update_daily(game_mode, **updates):
+    update_counter_row(
+        DailyUserModeStats,
+        {'user_id': game_mode.user_id, 'day': rollup_day(game_mode), 'mode': game_mode.mode},
+        updates,
+    )
+
+
+# ----------------------------------------------------------------------
+# Write side
+# ----------------------------------------------------------------------
+def record_game_started(game_mode):
+    """Called from CreateGameModeView once the attempt row exists."""
+    _update_stats(game_mode.user_id, game_mode.mode, games_played=F('games_played') + 1)
+    _update_daily(game_mode, games=F('games') + 1)
+    bump_data_version(game_mode.user_id)
+
+
+SUMMARY_FIELDS = ['total_streak', 'total_time', 'correct_count', 'question_count']
+
+
+def sync_game_summaries(game_mode_ids):
+    """
+    Recomputes the GameMode summary columns of the given attempts from their
+    question records and applies the resulting deltas to UserStats and
+    DailyUserModeStats.
+
+    Called after question records are written (submit_answer, CreateGameRecordsView).
+    Recomputing instead of incrementing keeps the columns right when a question
+    is re-submitted or overwritten by an upsert. Must run inside a transaction.
+    """
+    game_mode_ids = set(game_mode_ids)
+    if not game_mode_ids:
+        return
+
+    games = list(
+        GameMode.objects.select_for_update()
+        .filter(pk__in=game_mode_ids)
+        .only('id', 'user_id', 'mode', 'created_at', *SUMMARY_FIELDS)
+    )
+    fresh = {
+        row.pop('game_mode_id'): row
+        for row in GameQuestionRecord.objects.filter(game_mode_id__in=game_mode_ids)
+        .values('game_mode_id')
+        .annotate(
+            total_streak=Coalesce(Sum('streak'), 0),
+            total_time=Coalesce(Sum('time'), 0),
+            correct_count=Count('id', filter=Q(status=GameQuestionRecord.Status.CORRECT)),
+            question_count=Count('id', filter=~Q(status=GameQuestionRecord.Status.UNANSWERED)),
+        )
+        .order_by()
+    }
+
+    changed = []
+    deltas = {}
+    daily = {}
+    for game in games:
+        new = fresh.get(game.id, dict.fromkeys(SUMMARY_FIELDS, 0))
+        old = {field: getattr(game, field) for field in SUMMARY_FIELDS}
+        if new == old:
+            continue
+
+        key = (game.user_id, game.mode)
+        delta = deltas.setdefault(key, {'questions': 0, 'correct': 0, 'qualifying': 0, 'best_streak': 0})
+        delta['questions'] += new['question_count'] - old['question_count']
+        delta['correct'] += new['correct_count'] - old['correct_count']
+        delta['qualifying'] += (
+            int(new['correct_count'] >= QUALIFYING_CORRECT) - int(old['correct_count'] >= QUALIFYING_CORRECT)
+        )
+        delta['best_streak'] = max(delta['best_streak'], new['total_streak'])
+
+        day = daily.setdefault((game.user_id, rollup_day(game), game.mode), [game, 0, 0, 0])
+        day[1] += new['correct_count'] - old['correct_count']
+        day[2] += new['total_time'] - old['total_time']
+        day[3] += new['total_streak'] - old['total_streak']
+
+        for field, value in new.items():
+            setattr(game, field, value)
+        changed.append(game)
+
+    if changed:
+        GameMode.objects.bulk_update(changed, SUMMARY_FIELDS)
+    for (user_id, mode), delta in deltas.items():
+        _update_stats(
+            user_id, mode,
+            questions_answered=F('questions_answered') + delta['questions'],
+            correct_answers=F('correct_answers') + delta['correct'],
+            qualifying_games=F('qualifying_games') + delta['qualifying'],
+            best_streak=Greatest(F('best_streak'), Value(delta['best_streak'])),
+        )
+    for game, correct, time, streak in daily.values():
+        _update_daily(game, correct=F('correct') + correct, time=F('time') + time, streak=F('streak') + streak)
+    bump_data_versions(game.user_id for game in changed)
+
+
+def record_game_finished(game_mode, previous_iq):
+    """
+    Called from UpdateGameModeIQView after the attempt's IQ was saved.
+    Adjusts the IQ totals by the change and, on the first finish, records
+    the attempt's total time for the fastest-time metric.
+    """
+    new_iq = game_mode.iq
+    updates = {
+        'iq_sum': F('iq_sum') + (new_iq or 0) - (previous_iq or 0),
+        'iq_count': F('iq_count') + (int(new_iq is not None) - int(previous_iq is not None)),
+    }
+    if new_iq is not None:
+        updates['best_iq'] = Greatest(Coalesce(F('best_iq'), Value(new_iq)), Value(new_iq))
+
+    if previous_iq is None and game_mode.question_count:
+        total_time = game_mode.total_time
+        updates['fastest_time'] = Least(Coalesce(F('fastest_time'), Value(total_time)), Value(total_time))
+
+    _update_stats(game_mode.user_id, game_mode.mode, **updates)
+    _update_daily(
+        game_mode,
+        iq_sum=F('iq_sum') + (new_iq or 0) - (previous_iq or 0),
+        iq_count=F('iq_count') + (int(new_iq is not None) - int(previous_iq is not None)),
+    )
+    bump_data_version(game_mode.user_id)
+
+
+# ----------------------------------------------------------------------
+# Read side
+# ----------------------------------------------------------------------
+@request_cached
+def get_user_stats(user):
+    """
+    Returns {mode name: UserStats} for the user's modes (one query, at most a few rows).
+    The three standard modes are always present, zero-filled if never played.
+    """
+    rows = {row.get_mode_display(): row for row in UserStats.objects.filter(user=user)}
+    for mode in GameMode.Mode:
+        rows.setdefault(mode.label, UserStats(user=user, mode=mode))
+    return rows
+
+
+def total_of(rows, field):
+    return sum(getattr(row, field) or 0 for row in rows.values())
+
+
+def accuracy_percent(correct, total):
+    return (correct / total * 100) if total else 0
+
+
+# ----------------------------------------------------------------------
+# Rebuild from history
+# ----------------------------------------------------------------------
+def rebuild_user_stats(user_ids):
+    """
+    Recomputes UserStats for the given users from GameMode / GameQuestionRecord
+    and replaces their rows atomically. Work is proportional to their history.
+    """
+    attempts = (
+        GameMode.objects.filter(user_id__in=user_ids)
+        .annotate(
+            streak_total=Coalesce(Sum('questions__streak'), 0),
+            time_total=Coalesce(Sum('questions__time'), 0),
+            answered=Count('questions', filter=~Q(questions__status=GameQuestionRecord.Status.UNANSWERED)),
+            correct=Count('questions', filter=Q(questions__status=GameQuestionRecord.Status.CORRECT)),
+        )
+        .values('user_id', 'mode', 'iq', 'streak_total', 'time_total', 'answered', 'correct')
+    )
+
+    totals = {}
+    for a in attempts:
+        key = (a['user_id'], a['mode'])
+        if key not in totals:
+            totals[key] = {
+                'user_id': key[0], 'mode': key[1], 'games_played': 0, 'questions_answered': 0,
+                'correct_answers': 0, 'iq_sum': 0.0, 'iq_count': 0, 'best_iq': None,
+                'best_streak': 0, 'fastest_time': None, 'qualifying_games': 0,
+            }
+        row = totals[key]
+
+        row['games_played'] += 1
+        row['questions_answered'] += a['answered']
+        row['correct_answers'] += a['correct']
+        row['best_streak'] = max(row['best_streak'], a['streak_total'])
+        if a['correct'] >= QUALIFYING_CORRECT:
+            row['qualifying_games'] += 1
+        if a['iq'] is not None:
+            row['iq_sum'] += a['iq']
+            row['iq_count'] += 1
+            row['best_iq'] = a['iq'] if row['best_iq'] is None else max(row['best_iq'], a['iq'])
+            if a['answered']:
+                row['fastest_time'] = a['time_total'] if row['fastest_time'] is None else min(row['fastest_time'], a['time_total'])
+
+    with transaction.atomic():
+        UserStats.objects.filter(user_id__in=user_ids).delete()
+        UserStats.objects.bulk_create([UserStats(**row) for row in totals.values()])
+    return len(totals)
+
+
+def rebuild_daily_stats(user_ids):
+    """
+    Recomputes DailyUserModeStats for the given users from their attempts'
+    summary columns and replaces their rows atomically. Days are bucketed in
+    Python with timezone.localdate(), so they match the incremental writes on
+    every database backend.
+    """
+    attempts = (
+        GameMode.objects.filter(user_id__in=user_ids)
+        .values_list('user_id', 'mode', 'created_at', 'iq', 'correct_count', 'total_time', 'total_streak')
+        .iterator(chunk_size=5000)
+    )
+
+    totals = {}
+    for user_id, mode, created_at, iq, correct, time, streak in attempts:
+        key = (user_id, timezone.localdate(created_at), mode)
+        row = totals.get(key)
+        if row is None:
+            row = totals[key] = DailyUserModeStats(user_id=user_id, day=key[1], mode=mode)
+        row.games += 1
+        row.correct += correct
+        row.time += time
+        row.streak += streak
+        if iq is not None:
+            row.iq_sum += iq
+            row.iq_count += 1
+
+    with transaction.atomic():
+        DailyUserModeStats.objects.filter(user_id__in=user_ids).delete()
+        DailyUserModeStats.objects.bulk_create(totals.values(), batch_size=1000)
+    return len(totals)
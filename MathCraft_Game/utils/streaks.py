@@ -0,0 +1,78 @@
+# utils/streaks.py
+
+from datetime import timedelta
+
+from django.db.models import Case, F, Q, Value, When
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from ..models import UserProfile
+from .achievements import LOGIN, record_event
+from .activity_calendar import mark_active
+from .data_versions import new_version, publish_versions
+
+
+def record_activity(user_id, day=None):
+    """
+    Marks `day` (default: today, local time) as active for the user.
+
+    The streak counters on UserProfile are advanced by one conditional UPDATE
+    that only matches the first activity of the day, so repeat calls cost a
+    single no-op statement. On that first call the day is also set in the
+    user's ActivityCalendar and the LOGIN achievement event fires.
+    Returns True if this was the user's first activity of the day.
+    """
+    day = day or timezone.localdate()
+    version = new_version()
+    continued = Case(
+        When(last_active_date=day - timedelta(days=1), then=F('current_streak') + 1),
+        default=Value(1),
+    )
+    # longest_streak is listed before current_streak and last_active_date last:
+    # MySQL evaluates SET assignments left to right against the updated values.
+    first_today = UserProfile.objects.filter(
+        Q(last_active_date__isnull=True) | Q(last_active_date__lt=day),
+        user_id=user_id,
+    ).update(
+        longest_streak=Greatest(F('longest_streak'), continued),
+        current_streak=continued,
+        last_active_date=day,
+        data_version=version,
+    )
+    if not first_today:
+        return False
+
+    publish_versions([user_id], version)
+
+    mark_active(user_id, day)
+    record_event(user_id, LOGIN)
+    return True
+
+
+def get_streak(user_id, today=None):
+    """
+    Returns {"current", "longest", "last_active_date"} from the user's profile row.
+    A streak whose last active day is before yesterday is broken and reads as 0.
+    """
+    row = (
+        UserProfile.objects.filter(user_id=user_id)
+        .values('current_streak', 'longest_streak', 'last_active_date')
+        .first()
+    ) or {'current_streak': 0, 'longest_streak': 0, 'last_active_date': None}
+    return _streak(row['current_streak'], row['longest_streak'], row['last_active_date'], today)
+
+
+def streak_of(profile, today=None):
+    """get_streak() for an already loaded UserProfile (e.g. request.user.profile), without a query."""
+    return _streak(profile.current_streak, profile.longest_streak, profile.last_active_date, today)
+
+
+def _streak(current, longest, last_active, today):
+    today = today or timezone.localdate()
+    alive = last_active is not None and (today - last_active).days <= 1
+    return {
+        "current": current if alive else 0,
+        "longest": longest,
+        "last_active_date": last_active,
+    }
+
@@ -1,12 +1,64 @@
-from django.shortcuts import render
-
-# Create your views here.
 # views.py
-from rest_framework.views import APIView
-from rest_framework.response import Response
-from rest_framework import status, permissions
+from datetime import timedelta
+
+import requests
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.contrib.auth.tokens import default_token_generator
+from django.core.exceptions import ObjectDoesNotExist
+from django.core.mail import send_mail
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncMonth
+from django.http import FileResponse, Http404
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_decode, urlsafe_base64_encode
+from django.utils.timezone import localtime
+from rest_framework import generics, permissions, serializers, status
 from rest_framework.authtoken.models import Token
-from .serializers import RegisterSerializer, LoginSerializer,UserProfileSerializer
+from rest_framework.decorators import api_view, authentication_classes, parser_classes, permission_classes
+from rest_framework.exceptions import ValidationError
+from rest_framework.parsers import FormParser, MultiPartParser
+from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .authentication import get_token_cache, invalidate_token, invalidate_user
+from .models import DailyUserModeStats, GameMode, GameQuestionRecord, UserProfile
+from .serializers import (
+    BatchSerializer, GameModeSerializer, GameQuestionRecordSerializer, LoginSerializer, RegisterSerializer,
+    SessionSyncSerializer, UserProfileSerializer,
+)
+from .utils import activity_calendar, dashboard, mode_metrics
+from .utils.achievements import (
+    ANSWER_SUBMITTED, GAME_FINISHED, GAME_STARTED, get_achievements, record_event, take_unseen_rewards,
+)
+from .utils.attempts import allocate_attempt
+from .utils.batch import run_batch
+from .utils.coins import earn_coins, get_balance, get_monthly_rollup, spend_coins
+from .utils.data_versions import bump_data_version, versioned_etag
+from .utils.game_sessions import get_game_sessions
+from .utils.hints import generate_hint
+from .utils.http_client import CircuitOpenError, get_banana_client
+from .utils.ingest import ForeignGameMode, InvalidUpload, ingest_question_records, iter_upload
+from .utils.leaderboard import get_leaderboard, get_leaderboard_settings
+from .utils.puzzle_engine import get_local_provider
+from .utils.puzzle_pool import get_puzzle_pool, next_puzzle
+from .utils.question_tokens import (
+    InvalidQuestionToken, get_token_settings, issue_question_token, read_question_token,
+)
+from .utils.records import upsert_question_records
+from .utils.response_cache import cache_public_response, get_response_cache
+from .utils.scoring import score_answer, score_session
+from .utils.singleflight import get_singleflight, singleflight
+from .utils.stats import (
+    MODES, accuracy_percent, get_user_stats, record_game_finished, record_game_started, sync_game_summaries,
+    total_of,
+)
+from .utils.streaks import get_streak, record_activity
+
 
 # Registration API
 class RegisterAPIView(APIView):
@@ -24,9 +76,6 @@ class RegisterAPIView(APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
-from django.utils.timezone import now
-from .models import LoginHistory  # make sure this import is correct
-
 class LoginAPIView(APIView):
     permission_classes = [permissions.AllowAny]
 
@@ -39,66 +88,75 @@ class LoginAPIView(APIView):
             token, created = Token.objects.get_or_create(user=user)
 
             # ✅ Record today's login for daily streak
-            LoginHistory.objects.get_or_create(user=user, login_date=now().date())
+            record_activity(user.id)
 
             return Response({
                 "token": token.key,
-                "message": "Login successful"
+                "message": "Login successful",
+                "rewarded_badges": take_unseen_rewards(user.id),
             }, status=status.HTTP_200_OK)
 
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
-
-from rest_framework import generics, permissions
-from django.utils import timezone
-from .models import GameMode
-from .serializers import GameModeSerializer
-
 class CreateGameModeView(generics.CreateAPIView):
     serializer_class = GameModeSerializer
     permission_classes = [permissions.IsAuthenticated]
 
+    def create(self, request, *args, **kwargs):
+        response = super().create(request, *args, **kwargs)
+        response.data["rewarded_badges"] = take_unseen_rewards(request.user.id)
+        return response
+
     def perform_create(self, serializer):
-        today = timezone.now().date()
+        today = timezone.localdate()  # same local date auto_now_add stores
         user = self.request.user
 
-        # Count existing attempts for today for this user using 'date' field
-        attempts_today = GameMode.objects.filter(
-            user=user,
-            date=today
-        ).count()
-
-        serializer.save(
-            user=user,
-            attempt=attempts_today + 1,
-            date=today  # explicitly set the date field
-        )
+        with transaction.atomic():
+            # Next attempt number for today from the per-day counter row
+            game_mode = serializer.save(
+                user=user,
+                attempt=allocate_attempt(user.id, today),
+                date=today  # explicitly set the date field
+            )
+            record_game_started(game_mode)
+            record_event(user.id, GAME_STARTED)
+        record_activity(user.id)
 
-from rest_framework.response import Response
-from rest_framework import status
-from .models import GameQuestionRecord
-from .serializers import GameQuestionRecordSerializer
 
 class CreateGameRecordsView(generics.GenericAPIView):
+    """
+    Bulk upload of question records for the user's own games.
+    Body: a JSON array of records, or NDJSON (one record per line) with
+    Content-Type application/x-ndjson. The body is parsed as a stream and
+    records are upserted on (game_mode, question_number) in batches.
+    """
     serializer_class = GameQuestionRecordSerializer
     permission_classes = [permissions.IsAuthenticated]
 
     def post(self, request, *args, **kwargs):
-        records = request.data  # Expecting a list of records
-        if not isinstance(records, list):
-            return Response({"error": "Expected a list of records"}, status=status.HTTP_400_BAD_REQUEST)
-
-        # Optional: ensure user can only post records for their own game_mode
-        for r in records:
-            if 'game_mode' not in r:
-                return Response({"error": "game_mode is required for each record"}, status=status.HTTP_400_BAD_REQUEST)
-
-        serializer = self.get_serializer(data=records, many=True)
-        serializer.is_valid(raise_exception=True)
-        serializer.save()  # will assign all records properly
-
-        return Response({"status": "success", "saved": len(records)}, status=status.HTTP_201_CREATED)
+        content_type = request.content_type.split(';')[0].strip().lower()
+        try:
+            # Read the raw stream instead of request.data, which would parse the whole body at once
+            records = iter_upload(request.stream, content_type)
+            sessions = get_game_sessions()
+            with transaction.atomic():
+                # Active sessions are written and dropped first, so no later flush overwrites the upload
+                saved, game_mode_ids = ingest_question_records(
+                    request.user, records,
+                    before_write=(lambda ids: sessions.finish(*ids)) if sessions is not None else None,
+                )
+                sync_game_summaries(game_mode_ids)
+                record_event(request.user.id, ANSWER_SUBMITTED, game_mode_ids=list(game_mode_ids))
+        except InvalidUpload as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        except ForeignGameMode as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_403_FORBIDDEN)
+
+        return Response(
+            {"status": "success", "saved": saved, "rewarded_badges": take_unseen_rewards(request.user.id)},
+            status=status.HTTP_201_CREATED,
+        )
     
     
     
@@ -117,30 +175,44 @@ class UpdateGameModeIQView(generics.UpdateAPIView):
         iq = request.data.get("iq")
         if iq is None:
             return Response({"detail": "IQ value is required."}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            iq = float(iq)
+        except (TypeError, ValueError):
+            return Response({"detail": "IQ value must be a number."}, status=status.HTTP_400_BAD_REQUEST)
 
-        game_mode.iq = iq
-        game_mode.save()
+        # Game over: write the active session's answers first so the summaries are complete
+        sessions = get_game_sessions()
+        if sessions is not None and sessions.finish(game_mode.id):
+            game_mode.refresh_from_db()
+
+        previous_iq = game_mode.iq
+        with transaction.atomic():
+            game_mode.iq = iq
+            game_mode.save()
+            record_game_finished(game_mode, previous_iq)
+            record_event(request.user.id, GAME_FINISHED)
+        get_leaderboard().mark_dirty()
+        get_response_cache().bump_version('leaderboard')
         serializer = self.get_serializer(game_mode)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return Response(
+            {**serializer.data, "rewarded_badges": take_unseen_rewards(request.user.id)}, status=status.HTTP_200_OK
+        )
     
 
 
-from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import IsAuthenticated
-
-
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@versioned_etag
 def user_mode_counts(request):
     """
     Returns total counts of each mode (Easy, Intermediate, Hard)
     for the currently logged-in user.
     """
-    user = request.user
+    stats = get_user_stats(request.user)
 
-    easy_count = GameMode.objects.filter(user=user, mode__iexact='easy').count()
-    intermediate_count = GameMode.objects.filter(user=user, mode__iexact='intermediate').count()
-    hard_count = GameMode.objects.filter(user=user, mode__iexact='hard').count()
+    easy_count = stats['easy'].games_played
+    intermediate_count = stats['intermediate'].games_played
+    hard_count = stats['hard'].games_played
 
     total = easy_count + intermediate_count + hard_count
 
@@ -154,9 +226,9 @@ def user_mode_counts(request):
     return Response(data)
 
 
-
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@versioned_etag
 def recent_activity(request):
     """
     Returns the recent game attempts (GameMode) for the logged-in user.
@@ -169,82 +241,57 @@ def recent_activity(request):
 
     data = []
     for game in recent_games:
-        # Aggregate total streak or maximum streak for this attempt
-        total_streak = game.questions.aggregate(total=Sum('streak'))['total'] or 0
-
         data.append({
             "datetime": localtime(game.created_at).strftime("%Y-%m-%d %H:%M"),
-            "mode": game.mode.capitalize(),  # normalize mode
-            "total_streak": total_streak,   # sum of all question streaks
+            "mode": game.get_mode_display().capitalize(),
+            "total_streak": game.total_streak,   # sum of all question streaks (summary column)
             "iq": game.iq or 0,
         })
 
     return Response(data, status=status.HTTP_200_OK)
 
 
-from django.utils.timezone import localtime, now
-from datetime import timedelta
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def daily_streak(request):
     user = request.user
-    today = localtime(now()).date()
-
-    # ✅ Record today's login if not already saved
-    LoginHistory.objects.get_or_create(user=user, login_date=today)
-
-    # ✅ Get all login dates (latest first)
-    login_dates = list(
-        LoginHistory.objects.filter(user=user)
-        .order_by('-login_date')
-        .values_list('login_date', flat=True)
-    )
 
-    if not login_dates:
-        return Response({"daily_streak": 1})  # shouldn't happen since we just added one
+    # ✅ Record today's activity (no-op after the first call of the day)
+    record_activity(user.id)
 
-    # ✅ Initialize streak
-    streak = 1
-
-    # ✅ Loop through consecutive dates
-    for i in range(1, len(login_dates)):
-        prev = login_dates[i - 1]
-        curr = login_dates[i]
-
-        if (prev - curr).days == 1:
-            streak += 1
-        else:
-            break  # stop counting if there's a gap
-
-    return Response({"daily_streak": streak})
+    streak = get_streak(user.id)
+    return Response({
+        "daily_streak": streak["current"],
+        "longest_streak": streak["longest"],
+        "rewarded_badges": take_unseen_rewards(user.id),
+    })
 
 
 # --- Total Puzzles Attempted API ---
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@versioned_etag
 def total_puzzles(request):
-    user = request.user
     # Total GameMode instances = total puzzles attempted by user
-    total_attempts = GameMode.objects.filter(user=user).count()
+    total_attempts = total_of(get_user_stats(request.user), 'games_played')
     return Response({"total_puzzles_attempted": total_attempts})
 
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@versioned_etag
 def overall_accuracy(request):
-    user = request.user
-
-    # All question records for this user's puzzles
-    records = GameQuestionRecord.objects.filter(game_mode__user=user)
-    total_questions = records.count()  # total questions attempted
-    correct_questions = records.filter(status='correct').count()  # total correct answers
+    stats = get_user_stats(request.user)
+    total_questions = total_of(stats, 'questions_answered')  # total questions answered
+    correct_questions = total_of(stats, 'correct_answers')  # total correct answers
 
-    accuracy = (correct_questions / total_questions * 100) if total_questions else 0
+    accuracy = accuracy_percent(correct_questions, total_questions)
     return Response({"overall_accuracy": round(accuracy, 2)})
 
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@versioned_etag
 def iq_evolution(request):
     """
     Returns the last 10 IQ scores for the logged-in user.
@@ -260,10 +307,9 @@ def iq_evolution(request):
     return Response(data)
 
 
-
-
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@versioned_etag
 def last_ten_games_chart(request):
     user = request.user
 
@@ -278,10 +324,8 @@ def last_ten_games_chart(request):
     modes = []
 
     for game in last_games:
-        questions = game.questions.all()
-        total_streak = sum(q.streak for q in questions)
-        total_streaks.append(total_streak)
-        modes.append(game.mode.capitalize())
+        total_streaks.append(game.total_streak)
+        modes.append(game.get_mode_display().capitalize())
 
     return Response({
         "labels": labels,
@@ -290,26 +334,30 @@ def last_ten_games_chart(request):
     })
     
     
-from django.db.models import Avg
-from django.db.models.functions import TruncMonth
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@versioned_etag
 def monthly_iq_chart(request):
     """
-    Returns average IQ per month for the last 6 months for the user.
+    Returns average IQ per month for the last 6 months for the user
+    (from the daily rollup: at most ~186 days x modes rows).
     """
     user = request.user
+    first_month = timezone.localdate().replace(day=1)
+    for _ in range(5):
+        first_month = (first_month - timedelta(days=1)).replace(day=1)
+
     qs = (
-        GameMode.objects.filter(user=user)
-        .annotate(month=TruncMonth('date'))
+        DailyUserModeStats.objects.filter(user=user, day__gte=first_month, iq_count__gt=0)
+        .annotate(month=TruncMonth('day'))
         .values('month')
-        .annotate(avg_iq=Avg('iq'))
+        .annotate(iq_sum=Sum('iq_sum'), iq_count=Sum('iq_count'))
         .order_by('month')
     )
 
     labels = [q['month'].strftime("%b") for q in qs]
-    avg_iq = [round(q['avg_iq'], 2) for q in qs]
+    avg_iq = [round(q['iq_sum'] / q['iq_count'], 2) for q in qs]
 
     return Response({"labels": labels, "avg_iq": avg_iq})
 
@@ -318,208 +366,67 @@ def monthly_iq_chart(request):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@versioned_etag
 def mode_distribution_chart(request):
     """
     Returns count of games played per mode for the logged-in user.
     """
     user = request.user
-    easy = GameMode.objects.filter(user=user, mode__iexact='easy').count()
-    intermediate = GameMode.objects.filter(user=user, mode__iexact='intermediate').count()
-    hard = GameMode.objects.filter(user=user, mode__iexact='hard').count()
+    counts = dict(
+        GameMode.objects.filter(user=user)
+        .values_list('mode')
+        .annotate(count=Count('id'))
+        .order_by()
+    )
 
     return Response({
         "labels": ["Easy", "Intermediate", "Hard"],
-        "counts": [easy, intermediate, hard]
+        "counts": [counts.get(mode, 0) for mode in GameMode.Mode]
     })
 
 
-from django.db.models import Max, Sum
-from django.utils.timezone import now
-from .models import LoginHistory,AchievementReward
-
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@versioned_etag
 def user_achievements(request):
+    """
+    Returns the progress of every badge.
+    Unlocks and coin rewards are stored by the write paths (utils/achievements.py);
+    the progress numbers are read live in one query (utils/mode_metrics.py).
+    A plain read: rewarded_badges lists rewards no write response has
+    reported yet (they are reported, and marked seen, with the next one).
+    """
     user = request.user
-    profile = user.profile  # Use the related_name from UserProfile
-
-    # ------------------------
-    # 1. Code Crusader: total correct answers
-    # ------------------------
-    total_correct = GameQuestionRecord.objects.filter(
-        game_mode__user=user, status='correct'
-    ).count()
-
-    # ------------------------
-    # 2. Master Calibrator: Best IQ
-    # ------------------------
-    best_iq = GameMode.objects.filter(user=user).aggregate(max_iq=Max('iq'))['max_iq'] or 0
-
-    # ------------------------
-    # 3. Daily Devotion: Login-based streak
-    # ------------------------
-    today = localtime(now()).date()
-    login_dates_qs = LoginHistory.objects.filter(user=user).order_by('-login_date').values_list('login_date', flat=True)
-    login_dates = list(login_dates_qs)
-
-    streak = 0
-    if login_dates:
-        prev_date = None
-        for d in login_dates:
-            if prev_date is None:
-                streak = 1 if d == today else 0
-                prev_date = d
-            else:
-                if (prev_date - d).days == 1:
-                    streak += 1
-                    prev_date = d
-                else:
-                    break
-        if today not in login_dates:
-            streak += 1
-    else:
-        streak = 1
-
-    # ------------------------
-    # 4. Lightning / Speed Badge: Best hard mode streak
-    # ------------------------
-    hard_mode_games = GameMode.objects.filter(user=user, mode__iexact='hard')
-    hard_best_streak = 0
-    lightning_unlocked = False
-
-    for g in hard_mode_games:
-        total_streak = g.questions.aggregate(total=Sum('streak'))['total'] or 0
-        if total_streak > hard_best_streak:
-            hard_best_streak = total_streak
-        if total_streak == 50:
-            lightning_unlocked = True
-
-    # ------------------------
-    # 5. Apex Challenger: Hard games with 5+ correct answers
-    # ------------------------
-    apex_count = 0
-    for g in hard_mode_games:
-        correct_count = g.questions.filter(status='correct').count()
-        if correct_count >= 5:
-            apex_count += 1
-
-    # ------------------------
-    # 6. True Polymath: Games per mode
-    # ------------------------
-    easy_count = GameMode.objects.filter(user=user, mode__iexact='easy').count()
-    intermediate_count = GameMode.objects.filter(user=user, mode__iexact='intermediate').count()
-    hard_count = hard_mode_games.count()
-
-    # ------------------------
-    # 7. Total games
-    # ------------------------
-    total_games = easy_count + intermediate_count + hard_count
-
-    # ------------------------
-    # 8. Coin reward for unlocked badges
-    # ------------------------
-    achievements = {
-        "code_crusader": total_correct >= 100,
-        "master_calibrator": best_iq >= 100,
-        "daily_devotion": streak >= 30,
-        "lightning_solver": lightning_unlocked,
-        "apex_challenger": apex_count >= 50,
-        "true_polymath": easy_count >= 5 and intermediate_count >= 5 and hard_count >= 5,
-    }
-
-    rewarded_badges = []
-
-    for badge_name, unlocked in achievements.items():
-        if unlocked:
-            # Only reward if not already rewarded
-            if not AchievementReward.objects.filter(user=user, badge_name=badge_name, rewarded=True).exists():
-                profile.add_coins(5000)  # Add 5000 coins
-                AchievementReward.objects.create(user=user, badge_name=badge_name, rewarded=True)
-                rewarded_badges.append(badge_name)
-
-    # ------------------------
-    # Response
-    # ------------------------
-    return Response({
-        "code_crusader": {
-            "current": total_correct,
-            "target": 100,
-            "status": "UNLOCKED" if achievements["code_crusader"] else "LOCKED"
-        },
-        "master_calibrator": {
-            "best_iq": best_iq,
-            "status": "UNLOCKED" if achievements["master_calibrator"] else "LOCKED"
-        },
-        "daily_devotion": {
-            "current_streak": streak,
-            "target": 30,
-            "status": "UNLOCKED" if achievements["daily_devotion"] else "LOCKED"
-        },
-        "speed_badge": {
-            "best_streak": hard_best_streak,
-            "max_streak": 50,
-            "status": "UNLOCKED" if achievements["lightning_solver"] else "LOCKED"
-        },
-        "apex_challenger": {
-            "current": apex_count,
-            "target": 50,
-            "status": "UNLOCKED" if achievements["apex_challenger"] else "LOCKED"
-        },
-        "true_polymath": {
-            "Easy": easy_count,
-            "Intermediate": intermediate_count,
-            "Hard": hard_count,
-            "status": "UNLOCKED" if achievements["true_polymath"] else "LOCKED"
-        },
-        "total_games": total_games,
-        "rewarded_badges": rewarded_badges,
-        "coins": profile.coins
-    })
+    badges = get_achievements(user)
+    metrics = mode_metrics.get_mode_metrics(user.id)
+    return Response(dashboard.achievements_payload(user, badges, metrics))
 
     
-from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import IsAuthenticated
-from rest_framework.response import Response
-from django.db.models import Sum, Count, F, FloatField
-from django.db.models.functions import Coalesce
-from .models import GameMode, GameQuestionRecord
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@versioned_etag
+@singleflight('peak_metrics')
 def peak_metrics(request):
     user = request.user
 
-    # 1. Longest Combo Streak per mode
-    longest_streak_data = {}
-    for mode in ['easy', 'intermediate', 'hard']:
-        attempts = GameMode.objects.filter(user=user, mode__iexact=mode).annotate(
-            total_streak=Coalesce(Sum('questions__streak'), 0)
-        )
-        # Get max streak for this mode
-        max_streak = attempts.aggregate(max_streak=Coalesce(Max('total_streak'), 0))['max_streak']
-        longest_streak_data[mode.title()] = max_streak
+    # Every per-mode metric in one conditional-aggregation query
+    metrics = mode_metrics.get_mode_metrics(user.id)
 
-    # 2. Fastest Puzzle Time (integer only)
+    longest_streak_data = {}
     fastest_time = {}
+    accuracy = {}
     for mode in ['easy', 'intermediate', 'hard']:
-        attempts = GameMode.objects.filter(user=user, mode__iexact=mode).annotate(
-            total_time=Coalesce(Sum('questions__time'), 0)
-        ).order_by('total_time')  # smallest first
+        row = metrics[mode]
 
-        if attempts.exists():
-            # Convert to int to remove floating points
-            fastest_time[mode.title()] = f"{int(attempts.first().total_time)}s"
-        else:
-            fastest_time[mode.title()] = "0s"
+        # 1. Longest Combo Streak per mode
+        longest_streak_data[mode.title()] = row['best_streak'] or 0
 
-    # 3. Highest Mode Accuracy (integer only)
-    accuracy = {}
-    for mode in ['easy', 'intermediate', 'hard']:
-        questions = GameQuestionRecord.objects.filter(game_mode__user=user, game_mode__mode__iexact=mode)
-        total_q = questions.count()
-        correct_q = questions.filter(status='correct').count()
-        acc_percent = (correct_q / total_q * 100) if total_q > 0 else 0
-        # Convert to int for no decimal
+        # 2. Fastest Puzzle Time (integer only)
+        fastest_time[mode.title()] = f"{int(row['fastest_time'] or 0)}s"
+
+        # 3. Highest Mode Accuracy (integer only)
+        acc_percent = accuracy_percent(row['correct'], row['answered'])
         accuracy[mode.title()] = f"{int(acc_percent)}%"
 
     return Response({
@@ -529,10 +436,10 @@ def peak_metrics(request):
     })
 
     
-from .models import UserProfile
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@versioned_etag
 def user_coins(request):
     """
     Returns the coin balance of the logged-in user.
@@ -560,7 +467,6 @@ def update_coins(request):
         }
     """
     user = request.user
-    profile = UserProfile.objects.get(user=user)
 
     amount = request.data.get('amount')
     action = request.data.get('action')
@@ -570,32 +476,36 @@ def update_coins(request):
     
     try:
         amount = int(amount)
-    except ValueError:
+    except (TypeError, ValueError):
         return Response({"error": "Amount must be an integer"}, status=status.HTTP_400_BAD_REQUEST)
+    if amount <= 0:
+        return Response({"error": "Amount must be positive"}, status=status.HTTP_400_BAD_REQUEST)
     
     if action == 'add':
-        profile.add_coins(amount)
+        earn_coins(user.id, amount, 'update_coins')
+        balance = get_balance(user.id)
         return Response({
             "message": f"{amount} coins added",
-            "coins": profile.coins,
-            "total_earned": profile.total_earned
+            "coins": balance["coins"],
+            "total_earned": balance["total_earned"]
         })
     elif action == 'spend':
-        success = profile.spend_coins(amount)
+        success = spend_coins(user.id, amount, 'update_coins')
         if success:
+            balance = get_balance(user.id)
             return Response({
                 "message": f"{amount} coins spent",
-                "coins": profile.coins,
-                "total_spent": profile.total_spent
+                "coins": balance["coins"],
+                "total_spent": balance["total_spent"]
             })
         else:
             return Response({"error": "Insufficient coins"}, status=status.HTTP_400_BAD_REQUEST)
     
     
-from datetime import datetime  
   
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@versioned_etag
 def monthly_performance(request, year, month):
     user = request.user
     try:
@@ -603,64 +513,46 @@ def monthly_performance(request, year, month):
     except ValueError:
         return Response({"error": "Invalid year or month"}, status=400)
 
-    # Month range (timezone-aware)
+    # Month range (local dates, so boundaries follow TIME_ZONE)
     try:
-        start_date = timezone.make_aware(datetime(year, month, 1))
-        if month == 12:
-            end_date = timezone.make_aware(datetime(year + 1, 1, 1))
-        else:
-            end_date = timezone.make_aware(datetime(year, month + 1, 1))
-    except Exception:
+        start_date, end_date = dashboard.month_bounds(year, month)
+    except ValueError:
         return Response({"error": "Invalid date"}, status=400)
 
-    # Fetch games for this month
-    games = GameMode.objects.filter(user=user, created_at__gte=start_date, created_at__lt=end_date)
-    total_puzzles = games.count()
+    # Games and IQ per mode from the daily rollup, coins from the monthly coin
+    # rollup, active days from the activity calendar: one query each
+    per_mode = dashboard.monthly_mode_totals(user.id, start_date, end_date)
+    coins = get_monthly_rollup(user.id, year, month)
+    year_bits = activity_calendar.load_years(user.id, [year])[year]
 
-    # Mode breakdown
-    mode_map = {"easy": "Easy", "intermediate": "Intermediate", "hard": "Hard"}
-    mode_counts = {v: 0 for v in mode_map.values()}
-
-    for m in games.values('mode').annotate(count=Count('id')):
-        normalized_mode = mode_map.get(m['mode'].lower(), m['mode'].capitalize())
-        mode_counts[normalized_mode] += m['count']
-
-    # IQ summary (sum of per-attempt IQs per mode)
-    iq_summary = {}
-    for mode in ['easy', 'intermediate', 'hard']:
-        total_iq = (
-            GameMode.objects.filter(
-                user=user,
-                mode__iexact=mode,
-                created_at__gte=start_date,
-                created_at__lt=end_date
-            )
-            .exclude(iq__isnull=True)
-            .aggregate(total_iq=Sum('iq'))['total_iq'] or 0
-        )
-        iq_summary[mode_map[mode]] = int(total_iq)  # remove decimals, integer only
+    data = dashboard.monthly_payload(per_mode, coins, year_bits, year, month)
+    return Response(data, status=200)
 
-    # Coins stats
-    try:
-        profile = UserProfile.objects.get(user=user)
-        coins_earned = profile.total_earned or 0
-        coins_spent = profile.total_spent or 0
-    except UserProfile.DoesNotExist:
-        coins_earned = 0
-        coins_spent = 0
 
-    data = {
-        "total_puzzles": total_puzzles,
-        "total_coins_earned": coins_earned,
-        "total_coins_spent": coins_spent,
-        "iqSummary": iq_summary,
-        "mode_counts": mode_counts,
-    }
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@versioned_etag
+def activity_heatmap(request, year):
+    """
+    Calendar heatmap for one year: active dates, active days per month and the
+    longest streak within the year, all derived from the user's activity bitmap.
+    """
+    user = request.user
+    if not 1 <= year <= 9999:
+        return Response({"error": "Invalid year"}, status=400)
 
-    return Response(data, status=200)
+    bits = activity_calendar.load_years(user.id, [year])[year]
+    today = timezone.localdate()
 
+    return Response({
+        "year": year,
+        "active_dates": [d.isoformat() for d in activity_calendar.active_dates(bits, year)],
+        "active_days": bits.bit_count(),
+        "monthly_active_days": [activity_calendar.active_days_in_month(bits, year, m) for m in range(1, 13)],
+        "longest_streak": activity_calendar.longest_run(bits),
+        "current_streak": activity_calendar.current_streak(user.id, today) if year == today.year else 0,
+    })
 
-from django.utils.timezone import localtime
 
 # Greeting API
 @api_view(['GET'])
@@ -680,16 +572,12 @@ def greeting_view(request):
     return Response({"greet": greet, "username": user.username})
 
 
-from django.db.models import Q
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@versioned_etag
 def user_level_view(request):
-    user = request.user
-
     # Count qualifying attempts (>=5 correct answers)
-    qualifying_attempts = GameMode.objects.annotate(
-        correct_count=Count('questions', filter=Q(questions__status='correct'))
-    ).filter(user=user, correct_count__gte=5).count()
+    qualifying_attempts = total_of(get_user_stats(request.user), 'qualifying_games')
 
     # Level increases by 1 for every 5 qualifying attempts
     level = min((qualifying_attempts // 5) + 1, 100)
@@ -704,47 +592,91 @@ def user_level_view(request):
         "max_count": max_count
     })
 
+
+@cache_public_response('leaderboard', rebuild=lambda: get_leaderboard().refresh())
 @api_view(['GET'])
+@singleflight('leaderboard', per_user=False)
 def leaderboard_view(request):
     """
     Returns the top 5 users per mode based on overall IQ in that mode.
     Each user's IQ is summed over all their attempts in that mode (like overall_score API).
+    Served from the in-memory leaderboard snapshot; the rendered JSON is shared
+    through the response cache (ETag / Cache-Control, stale-while-revalidate).
     """
-    modes = ['easy', 'intermediate', 'hard']
-    data = {}
-
-    for mode in modes:
-        # 1. Get total IQ per user for this mode (sum of IQs per attempt)
-        user_scores_qs = (
-            GameMode.objects
-            .filter(mode__iexact=mode)
-            .values('user__username')
-            .annotate(total_iq=Sum('iq'))  # sum of all attempts
-            .order_by('-total_iq')  # highest first
-        )
+    snapshot = get_leaderboard().snapshot()
+    data = {
+        mode: [{"username": row["username"], "overall_score": row["overall_score"]} for row in snapshot.top(mode, 5)]
+        for mode in MODES
+    }
+    return Response(data)
 
-        top_users = user_scores_qs[:5]
 
-        data[mode] = [
-            {
-                "username": u['user__username'],
-                "overall_score": int(u['total_iq'] or 0)
-            } for u in top_users
-        ]
+def _int_param(request, name, default, maximum):
+    try:
+        value = int(request.query_params.get(name, default))
+    except (TypeError, ValueError):
+        value = default
+    return min(max(value, 1), maximum)
 
-    return Response(data)
+
+@api_view(['GET'])
+def leaderboard_page(request, mode):
+    """
+    Returns one page of the leaderboard for a mode.
+    Query params: page (1-based), page_size.
+    """
+    mode = mode.lower()
+    if mode not in MODES:
+        return Response({"detail": "Unknown mode."}, status=status.HTTP_404_NOT_FOUND)
+
+    config = get_leaderboard_settings()
+    snapshot = get_leaderboard().snapshot()
+    page_size = _int_param(request, "page_size", config["PAGE_SIZE"], config["MAX_PAGE_SIZE"])
+    total = snapshot.size(mode)
+    page = _int_param(request, "page", 1, max((total + page_size - 1) // page_size, 1))
+
+    return Response({
+        "mode": mode,
+        "page": page,
+        "page_size": page_size,
+        "total_players": total,
+        "results": snapshot.page(mode, page, page_size),
+    })
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def leaderboard_me(request, mode):
+    """
+    Returns the current user's rank in a mode plus the players around them.
+    Query param: radius (players shown above and below, default 2).
+    """
+    mode = mode.lower()
+    if mode not in MODES:
+        return Response({"detail": "Unknown mode."}, status=status.HTTP_404_NOT_FOUND)
+
+    snapshot = get_leaderboard().snapshot()
+    me, neighbours = snapshot.around(mode, request.user.id, _int_param(request, "radius", 2, 10))
+
+    return Response({
+        "mode": mode,
+        "total_players": snapshot.size(mode),
+        "me": me,  # None until the user has played this mode (and the snapshot refreshed)
+        "neighbours": neighbours,
+    })
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@versioned_etag
 def overall_score(request):
     user = request.user
-    
+    stats = get_user_stats(user)
+
     # Sum IQ from all attempts and convert to integer
-    total_score = int(GameMode.objects.filter(user=user).aggregate(total=Sum('iq'))['total'] or 0)
+    total_score = int(total_of(stats, 'iq_sum'))
 
-    # Breakdown per mode
-    breakdown_qs = GameMode.objects.filter(user=user).values('mode').annotate(mode_score=Sum('iq'))
-    breakdown = [{b['mode']: int(b['mode_score'])} for b in breakdown_qs]
+    # Breakdown per mode (modes the user has played)
+    breakdown = [{mode: int(row.iq_sum)} for mode, row in stats.items() if row.games_played]
 
     return Response({
         "user": user.username,
@@ -754,22 +686,17 @@ def overall_score(request):
     
     
     
-import requests
-from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import IsAuthenticated
-from rest_framework.response import Response
-from django.shortcuts import get_object_or_404
-# IMPORTANT: Ensure your model imports are correct:
-from .models import GameQuestionRecord, GameMode 
-from .utils.hints import generate_hint 
 
 @api_view(['POST']) 
 @permission_classes([IsAuthenticated]) 
 def marcconrad_game(request):
     """
-    1. Fetches the question and correct answer from the external API.
-    2. SECURELY saves the correct answer to a GameQuestionRecord.
-    3. Returns ONLY the question image to the frontend.
+    1. Takes the question and correct answer from the puzzle pool
+       (falls back to the configured provider when the pool is empty).
+    2. SECURELY saves the correct answer to a GameQuestionRecord
+       (skipped when QUESTION_TOKENS["STATELESS"] is on).
+    3. Returns ONLY the question image plus an encrypted question token
+       that get_hint / submit_answer can use instead of a DB read.
     """
     game_mode_id = request.data.get('game_mode_id')
     question_number = request.data.get('question_number')
@@ -778,66 +705,83 @@ def marcconrad_game(request):
         return Response({"error": "Missing game context (mode ID or Q number)."}, status=400)
     
     # 1. Retrieve parent GameMode instance (Security check: belongs to the current user)
+    # An active session already proves ownership, so the lookup is skipped during a game
+    sessions = get_game_sessions()
     try:
-        game_mode_instance = get_object_or_404(
-            GameMode, 
-            id=game_mode_id, 
-            user=request.user
-        )
+        if sessions is not None and sessions.owns(request.user.id, game_mode_id):
+            game_mode_id = int(game_mode_id)
+        else:
+            game_mode_id = get_object_or_404(
+                GameMode, 
+                id=game_mode_id, 
+                user=request.user
+            ).id
     except Exception:
         return Response({"error": "Game Mode not found or does not belong to user."}, status=404)
 
     try:
-        # 2. Fetch from the external API
-        external_url = "http://marcconrad.com/uob/banana/api.php?out=json"
-        response = requests.get(external_url, timeout=10)
-        response.raise_for_status() # Raises HTTPError for bad responses (4xx or 5xx)
-        data = response.json()
-
-        # CRITICAL FIX for KeyError: 0
-        if isinstance(data, list) and len(data) > 0:
-            question_data = data[0]
-        elif isinstance(data, dict):
-            question_data = data
-        else:
-            raise ValueError("External API returned empty or unreadable data structure.")
-        
-        # Extract data
-        fetched_question_img = question_data.get('question') 
-        fetched_solution = question_data.get('solution')    
-
-        if not fetched_question_img or fetched_solution is None: # Check for None explicitly
-            raise ValueError("External API response was valid JSON but lacked 'question' or 'solution' fields.")
-
-        # 3. Securely store the solution in the database (Create or update the record)
-        # We use a transaction to ensure database integrity on creation
-        with transaction.atomic():
-            record, created = GameQuestionRecord.objects.update_or_create(
-                game_mode=game_mode_instance, 
-                question_number=question_number,
-                defaults={
-                    'correct_answer': str(fetched_solution), 
-                }
+        # 2. Take a pre-fetched puzzle from the pool (live fetch only if the pool is empty)
+        fetched_question_img, fetched_solution = next_puzzle()
+
+        # 3. Securely store the solution in the database (single-statement upsert, no read)
+        # With GAME_SESSIONS on it is kept in the session and written behind in bulk;
+        # in stateless mode the signed question token below is the only copy until submission
+        if sessions is not None:
+            sessions.open_question(request.user.id, game_mode_id, question_number, fetched_solution)
+        elif not get_token_settings()["STATELESS"]:
+            upsert_question_records(
+                [GameQuestionRecord(
+                    game_mode_id=game_mode_id,
+                    question_number=question_number,
+                    correct_answer=str(fetched_solution),
+                )],
+                update_fields=['correct_answer'],
             )
 
-        # 4. Return ONLY the question image (Do NOT return the solution!)
+        question_token = issue_question_token(
+            request.user.id, game_mode_id, question_number, fetched_solution
+        )
+
+        # 4. Return ONLY the question image and the encrypted token (Do NOT return the solution!)
+        # Local puzzles are served from api/puzzle-image/, so make the path absolute like the remote one
         return Response({
-            "question": fetched_question_img, 
+            "question": request.build_absolute_uri(fetched_question_img), 
+            "question_token": question_token,
         })
         
     except requests.exceptions.Timeout:
         return Response({"error": "External API Timeout. Please try again."}, status=504)
+    except CircuitOpenError:
+        # Upstream has been failing repeatedly; fail fast instead of tying up the worker
+        return Response({"error": "External API is temporarily unavailable. Please try again shortly."}, status=503)
     except requests.exceptions.RequestException as e:
         # Catch all connection/HTTP errors
         return Response({"error": f"External API Fetch Error. Detail: {type(e).__name__}: {str(e)}"}, status=503)
     except (IndexError, TypeError, ValueError, KeyError) as e:
-        # Catch errors during JSON parsing or data extraction (including the KeyError: 0 fix)
+        # Catch errors during JSON parsing or data extraction (see parse_banana_payload)
         return Response({"error": f"External API Data Error. Unexpected response format. Detail: {e}"}, status=500)
     except Exception as e:
         # Final fallback for unexpected internal errors
         return Response({"error": f"An unexpected internal error occurred: {type(e).__name__}: {str(e)}"}, status=500)
 
 
+@api_view(['GET'])
+@authentication_classes([])
+@permission_classes([AllowAny])
+def puzzle_image(request, token):
+    """
+    Serves a local puzzle image by the opaque token in its URL (see
+    LocalPuzzleProvider.image_url). No login: <img> tags send no Authorization
+    header, and the expiring token is the capability.
+    """
+    try:
+        path = get_local_provider().resolve_image_token(token)
+    except InvalidQuestionToken:
+        raise Http404("Unknown or expired puzzle image.")
+    response = FileResponse(open(path, 'rb'), content_type="image/png")
+    response['Cache-Control'] = "private, max-age=%d" % get_local_provider().image_ttl
+    return response
+
 
 # ===================================================================
 # 2. SECURE HINT GENERATION API
@@ -847,24 +791,35 @@ def marcconrad_game(request):
 @permission_classes([IsAuthenticated]) 
 def get_hint(request):
     """
-    Retrieves the solution from the database and uses the utility to generate a hint.
+    Reads the solution from the question token (or the database for clients
+    that do not send one) and uses the utility to generate a hint.
     """
     game_mode_id = request.data.get('game_mode_id')
     question_number = request.data.get('question_number')
     rotation_index = request.data.get('rotation_index', 0)
+    question_token = request.data.get('question_token')
 
-    if not all([game_mode_id, question_number]):
+    if not question_token and not all([game_mode_id, question_number]):
         return Response({"error": "Missing game_mode_id or question_number"}, status=400)
 
+    sessions = get_game_sessions()
     try:
-        # Retrieve the question record to get the correct answer securely
-        record = get_object_or_404(
-            GameQuestionRecord, 
-            game_mode_id=game_mode_id, 
-            question_number=question_number
-        )
-        
-        solution = record.correct_answer # This is the secure solution field
+        if question_token:
+            # Stateless path: the token is authenticated and bound to this user and question
+            claims = read_question_token(question_token, request.user.id, game_mode_id, question_number)
+            solution = claims.solution
+            if sessions is not None:
+                sessions.use_hint(request.user.id, claims.game_mode_id, claims.question_number)
+        else:
+            # Active session first (counts the hint), then the question record
+            solution = sessions.use_hint(request.user.id, game_mode_id, question_number) if sessions is not None else None
+            if solution is None:
+                record = get_object_or_404(
+                    GameQuestionRecord, 
+                    game_mode_id=game_mode_id, 
+                    question_number=question_number
+                )
+                solution = record.correct_answer # This is the secure solution field
         
         # Call the Python hint utility
         hint_text = generate_hint(str(solution), rotation_index)
@@ -872,21 +827,24 @@ def get_hint(request):
         # Return only the hint text
         return Response({"hint_text": hint_text})
 
+    except InvalidQuestionToken as e:
+        return Response({"error": str(e)}, status=400)
     except GameQuestionRecord.DoesNotExist:
         return Response({"error": "Game question record not found."}, status=404)
     except Exception as e:
         return Response({"error": f"An internal error occurred while generating the hint: {str(e)}"}, status=500)
     
     
-from django.db import transaction 
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def submit_answer(request):
     """
-    1. Retrieves the existing GameQuestionRecord to get the correct answer.
+    1. Gets the correct answer from the question token (no DB read) or,
+       for clients without a token, from the active session or the existing GameQuestionRecord.
     2. Calculates status, streak, and IQ delta.
-    3. Updates the GameQuestionRecord with the user's answer and results.
+    3. Writes the GameQuestionRecord with the user's answer and results
+       (with GAME_SESSIONS on, the session takes the answer and flushes it later).
     """
     game_mode_id = request.data.get('game_mode_id')
     question_number = request.data.get('question_number')
@@ -894,70 +852,92 @@ def submit_answer(request):
     time_taken = request.data.get('time_taken')
     current_streak = request.data.get('streak', 0) # Use 0 as default if missing
     hint_used = request.data.get('hint_used', False)
+    question_token = request.data.get('question_token')
+    sessions = get_game_sessions()
 
-    if not all([game_mode_id, question_number, user_answer is not None, time_taken is not None]):
+    has_context = question_token or all([game_mode_id, question_number])
+    if not all([has_context, user_answer is not None, time_taken is not None]):
         return Response({"error": "Missing required submission data."}, status=400)
+    try:
+        # Same rule as SessionAnswerSerializer.time_taken
+        time_taken = serializers.IntegerField(min_value=0).run_validation(time_taken)
+    except ValidationError:
+        return Response({"error": "time_taken must be a non-negative integer."}, status=400)
 
     try:
-        # 1. Retrieve the existing question record (This is the fix for the initial error)
-        # SECURITY: Ensure the record belongs to the current user's game mode
-        record = get_object_or_404(
-            GameQuestionRecord, 
-            game_mode_id=game_mode_id, 
-            question_number=question_number,
-            game_mode__user=request.user # Essential security check
-        )
+        # 1. Recover the correct answer
+        if question_token:
+            # SECURITY: the token is authenticated and bound to this user, game and question
+            claims = read_question_token(question_token, request.user.id, game_mode_id, question_number)
+            record = GameQuestionRecord(
+                game_mode_id=claims.game_mode_id,
+                question_number=claims.question_number,
+                correct_answer=claims.solution,
+            )
+        else:
+            # SECURITY: sessions are keyed by their owner, so only the user's own games match
+            solution = sessions.solution(request.user.id, game_mode_id, question_number) if sessions is not None else None
+            if solution is not None:
+                record = GameQuestionRecord(
+                    game_mode_id=int(game_mode_id),
+                    question_number=int(question_number),
+                    correct_answer=solution,
+                )
+            else:
+                # SECURITY: Ensure the record belongs to the current user's game mode
+                record = get_object_or_404(
+                    GameQuestionRecord, 
+                    game_mode_id=game_mode_id, 
+                    question_number=question_number,
+                    game_mode__user=request.user # Essential security check
+                )
         
         # 2. Process Answer and Calculate Metrics
-        
-        # Convert to string for consistent comparison (all values are strings in the model)
         correct_answer_str = record.correct_answer 
         user_answer_str = str(user_answer)
-        
-        is_correct = (correct_answer_str == user_answer_str)
-        
-        if user_answer_str == "SKIPPED":
-            status = 'skipped'
-            final_streak = 0
-        elif is_correct:
-            status = 'correct'
-            final_streak = min(current_streak + 1, 5) # Max streak of 5
+        if sessions is not None:
+            # Hints served by get_hint count even when the client does not report them
+            hint_used = hint_used or sessions.hints_used(request.user.id, record.game_mode_id, record.question_number) > 0
+        status, final_streak, iq_delta = score_answer(correct_answer_str, user_answer_str, current_streak, hint_used)
+
+
+        # 3. Write the GameQuestionRecord with the result (Use a transaction for safety)
+        if sessions is not None:
+            sessions.record_answer(
+                request.user.id, record.game_mode_id, record.question_number,
+                correct_answer_str, user_answer_str, status, time_taken, final_streak,
+            )
         else:
-            status = 'incorrect'
-            final_streak = 0
-
-        # --- Example IQ/Score Calculation Placeholder ---
-        # NOTE: You need to implement your actual scoring/IQ logic here.
-        # This is a basic placeholder.
-        iq_delta = 0.0 # Placeholder
-        if status == 'correct':
-             iq_delta = 5.0 # Example gain
-        elif status == 'incorrect':
-             iq_delta = -3.0 # Example loss
-        # Apply penalty for using hint
-        if hint_used:
-             iq_delta = iq_delta * 0.5
-
-
-        # 3. Update the GameQuestionRecord with the result (Use a transaction for safety)
-        with transaction.atomic():
-            record.user_answer = user_answer_str
-            record.status = status
-            record.time = time_taken
-            record.streak = final_streak
-            # NOTE: Assuming 'iq' field stores the delta/score for *this* question
-            # Your overall IQ calculation likely happens at the end of the game (GameMode update)
-            record.iq = iq_delta
-            record.save()
+            with transaction.atomic():
+                record.user_answer = user_answer_str
+                record.status = status
+                record.time = time_taken
+                record.streak = final_streak
+                # NOTE: Assuming 'iq' field stores the delta/score for *this* question
+                # Your overall IQ calculation likely happens at the end of the game (GameMode update)
+                record.iq = iq_delta
+                if question_token:
+                    # Single upsert: creates the row in stateless mode, updates it otherwise
+                    upsert_question_records(
+                        [record],
+                        update_fields=['correct_answer', 'user_answer', 'status', 'time', 'streak'],
+                    )
+                else:
+                    record.save()
+                sync_game_summaries([record.game_mode_id])
+                record_event(request.user.id, ANSWER_SUBMITTED, game_mode_ids=[record.game_mode_id])
         
         # 4. Return the result
         return Response({
-            "status": status,
+            "status": status.label,
             "correct_answer": correct_answer_str,
             "final_streak": final_streak,
-            "iq_delta": iq_delta
+            "iq_delta": iq_delta,
+            "rewarded_badges": take_unseen_rewards(request.user.id),
         }, status=200)
 
+    except InvalidQuestionToken as e:
+        return Response({"error": str(e)}, status=400)
     except GameQuestionRecord.DoesNotExist:
         # Clear error for the client
         return Response({"error": "Question record not found. Did the question load successfully?"}, status=404)
@@ -966,87 +946,126 @@ def submit_answer(request):
         return Response({"error": f"An internal error occurred: {type(e).__name__}: {str(e)}"}, status=500)
 
 
-from django.db.models import Sum, Max, IntegerField
-from django.db.models.functions import Coalesce
-from django.utils.timezone import localtime
-from .models import GameMode, GameQuestionRecord, AchievementReward
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def sync_session(request):
+    """
+    Offline play: scores a whole attempt in one round trip.
+    1. Recovers every solution (question tokens, else the stored records; one query).
+    2. Scores the answers in question order with the submit_answer rules,
+       carrying the streak (see utils.scoring).
+    3. Persists the records with one bulk upsert and the stats. With "iq" in
+       the body the attempt is also finished, as by update-gameMode; without
+       it the stored IQ is left alone.
+    """
+    serializer = SessionSyncSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response({"error": serializer.errors}, status=400)
+    game_mode_id = serializer.validated_data['game_mode_id']
+    answers = sorted(serializer.validated_data['answers'], key=lambda answer: answer['question_number'])
+
+    game_mode = GameMode.objects.filter(id=game_mode_id, user=request.user).first()
+    if game_mode is None:
+        return Response({"error": "Game Mode not found or does not belong to user."}, status=404)
+    sessions = get_game_sessions()
+    if sessions is not None:
+        sessions.finish(game_mode.id)  # solutions fetched during the game reach the records first
+
+    # 1. Recover the correct answers
+    try:
+        solutions = {
+            answer['question_number']: read_question_token(
+                answer['question_token'], request.user.id, game_mode_id, answer['question_number']
+            ).solution
+            for answer in answers if answer['question_token']
+        }
+    except InvalidQuestionToken as e:
+        return Response({"error": str(e)}, status=400)
+    stored = [answer['question_number'] for answer in answers if answer['question_number'] not in solutions]
+    if stored:
+        solutions.update(
+            GameQuestionRecord.objects.filter(game_mode=game_mode, question_number__in=stored)
+            .values_list('question_number', 'correct_answer')
+        )
+    missing = [answer['question_number'] for answer in answers if not solutions.get(answer['question_number'])]
+    if missing:
+        return Response({"error": "Question records not found.", "question_numbers": missing}, status=404)
+
+    # 2. Score the session in a single pass
+    scored = score_session(
+        (solutions[answer['question_number']], answer['user_answer'], answer['hint_used']) for answer in answers
+    )
+
+    # 3. Persist everything in one transaction
+    records = [
+        GameQuestionRecord(
+            game_mode=game_mode,
+            question_number=answer['question_number'],
+            correct_answer=str(solutions[answer['question_number']]),
+            user_answer=answer['user_answer'],
+            status=result.status,
+            time=answer['time_taken'],
+            streak=result.final_streak,
+        )
+        for answer, result in zip(answers, scored)
+    ]
+    with transaction.atomic():
+        upsert_question_records(
+            records, update_fields=['correct_answer', 'user_answer', 'status', 'time', 'streak']
+        )
+        sync_game_summaries([game_mode.id])
+        game_mode.refresh_from_db()
+        record_event(request.user.id, ANSWER_SUBMITTED, game_mode_ids=[game_mode.id])
+        finished = 'iq' in serializer.validated_data
+        if finished:
+            previous_iq = game_mode.iq
+            game_mode.iq = serializer.validated_data['iq']
+            game_mode.save(update_fields=['iq'])
+            record_game_finished(game_mode, previous_iq)
+            record_event(request.user.id, GAME_FINISHED)
+    if finished:
+        get_leaderboard().mark_dirty()
+        get_response_cache().bump_version('leaderboard')
+
+    return Response({
+        "game_mode_id": game_mode.id,
+        "iq": game_mode.iq,
+        "correct_count": game_mode.correct_count,
+        "total_streak": game_mode.total_streak,
+        "total_time": game_mode.total_time,
+        "rewarded_badges": take_unseen_rewards(request.user.id),
+        "results": [
+            {
+                "question_number": record.question_number,
+                "status": result.status.label,
+                "correct_answer": record.correct_answer,
+                "final_streak": result.final_streak,
+                "iq_delta": result.iq_delta,
+            }
+            for record, result in zip(records, scored)
+        ],
+    }, status=200)
+
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@versioned_etag
+@singleflight('player_overview')
 def player_overview(request):
     user = request.user
-    profile = user.profile  # from UserProfile (auto-created)
-    join_date = localtime(user.date_joined).strftime("%Y-%m-%d")
-    
-    photo_url = request.build_absolute_uri(profile.photo.url) if profile.photo else None
-
-    # --------------------------
-    # 1️⃣ Overall Score
-    # --------------------------
-    total_score = int(
-        GameMode.objects.filter(user=user).aggregate(
-            total=Coalesce(Sum('iq'), 0, output_field=IntegerField())
-        )['total']
-    )
 
-    # --------------------------
-    # 2️⃣ Achievements Unlocked (human-readable)
-    # --------------------------
-    unlocked_achievements = AchievementReward.objects.filter(
-        user=user, rewarded=True
-    ).values_list('badge_name', flat=True)
-    # Convert underscores to spaces & capitalize words
-    achievements_readable = [name.replace('_', ' ').title() for name in unlocked_achievements]
-
-    # --------------------------
-    # 3️⃣ Overall Accuracy
-    # --------------------------
-    records = GameQuestionRecord.objects.filter(game_mode__user=user)
-    total_questions = records.count()
-    correct_questions = records.filter(status='correct').count()
-    overall_accuracy = round((correct_questions / total_questions * 100), 2) if total_questions else 0
-
-    # --------------------------
-    # 4️⃣ Total Puzzles Solved
-    # --------------------------
-    total_puzzles = GameMode.objects.filter(user=user).count()
-
-    # --------------------------
-    # 5️⃣ Highest Streak Combo per mode
-    # --------------------------
-    longest_streak_data = {}
-    for mode in ['easy', 'intermediate', 'hard']:
-        attempts = GameMode.objects.filter(user=user, mode__iexact=mode).annotate(
-            total_streak=Coalesce(Sum('questions__streak'), 0, output_field=IntegerField())
-        )
-        max_streak = attempts.aggregate(
-            max_streak=Coalesce(Max('total_streak'), 0, output_field=IntegerField())
-        )['max_streak']
-        longest_streak_data[mode.title()] = max_streak
-
-    # --------------------------
-    # 6️⃣ Final Response
-    # --------------------------
-    return Response({
-        "username": user.username,
-        "email": user.email,
-        "photo_url": photo_url,
-        "join_date": join_date,
-        "overall_score": total_score,
-        "overall_accuracy": overall_accuracy,
-        "total_puzzles_solved": total_puzzles,
-        "highest_streak_combo": longest_streak_data,  # per mode
-        "achievements_unlocked": achievements_readable,
-        "coins": profile.coins,
-    })
+    # Every per-mode metric in one conditional-aggregation query
+    metrics = mode_metrics.get_mode_metrics(user.id)
+    unlocked = dashboard.unlocked_badge_names(user.id)
+
+    return Response(dashboard.overview_payload(request, user, metrics, unlocked))
     
     
-from rest_framework.decorators import api_view, permission_classes, parser_classes
-from rest_framework.parsers import MultiPartParser, FormParser
 
 @api_view(['GET', 'PATCH'])
 @permission_classes([IsAuthenticated])
 @parser_classes([MultiPartParser, FormParser])
+@versioned_etag
 def user_credentials(request):
     profile = request.user.profile
 
@@ -1062,6 +1081,7 @@ def user_credentials(request):
         serializer = UserProfileSerializer(profile, data=request.data, partial=True)
         if serializer.is_valid():
             serializer.save()
+            bump_data_version(request.user.id)
             photo_url = request.build_absolute_uri(serializer.instance.photo.url) if serializer.instance.photo else None
             return Response({
                 "message": "Credentials updated successfully",
@@ -1074,6 +1094,7 @@ def user_credentials(request):
     
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@versioned_etag
 def get_profile_photo(request):
     """
     Returns only the profile photo URL of the logged-in user.
@@ -1086,7 +1107,6 @@ def get_profile_photo(request):
         return Response({"photo": None})
    
     
-from django.core.exceptions import ObjectDoesNotExist
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def logout_view(request):
@@ -1094,8 +1114,10 @@ def logout_view(request):
     Logs out the authenticated user by deleting their token.
     """
     try:
-        # Delete the user's token
-        request.user.auth_token.delete()
+        # Delete the user's token and drop it from every worker's auth cache
+        token = request.user.auth_token
+        token.delete()
+        invalidate_token(token.key)
     except ObjectDoesNotExist:
         # Token might not exist, safe to ignore
         pass
@@ -1103,13 +1125,6 @@ def logout_view(request):
     return Response({"detail": "Successfully logged out."}, status=status.HTTP_200_OK)
 
 
-from django.conf import settings
-from django.core.mail import send_mail
-from django.contrib.auth.models import User
-from django.contrib.auth.tokens import default_token_generator
-from django.utils.http import urlsafe_base64_encode
-from django.utils.encoding import force_bytes
-
 @api_view(['POST'])
 def password_reset_request(request):
     """
@@ -1188,7 +1203,6 @@ def password_reset_request(request):
     return Response({"detail": "Password reset email sent successfully. Check your inbox."}, status=status.HTTP_200_OK)
 
 
-from django.utils.http import urlsafe_base64_decode
 @api_view(['POST'])
 def password_reset_confirm(request):
     """
@@ -1217,5 +1231,39 @@ def password_reset_confirm(request):
 
     user.set_password(new_password)
     user.save()
+    invalidate_user(user.pk)
+
+    return Response({"detail": "Password updated successfully."}, status=status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def service_metrics(request):
+    """
+    Returns in-process metrics for the background subsystems (staff only).
+    """
+    pool = get_puzzle_pool()
+    sessions = get_game_sessions()
+    flight = get_singleflight()
+    return Response({
+        "puzzle_pool": pool.stats() if pool is not None else None,
+        "banana_api": get_banana_client().stats(),
+        "leaderboard": get_leaderboard().stats(),
+        "auth_cache": get_token_cache().stats(),
+        "game_sessions": sessions.stats() if sessions is not None else None,
+        "response_cache": get_response_cache().stats(),
+        "singleflight": flight.stats() if flight is not None else None,
+    })
 
-    return Response({"detail": "Password updated successfully."}, status=status.HTTP_200_OK)
\ No newline at end of file
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def batch(request):
+    """
+    Runs several GET routes of this API in one round trip:
+    {"requests": [{"id": "peak", "path": "peak-metrics/"}, ...]}.
+    Each result carries its own status, body and timing.
+    """
+    serializer = BatchSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    return Response(run_batch(request, serializer.validated_data['requests']))
@@ -0,0 +1,107 @@
+# views_async.py
+#
+# Async versions of the dashboard reads, served instead of the views.py ones
+# when ASYNC_VIEWS["ENABLED"] is on (see urls.py) and the project runs under
+# asgi.py. Their independent queries are issued concurrently on the database
+# executor (utils/async_db.py).
+#
+# They are a separate endpoint family, not DRF views: the JSON body, the
+# token check, 401/405 and the ETag / 304 handling match the sync views, but
+# there is no content negotiation (always application/json, never the
+# browsable API) and no @singleflight coalescing - concurrent identical
+# requests each run their queries.
+
+import functools
+
+from django.http import HttpResponse, HttpResponseNotModified
+from rest_framework import exceptions, status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from .utils import activity_calendar, dashboard, mode_metrics
+from .utils.achievements import get_achievements
+from .utils.async_db import gather_db, run_db
+from .utils.coins import get_monthly_rollup
+from .utils.data_versions import check_etag
+
+
+def _json(data, status_code=200, headers=None):
+    return HttpResponse(
+        JSONRenderer().render(data), status=status_code, content_type="application/json", headers=headers
+    )
+
+
+def _authenticate(request):
+    """DRF authentication of a plain Django request: (user, auth) or raises APIException."""
+    drf_request = Request(request, authenticators=[auth() for auth in api_settings.DEFAULT_AUTHENTICATION_CLASSES])
+    user = drf_request.user
+    if not user or not user.is_authenticated:
+        raise exceptions.NotAuthenticated()
+    return user, drf_request.auth
+
+
+def async_api_view(view):
+    """
+    @api_view(['GET']) + IsAuthenticated + @versioned_etag for an async view
+    returning (data, status_code): the token and the data version are checked
+    on the database executor and the data is rendered as DRF's JSONRenderer would.
+    The Accept header is not negotiated; the response is always JSON.
+    """
+    view_name = f"{view.__module__}.{view.__qualname__}"
+
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if request.method != 'GET':
+            return _json({"detail": f'Method "{request.method}" not allowed.'}, status.HTTP_405_METHOD_NOT_ALLOWED)
+        try:
+            request.user, request.auth = await run_db(_authenticate, request)
+        except (exceptions.NotAuthenticated, exceptions.AuthenticationFailed) as exc:
+            return _json({"detail": exc.detail}, status.HTTP_401_UNAUTHORIZED, {"WWW-Authenticate": "Token"})
+
+        etag, matches = await run_db(check_etag, view_name, request)
+        headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+        if matches:
+            return HttpResponseNotModified(headers=headers)
+        data, status_code = await view(request, *args, **kwargs)
+        return _json(data, status_code, headers if status_code == status.HTTP_200_OK else None)
+
+    return wrapper
+
+
+@async_api_view
+async def player_overview(request):
+    user = request.user
+    metrics, unlocked, _ = await gather_db(
+        (mode_metrics.get_mode_metrics, user.id),
+        (dashboard.unlocked_badge_names, user.id),
+        (getattr, user, 'profile'),  # loaded here unless the token cache already attached it
+    )
+    return dashboard.overview_payload(request, user, metrics, unlocked), 200
+
+
+@async_api_view
+async def user_achievements(request):
+    user = request.user
+    badges, metrics, _ = await gather_db(
+        (get_achievements, user),
+        (mode_metrics.get_mode_metrics, user.id),
+        (getattr, user, 'profile'),
+    )
+    return dashboard.achievements_payload(user, badges, metrics), 200
+
+
+@async_api_view
+async def monthly_performance(request, year, month):
+    user = request.user
+    try:
+        start_date, end_date = dashboard.month_bounds(int(year), int(month))
+    except ValueError:
+        return {"error": "Invalid date"}, 400
+
+    per_mode, coins, calendar = await gather_db(
+        (dashboard.monthly_mode_totals, user.id, start_date, end_date),
+        (get_monthly_rollup, user.id, year, month),
+        (activity_calendar.load_years, user.id, [year]),
+    )
+    return dashboard.monthly_payload(per_mode, coins, calendar[year], year, month), 200